@@ -78,4 +78,9 @@ class AppContainer:
         schema_router.index_tables()
 
         # Build and Return the Use Case (The Application)
-        return AskQuestionUseCase(db_manager, pipeline_service, schema_router)
+        return AskQuestionUseCase(
+            db_manager,
+            pipeline_service,
+            schema_router,
+            query_timeout=settings.DB_QUERY_TIMEOUT_SECONDS,
+        )
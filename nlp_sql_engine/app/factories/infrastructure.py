@@ -3,6 +3,7 @@ from typing import Any, cast
 from nlp_sql_engine.config.settings import Settings
 from nlp_sql_engine.app.registry import ProviderRegistry
 from nlp_sql_engine.core.interfaces.llm import ILLMProvider
+from nlp_sql_engine.core.interfaces.db import IAsyncDatabaseConnector
 from nlp_sql_engine.core.interfaces.embedding import IEmbeddingProvider
 from nlp_sql_engine.core.interfaces.manager import IDatabaseManager
 from nlp_sql_engine.core.interfaces.vector_store import IVectorStore
@@ -81,3 +82,11 @@ class InfrastructureFactory:
                 manager.register_adapter(name, adapter)
 
         return manager
+
+    @staticmethod
+    def create_async_db(db_type: str, settings: Settings) -> IAsyncDatabaseConnector:
+        """Async adapter registered under db_type (register_async_db), for asyncio callers."""
+        adapter_class = ProviderRegistry.get_async_db_class(db_type)
+        if hasattr(adapter_class, "create"):
+            return cast(Any, adapter_class).create(settings)
+        return adapter_class(getattr(settings, "DB_CONNECTION_STRING", ":memory:"))
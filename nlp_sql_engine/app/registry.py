@@ -1,7 +1,7 @@
 from typing import Type, Dict
 from nlp_sql_engine.core.interfaces.llm import ILLMProvider
 from nlp_sql_engine.core.interfaces.embedding import IEmbeddingProvider
-from nlp_sql_engine.core.interfaces.db import IDatabaseConnector
+from nlp_sql_engine.core.interfaces.db import IAsyncDatabaseConnector, IDatabaseConnector
 from nlp_sql_engine.core.interfaces.manager import IDatabaseManager
 from nlp_sql_engine.core.interfaces.vector_store import IVectorStore
 class ProviderRegistry:
@@ -12,6 +12,7 @@ class ProviderRegistry:
     _LLM_REGISTRY: Dict[str, Type[ILLMProvider]] = {}
     _EMBED_REGISTRY: Dict[str, Type[IEmbeddingProvider]] = {}
     _DB_REGISTRY: Dict[str, Type[IDatabaseConnector]] = {}
+    _ASYNC_DB_REGISTRY: Dict[str, Type[IAsyncDatabaseConnector]] = {}
     _DB_MANAGER_REGISTRY: Dict[str, Type[IDatabaseManager]] = {}
     _VECTOR_STORE_REGISTRY: Dict[str, Type[IVectorStore]] = {}
 
@@ -57,6 +58,19 @@ class ProviderRegistry:
             raise ValueError(f"Database '{name}' not found. Registered: {list(cls._DB_REGISTRY.keys())}")
         return cls._DB_REGISTRY[name]
     
+    @classmethod
+    def register_async_db(cls, name: str):
+        def inner_wrapper(wrapped_class: Type[IAsyncDatabaseConnector]):
+            cls._ASYNC_DB_REGISTRY[name] = wrapped_class
+            return wrapped_class
+        return inner_wrapper
+
+    @classmethod
+    def get_async_db_class(cls, name: str) -> Type[IAsyncDatabaseConnector]:
+        if name not in cls._ASYNC_DB_REGISTRY:
+            raise ValueError(f"Async database '{name}' not found. Registered: {list(cls._ASYNC_DB_REGISTRY.keys())}")
+        return cls._ASYNC_DB_REGISTRY[name]
+
     # --- Database Manager Registration ---
     @classmethod
     def register_manager(cls, name: str):
@@ -54,6 +54,22 @@ class Settings(BaseSettings):
     DB_MANAGER: str = "default"
     DB_MANAGER_ADAPTER: str = "default"
     DB_TYPE: str = "federated"  # Options: sqlalchemy, federated, mock
+    # Generated queries are interrupted after this many seconds (None = no limit)
+    DB_QUERY_TIMEOUT_SECONDS: Optional[float] = None
+    # Rows per round-trip when results are streamed (server-side cursors)
+    DB_FETCH_BATCH_SIZE: int = 1000
+    # Reflected schemas are reused for this many seconds (None = until DDL / refresh)
+    DB_SCHEMA_CACHE_TTL_SECONDS: Optional[float] = None
+    # SQLAlchemy connection pool (None = SQLAlchemy defaults); also the defaults
+    # of federated SQLAlchemy children, which can override them per attachment
+    DB_POOL_SIZE: Optional[int] = None
+    DB_MAX_OVERFLOW: Optional[int] = None
+    DB_POOL_RECYCLE_SECONDS: Optional[int] = None
+    DB_POOL_PRE_PING: bool = False
+    # SQL run on every new connection, e.g. ["PRAGMA foreign_keys=ON"]
+    DB_CONNECTION_INIT_STATEMENTS: list = []
+    # Worker threads shared by all queries of the async adapters (thread bridge)
+    DB_ASYNC_WORKERS: int = 8
 
     # redundant - but kept for backward compatibility
     DATABASES: Dict[str, str] = {
@@ -66,12 +82,48 @@ class Settings(BaseSettings):
     FEDERATED_DB_MAIN: str = "duckdb:///:memory:"
 
     # Physical Layer
+    # alias -> URI, or alias -> {"uri": ..., "type": "sqlalchemy" | "sqlite",
+    #   "fetch_batch_size": int, "pool_size": int, "max_overflow": int,
+    #   "statement_timeout": seconds}
+    # "sqlite" children also take an open profile: "mmap_size", "cache_size",
+    #   "temp_store", "read_only", "immutable" (see SQLiteAdapter)
     FEDERATED_ATTACHMENTS: dict = {
         "crm": "sqlite:///test_database/crm.db",
         "inventory": "sqlite:///test_database/inventory.db",
         "sales": "sqlite:///test_database/sales.db",
     }
 
+    # Federated Execution
+    # Rows are pulled from each child in batches of this size
+    FEDERATED_FETCH_BATCH_SIZE: int = 1000
+    # Staged cross-DB data above this size is spilled to a temporary SQLite file
+    FEDERATED_MEMORY_BUDGET_MB: float = 256
+    FEDERATED_SPILL_DIR: Optional[str] = None  # None = system temp dir
+    # Child scans of one cross-DB query are fetched concurrently on this many threads
+    FEDERATED_MAX_WORKERS: int = 4
+    # Big single-step joins are hash-partitioned and joined on this many worker
+    # processes (0/1 = off), once the plan expects to fetch at least MIN_ROWS rows
+    FEDERATED_JOIN_PROCESSES: int = 0
+    FEDERATED_JOIN_PARALLEL_MIN_ROWS: int = 200000
+    # Semi-join reduction: distinct keys of a filtered side are pushed to its join
+    # partner as IN lists, unless there are more keys than this threshold
+    FEDERATED_SEMI_JOIN_MAX_KEYS: int = 10000
+    FEDERATED_SEMI_JOIN_CHUNK_SIZE: int = 500
+    # Cost-based join ordering from child statistics (row counts, NDV), cached for TTL
+    FEDERATED_STATISTICS_ENABLED: bool = True
+    FEDERATED_STATISTICS_TTL_SECONDS: float = 600
+    # When every child of a query is a local SQLite file, ATTACH them and let SQLite join
+    FEDERATED_ATTACH_SQLITE: bool = True
+    # LRU of parsed/planned queries keyed by normalized SQL (0 = disabled)
+    FEDERATED_PLAN_CACHE_SIZE: int = 256
+    # Reject cross-DB queries whose estimated transfer exceeds this many rows
+    FEDERATED_MAX_TRANSFER_ROWS: Optional[int] = None
+    # Virtual tables copied to a local SQLite cache, reloaded only when the source
+    # changes (data_version / row-count fingerprint) or after the TTL
+    FEDERATED_MATERIALIZED_TABLES: list = []
+    FEDERATED_MATERIALIZED_TTL_SECONDS: float = 300
+    FEDERATED_MATERIALIZED_PATH: Optional[str] = None  # None = in memory
+
     # SEMANTIC LAYER (The Virtual Contract)
     # Virtual Tables: Map "Virtual Name" -> "Physical Path"
     VIRTUAL_SCHEMA: dict = {
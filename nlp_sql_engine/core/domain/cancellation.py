@@ -0,0 +1,128 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional
+
+
+class QueryCancelled(Exception):
+    """Raised when a running query is stopped through its CancellationToken."""
+
+
+class QueryTimeout(QueryCancelled):
+    """Raised when a query runs past the deadline of its CancellationToken."""
+
+
+class CancellationToken:
+    """
+    Cooperative cancellation of database work.
+
+    The caller triggers cancel() (from any thread); adapters poll the token
+    and/or register a callback that interrupts the running statement.
+    A token may carry a deadline (timeout in seconds) and a parent: it is
+    stopped when it is cancelled, when its parent is, or once a deadline passes.
+    A child token is closed (or used as a context manager) once its work is
+    done, so that long-lived parents do not keep it alive.
+    """
+
+    def __init__(
+        self, timeout: Optional[float] = None, parent: Optional["CancellationToken"] = None
+    ):
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self.parent = parent
+        self._cancelled = threading.Event()
+        self._callbacks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+        self._detach: Optional[Callable[[], None]] = None
+        if parent is not None:
+            self._detach = parent.on_cancel(self.cancel)
+
+    def close(self) -> None:
+        """Unregisters the token from its parent's callbacks."""
+        if self._detach is not None:
+            self._detach()
+            self._detach = None
+
+    def __enter__(self) -> "CancellationToken":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def cancel(self) -> None:
+        with self._lock:
+            if self._cancelled.is_set():
+                return
+            self._cancelled.set()
+            callbacks = list(self._callbacks)
+        for callback in callbacks:
+            callback()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set() or (self.parent is not None and self.parent.cancelled)
+
+    @property
+    def expired(self) -> bool:
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            return True
+        return self.parent is not None and self.parent.expired
+
+    @property
+    def stopped(self) -> bool:
+        return self.cancelled or self.expired
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the nearest deadline, None without one."""
+        deadlines = []
+        token: Optional[CancellationToken] = self
+        while token is not None:
+            if token.deadline is not None:
+                deadlines.append(token.deadline)
+            token = token.parent
+        if not deadlines:
+            return None
+        return max(0.0, min(deadlines) - time.monotonic())
+
+    def exception(self) -> QueryCancelled:
+        if self.cancelled:
+            return QueryCancelled("Query cancelled")
+        return QueryTimeout("Query exceeded its time limit")
+
+    def check(self) -> None:
+        """Raises QueryCancelled / QueryTimeout once the token is stopped."""
+        if self.stopped:
+            raise self.exception()
+
+    def on_cancel(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """
+        Calls callback when cancel() is triggered (right away if it already was).
+        Returns a function that unregisters it.
+        """
+        with self._lock:
+            registered = not self._cancelled.is_set()
+            if registered:
+                self._callbacks.append(callback)
+        if not registered:
+            callback()
+
+        def unregister() -> None:
+            with self._lock:
+                if callback in self._callbacks:
+                    self._callbacks.remove(callback)
+
+        return unregister
+
+
+@contextmanager
+def bounded(
+    cancel: Optional[CancellationToken], timeout: Optional[float]
+) -> Iterator[Optional[CancellationToken]]:
+    """
+    The caller's token limited to timeout seconds (a child token, closed on
+    exit), or the caller's token itself without a timeout.
+    """
+    if not timeout:
+        yield cancel
+        return
+    with CancellationToken(timeout, parent=cancel) as token:
+        yield token
@@ -1,3 +1,4 @@
+from dataclasses import dataclass
 from pydantic import BaseModel, Field, ConfigDict
 from typing import List, Any, Iterator, Optional
 
@@ -23,3 +24,22 @@ class PipelineResult(BaseModel):
     result: Optional[QueryResult] = None
 
     error: Optional[str] = None
+
+
+@dataclass
+class RowBatch:
+    """
+    A block of result rows as fetched from a cursor.
+    Column names (from the cursor description) are carried once per batch;
+    rows are plain tuples, so no per-row mapping object is allocated.
+    columns is None when the source does not expose names.
+    """
+    columns: Optional[List[str]]
+    rows: List[tuple]
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def column(self, index: int) -> tuple:
+        """Values of one column (columnar view of the batch)."""
+        return tuple(row[index] for row in self.rows)
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import Generator, Any, List
+from typing import AsyncIterator, Generator, Any, List, Optional
+from nlp_sql_engine.core.domain.cancellation import CancellationToken
 
 class IDatabaseConnector(ABC):
     """
@@ -23,6 +24,24 @@ class IDatabaseConnector(ABC):
         """
         pass
 
+    def execute_cancellable(
+        self, query: str, cancel: CancellationToken
+    ) -> Generator[Any, None, None]:
+        """
+        execute_query that stops with QueryCancelled / QueryTimeout once the token
+        is stopped. This default checks between rows; adapters override it to
+        interrupt the running statement itself.
+        """
+        cancel.check()
+        rows = self.execute_query(query)
+        try:
+            for row in rows:
+                cancel.check()
+                yield row
+        finally:
+            if hasattr(rows, "close"):
+                rows.close()
+
     @abstractmethod
     def execute_ddl(self, query: str) -> None:
         """Executes DDL statements like CREATE, INSERT, etc."""
@@ -34,4 +53,41 @@ class IDatabaseConnector(ABC):
 
     @abstractmethod
     def get_table_schema(self, table_name: str) -> str:
-        pass
\ No newline at end of file
+        pass
+
+
+class IAsyncDatabaseConnector(ABC):
+    """
+    Async counterpart of IDatabaseConnector, for servers handling many
+    concurrent questions on one event loop.
+    """
+
+    @abstractmethod
+    def execute_query(
+        self, query: str, cancel: Optional[CancellationToken] = None
+    ) -> AsyncIterator[Any]:
+        """
+        Executes SQL and yields results row by row (async def ... yield).
+        Rows stop with QueryCancelled / QueryTimeout once cancel is stopped.
+        """
+        pass
+
+    @abstractmethod
+    async def get_schema(self) -> str:
+        pass
+
+    @abstractmethod
+    async def execute_ddl(self, query: str) -> None:
+        pass
+
+    @abstractmethod
+    async def get_all_table_names(self) -> List[str]:
+        pass
+
+    @abstractmethod
+    async def get_table_schema(self, table_name: str) -> str:
+        pass
+
+    async def close(self) -> None:
+        """Releases connections and worker threads."""
+        pass
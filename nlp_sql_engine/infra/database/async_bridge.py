@@ -0,0 +1,102 @@
+import asyncio
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, wait
+from itertools import islice
+from typing import Any, AsyncIterator, Callable, Iterator, List, Optional
+from nlp_sql_engine.core.domain.cancellation import CancellationToken
+from nlp_sql_engine.core.interfaces.db import IAsyncDatabaseConnector, IDatabaseConnector
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ThreadBridgeAdapter(IAsyncDatabaseConnector):
+    """
+    Async adapter over a synchronous IDatabaseConnector.
+
+    Blocking calls run on a thread pool shared by all queries. A query only
+    holds a thread while one batch of fetch_batch_size rows is read, not for
+    its whole lifetime, so many concurrent questions share a few threads.
+    When the consumer stops early (break, error, task cancelled) the query is
+    interrupted through its CancellationToken and its cursor released.
+    """
+
+    def __init__(
+        self,
+        adapter: IDatabaseConnector,
+        executor: Optional[Executor] = None,
+        max_workers: int = 8,
+        fetch_batch_size: int = 1000,
+    ):
+        """
+        executor: thread pool to share with other bridges (one is created otherwise).
+        max_workers: size of the created pool, i.e. blocking calls in flight.
+        fetch_batch_size: rows handed to the event loop per thread hop.
+        """
+        self.adapter = adapter
+        self._owns_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="db-async"
+        )
+        self.fetch_batch_size = fetch_batch_size
+
+    async def _run(self, func: Callable[..., Any], *args) -> Any:
+        """Runs a blocking call on the worker threads."""
+        return await asyncio.wrap_future(self.executor.submit(func, *args))
+
+    async def get_schema(self) -> str:
+        return await self._run(self.adapter.get_schema)
+
+    async def get_all_table_names(self) -> List[str]:
+        return await self._run(self.adapter.get_all_table_names)
+
+    async def get_table_schema(self, table_name: str) -> str:
+        return await self._run(self.adapter.get_table_schema, table_name)
+
+    async def execute_ddl(self, query: str) -> None:
+        await self._run(self.adapter.execute_ddl, query)
+
+    async def execute_query(
+        self, query: str, cancel: Optional[CancellationToken] = None
+    ) -> AsyncIterator[Any]:
+        """Yields the rows of the adapter's execute_cancellable, read batch by batch."""
+        token = CancellationToken(parent=cancel)
+        rows = await self._run(self._open, query, token)
+        fetch: Optional[Future] = None
+        exhausted = False
+        try:
+            while True:
+                fetch = self.executor.submit(self._next_batch, rows)
+                batch = await asyncio.wrap_future(fetch)
+                if not batch:
+                    exhausted = True
+                    break
+                for row in batch:
+                    yield row
+        finally:
+            if not exhausted:
+                # Interrupts a fetch still running in its thread
+                token.cancel()
+            await self._run(self._release, rows, fetch)
+            token.close()
+
+    def _open(self, query: str, cancel: CancellationToken) -> Iterator[Any]:
+        return iter(self.adapter.execute_cancellable(query, cancel))
+
+    def _next_batch(self, rows: Iterator[Any]) -> List[Any]:
+        return list(islice(rows, self.fetch_batch_size))
+
+    @staticmethod
+    def _release(rows: Iterator[Any], fetch: Optional[Future]) -> None:
+        """Closes the row generator once its last fetch has returned."""
+        if fetch is not None:
+            wait([fetch])
+        if hasattr(rows, "close"):
+            rows.close()
+
+    async def close(self) -> None:
+        """Closes the wrapped adapter, then the worker threads if the bridge owns them."""
+        if hasattr(self.adapter, "close"):
+            await self._run(self.adapter.close)
+        if self._owns_executor:
+            self.executor.shutdown(wait=False)
@@ -1,18 +1,68 @@
-import pandas as pd
 import json
+import multiprocessing
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import aclosing
+from functools import partial
+from pathlib import Path
 import sqlglot
+from sqlalchemy.engine import make_url
 from sqlglot import exp
-from typing import Generator, Any, List, Dict, Tuple, Optional
+from typing import AsyncIterator, Callable, Generator, Any, Iterable, List, Dict, Tuple, Optional
 from nlp_sql_engine.config.settings import Settings
-from nlp_sql_engine.core.interfaces.db import IDatabaseConnector
+from nlp_sql_engine.core.domain.models import RowBatch
+from nlp_sql_engine.core.domain.cancellation import CancellationToken, bounded
+from nlp_sql_engine.core.interfaces.db import IAsyncDatabaseConnector, IDatabaseConnector
 from nlp_sql_engine.app.registry import ProviderRegistry
 
 import logging
 
+from nlp_sql_engine.infra.database.async_bridge import ThreadBridgeAdapter
 from nlp_sql_engine.infra.database.sqlalchemy_adapter import SQLAlchemyAdapter
+from nlp_sql_engine.infra.database.federation.planner import (
+    FederatedPlanner,
+    QueryPlan,
+    TableScan,
+)
+from nlp_sql_engine.infra.database.federation.staging import (
+    StagingArea,
+    interrupt_on,
+    quote_identifier,
+    raise_cancelled,
+    sqlite_affinity,
+)
+from nlp_sql_engine.infra.database.federation.statistics import StatisticsCollector
+from nlp_sql_engine.infra.database.federation.materialized import MaterializedTableCache
+from nlp_sql_engine.infra.database.federation.parallel import ParallelScanReader
+from nlp_sql_engine.infra.database.federation.children import (
+    AttachedFile,
+    attached_file,
+    fetch_batches,
+)
+from nlp_sql_engine.infra.database.federation.explain import (
+    PlanNode,
+    TransferTooLarge,
+    explain_plan,
+)
+from nlp_sql_engine.infra.database.federation.scopes import ScopeDecomposer
+from nlp_sql_engine.infra.database.federation.plan_cache import (
+    PlanCache,
+    Route,
+    normalize_sql,
+)
+from nlp_sql_engine.infra.database.federation.hash_join import (
+    BuildSideTooLarge,
+    HashJoinExecutor,
+)
+from nlp_sql_engine.infra.database.federation.partitioned import (
+    PartitionedHashJoinExecutor,
+)
 
 logger = logging.getLogger(__name__)
 
+# Default SQLITE_MAX_ATTACHED of the sqlite3 library
+SQLITE_MAX_ATTACHED = 10
+
 
 @ProviderRegistry.register_db("federated")
 class FederatedAdapter(IDatabaseConnector):
@@ -34,24 +84,124 @@ class FederatedAdapter(IDatabaseConnector):
             db_configs = json.loads(db_configs)
 
         # Instantiate Child Adapters
-        # NOTE: For now, we assume children are SQLAlchemyAdapters.
-        # If we need mixed types later, you can add a "type" field in the config JSON.
-        for alias, uri in db_configs.items():
-            physicals[alias] = SQLAlchemyAdapter(uri)
+        # Each attachment is a URI (SQLAlchemy) or a dict:
+        # {"uri": ..., "type": <registered db adapter>, "fetch_batch_size": ...,
+        #  plus adapter options such as "pool_size" or "statement_timeout"}
+        # SQLAlchemy children default to the DB_POOL_* settings.
+        child_batch_sizes = {}
+        pool_defaults = SQLAlchemyAdapter.pool_options(settings)
+        # Aliases with the same URI and options share one adapter (and engine/pool)
+        shared: Dict[str, IDatabaseConnector] = {}
+        for alias, config in db_configs.items():
+            physicals[alias], batch_size = cls._create_child(
+                alias, config, pool_defaults, shared
+            )
+            if batch_size:
+                child_batch_sizes[alias] = batch_size
 
         # Get Virtual Schema & Relationships
         virtual_map = getattr(settings, "VIRTUAL_SCHEMA", {})
         rels = getattr(settings, "VIRTUAL_RELATIONSHIPS", [])
 
         return cls(
-            adapters=physicals, table_mapping=virtual_map, relationship_graph=rels
+            adapters=physicals,
+            table_mapping=virtual_map,
+            relationship_graph=rels,
+            fetch_batch_size=getattr(settings, "FEDERATED_FETCH_BATCH_SIZE", 1000),
+            memory_budget_mb=getattr(settings, "FEDERATED_MEMORY_BUDGET_MB", 256),
+            spill_dir=getattr(settings, "FEDERATED_SPILL_DIR", None),
+            max_workers=getattr(settings, "FEDERATED_MAX_WORKERS", 4),
+            semi_join_max_keys=getattr(settings, "FEDERATED_SEMI_JOIN_MAX_KEYS", 10000),
+            semi_join_chunk_size=getattr(settings, "FEDERATED_SEMI_JOIN_CHUNK_SIZE", 500),
+            statistics_enabled=getattr(settings, "FEDERATED_STATISTICS_ENABLED", True),
+            statistics_ttl_seconds=getattr(
+                settings, "FEDERATED_STATISTICS_TTL_SECONDS", 600
+            ),
+            attach_sqlite=getattr(settings, "FEDERATED_ATTACH_SQLITE", True),
+            plan_cache_size=getattr(settings, "FEDERATED_PLAN_CACHE_SIZE", 256),
+            max_transfer_rows=getattr(settings, "FEDERATED_MAX_TRANSFER_ROWS", None),
+            materialized_tables=getattr(settings, "FEDERATED_MATERIALIZED_TABLES", []),
+            materialized_ttl_seconds=getattr(
+                settings, "FEDERATED_MATERIALIZED_TTL_SECONDS", 300
+            ),
+            materialized_path=getattr(settings, "FEDERATED_MATERIALIZED_PATH", None),
+            child_fetch_batch_sizes=child_batch_sizes,
+            join_processes=getattr(settings, "FEDERATED_JOIN_PROCESSES", 0),
+            join_parallel_min_rows=getattr(
+                settings, "FEDERATED_JOIN_PARALLEL_MIN_ROWS", 200000
+            ),
         )
 
+    @staticmethod
+    def _create_child(
+        alias: str,
+        config: Any,
+        pool_defaults: Optional[Dict[str, Any]] = None,
+        shared: Optional[Dict[str, IDatabaseConnector]] = None,
+    ) -> Tuple[IDatabaseConnector, Optional[int]]:
+        """
+        Builds one child adapter from its attachment config, or returns the one
+        already built (in shared) for an identical uri/type/options.
+        """
+        if isinstance(config, str):
+            config = {"uri": config}
+        options = dict(config)
+        uri = options.pop("uri", None)
+        if not uri:
+            raise ValueError(f"Federated attachment '{alias}' has no 'uri'")
+        db_type = options.pop("type", "sqlalchemy")
+        batch_size = options.pop("fetch_batch_size", None)
+        if db_type == "sqlalchemy" and pool_defaults:
+            options = {**pool_defaults, **options}
+
+        # In-memory databases are private to their adapter: never shared
+        in_memory = uri == ":memory:"
+        if not in_memory and db_type == "sqlalchemy":
+            url = make_url(uri)
+            in_memory = url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+        elif not in_memory:
+            in_memory = uri.rstrip("/") in ("sqlite:", "file::memory:") or "mode=memory" in uri
+        if in_memory:
+            shared = None
+        key = json.dumps([db_type, uri, options], sort_keys=True, default=str)
+        if shared is not None and key in shared:
+            logger.info(f"[Federation] Attachment '{alias}' shares the engine of '{uri}'")
+            return shared[key], batch_size
+
+        adapter_class = ProviderRegistry.get_db_class(db_type)
+        try:
+            adapter = adapter_class(uri, **options)
+        except TypeError as e:
+            raise ValueError(
+                f"Unsupported options {sorted(options)} for '{db_type}' "
+                f"attachment '{alias}': {e}"
+            ) from e
+        if shared is not None:
+            shared[key] = adapter
+        return adapter, batch_size
+
     def __init__(
         self,
         adapters: Dict[str, IDatabaseConnector],
         table_mapping: Dict[str, str],  # "virtual_table" -> "db_alias.physical_table"
         relationship_graph: List[Tuple] = [],
+        fetch_batch_size: int = 1000,
+        memory_budget_mb: float = 256,
+        spill_dir: Optional[str] = None,
+        max_workers: int = 4,
+        semi_join_max_keys: int = 10000,
+        semi_join_chunk_size: int = 500,
+        statistics_enabled: bool = True,
+        statistics_ttl_seconds: float = 600,
+        attach_sqlite: bool = True,
+        plan_cache_size: int = 256,
+        max_transfer_rows: Optional[int] = None,
+        materialized_tables: Optional[List[str]] = None,
+        materialized_ttl_seconds: float = 300,
+        materialized_path: Optional[str] = None,
+        child_fetch_batch_sizes: Optional[Dict[str, int]] = None,
+        join_processes: int = 0,
+        join_parallel_min_rows: int = 200000,
     ):
         self.adapters = adapters
         self.table_mapping = table_mapping
@@ -69,6 +219,113 @@ class FederatedAdapter(IDatabaseConnector):
             self.table_to_db[v_table] = db_alias
             self.table_to_physical[v_table] = p_table
 
+        # Streaming execution: rows are pulled from children in batches and
+        # staged in a local SQLite DB that spills to disk above the budget.
+        self.fetch_batch_size = fetch_batch_size
+        # db alias -> batch size for children configured with their own
+        self.child_fetch_batch_sizes = child_fetch_batch_sizes or {}
+        self.memory_budget_bytes = int(memory_budget_mb * 1024 * 1024)
+        self.spill_dir = spill_dir
+        # Child scans of one query are fetched concurrently on this many threads
+        self.max_workers = max_workers
+        # Semi-join reduction: push at most this many keys, IN lists of chunk size
+        self.semi_join_max_keys = semi_join_max_keys
+        self.semi_join_chunk_size = semi_join_chunk_size
+
+        # All children of a query are SQLite files: ATTACH them and let SQLite join
+        self.attach_sqlite = attach_sqlite
+
+        # Big single-step joins are hash-partitioned over this many processes
+        # (0/1 = disabled), when the plan expects to fetch at least min_rows
+        self.join_processes = join_processes
+        self.join_parallel_min_rows = join_parallel_min_rows
+        self._join_pools: List[ProcessPoolExecutor] = []
+
+        # Reject cross-DB queries estimated to fetch more rows (None = no limit)
+        self.max_transfer_rows = max_transfer_rows
+
+        # Repeated queries skip parsing and planning (bumped version = new keys).
+        # Plans carry cost-based estimates: they expire with the statistics.
+        self.plan_cache = PlanCache(
+            plan_cache_size,
+            ttl_seconds=statistics_ttl_seconds if statistics_enabled else None,
+        )
+        self.schema_version = 0
+
+        # Cache: "virtual_table" -> column names (parsed from the child schema)
+        self._columns_cache: Dict[str, List[str]] = {}
+        # Cache: "virtual_table" -> {lower column name: declared SQLite type}
+        self._types_cache: Dict[str, Dict[str, Optional[str]]] = {}
+
+        # Row counts / NDVs for cost-based join ordering (None = written order)
+        self.statistics = (
+            StatisticsCollector(
+                adapters,
+                self.table_to_db,
+                self.table_to_physical,
+                ttl_seconds=statistics_ttl_seconds,
+            )
+            if statistics_enabled
+            else None
+        )
+
+        # Local copies of small dimension tables, refreshed when their source changes
+        unknown = set(materialized_tables or []) - set(table_mapping)
+        if unknown:
+            raise ValueError(f"Cannot materialize unknown virtual tables: {sorted(unknown)}")
+        self.materialized = (
+            MaterializedTableCache(
+                materialized_tables,
+                adapters,
+                self.table_to_db,
+                self.table_to_physical,
+                column_lookup=self._get_table_columns,
+                type_lookup=self._get_column_types,
+                ttl_seconds=materialized_ttl_seconds,
+                path=materialized_path,
+                batch_size=fetch_batch_size,
+            )
+            if materialized_tables
+            else None
+        )
+
+        self.planner = FederatedPlanner(
+            table_to_db=self.table_to_db,
+            table_to_physical=self.table_to_physical,
+            column_lookup=self._get_table_columns,
+            statistics=self.statistics,
+        )
+        # Single-database CTEs / subqueries / UNION branches are sent to their child whole
+        self.decomposer = ScopeDecomposer(
+            self.table_to_db, self._get_table_columns, self._to_physical
+        )
+
+    def refresh_statistics(self, table_name: Optional[str] = None) -> None:
+        """Drops cached statistics (of one virtual table, or all of them)."""
+        if self.statistics is not None:
+            self.statistics.invalidate(table_name)
+        # Cached plans were costed with the old numbers
+        self.plan_cache.clear()
+
+    def refresh_schema(self) -> None:
+        """Call after the virtual or physical schema changed: drops every cached plan."""
+        self.schema_version += 1
+        self._columns_cache.clear()
+        self._types_cache.clear()
+        self.plan_cache.clear()
+        self.refresh_statistics()
+        self.refresh_materialized()
+        for adapter in self.adapters.values():
+            # Children that cache their reflected schema
+            invalidate = getattr(adapter, "invalidate_schema", None)
+            if invalidate is not None:
+                invalidate()
+
+    def refresh_materialized(self, table_name: Optional[str] = None) -> None:
+        """Forces materialized tables (one, or all of them) to reload on next use."""
+        if self.materialized is not None:
+            self.materialized.invalidate(table_name)
+
     def get_all_table_names(self) -> List[str]:
         # Expose ONLY virtual names to the LLM
         return list(self.table_mapping.keys())
@@ -97,6 +354,50 @@ class FederatedAdapter(IDatabaseConnector):
 
         return schema
 
+    def _get_table_columns(self, table_name: str) -> List[str]:
+        """
+        Column names of a virtual table, parsed from the child's schema description.
+        Used by the planner to resolve unqualified columns.
+        """
+        if table_name not in self._columns_cache:
+            db_alias = self.table_to_db.get(table_name)
+            if not db_alias:
+                return []
+
+            real_table = self.table_to_physical[table_name]
+            raw_schema = self.adapters[db_alias].get_table_schema(real_table)
+
+            columns = []
+            types = {}
+            for line in raw_schema.splitlines()[1:]:
+                line = line.strip()
+                # Column lines come first: "<name> <TYPE>"
+                if not line or line.startswith("--"):
+                    break
+                name, _, declared = line.partition(" ")
+                columns.append(name)
+                types[name.lower()] = sqlite_affinity(declared.strip())
+            self._columns_cache[table_name] = columns
+            self._types_cache[table_name] = types
+
+        return self._columns_cache[table_name]
+
+    def _get_column_types(self, table_name: str) -> Dict[str, Optional[str]]:
+        """Declared SQLite type (affinity) of each column of a virtual table."""
+        self._get_table_columns(table_name)
+        return self._types_cache.get(table_name, {})
+
+    def _declared_types(
+        self, scan: TableScan, columns: Optional[List[str]] = None
+    ) -> List[Optional[str]]:
+        """Types of the fetched columns; pushed aggregates get none."""
+        types = self._get_column_types(scan.virtual_table)
+        computed = {name.lower() for name, _ in scan.aggregates}
+        return [
+            None if c.lower() in computed else types.get(c.lower())
+            for c in columns or scan.columns or []
+        ]
+
     def get_schema(self) -> str:
         return "\n\n".join(
             [self.get_table_schema(t) for t in self.get_all_table_names()]
@@ -106,9 +407,106 @@ class FederatedAdapter(IDatabaseConnector):
         """
         The Core Logic: Parse -> Plan -> Execute -> Join
         """
-        # Parse SQL to find used tables
+        return self._execute(query, None)
+
+    def execute_cancellable(
+        self, query: str, cancel: CancellationToken
+    ) -> Generator[Any, None, None]:
+        """
+        execute_query interrupted on every path once the token is stopped:
+        child queries, child fetch threads, the staging / ATTACH SQLite work.
+        """
+        return self._execute(query, cancel)
+
+    def _execute(
+        self, query: str, cancel: Optional[CancellationToken]
+    ) -> Generator[Any, None, None]:
+        route = self._route(query)
+
+        # CASE A: Single Database Query (Optimization)
+        if route.kind == "single":
+            target_db = next(iter(route.required_dbs))
+            logger.info(f"[Federation] Routing to '{target_db}': {route.physical_sql}")
+
+            # Execute directly on the physical adapter
+            adapter = self.adapters[target_db]
+            if cancel is None:
+                return adapter.execute_query(route.physical_sql)
+            return adapter.execute_cancellable(route.physical_sql, cancel)
+
+        # CASE B: Cross-Database Query
+        if route.kind == "attached":
+            return self._execute_attached(route.physical_sql, route.files, cancel)
+
+        # Fail fast (before anything is fetched) on queries that would move too much data
+        transfer = route.plan.estimated_transfer_rows()
+        if self.max_transfer_rows and transfer and transfer > self.max_transfer_rows:
+            raise TransferTooLarge(
+                f"Query would fetch about {transfer:.0f} rows from the federated databases "
+                f"(limit {self.max_transfer_rows}). Add filters or a LIMIT."
+            )
+
+        logger.info(
+            f"[Federation] Detected Cross-DB Join across {route.required_dbs}. Executing in Memory..."
+        )
+        return self._execute_cross_db_join(route.expression, plan=route.plan, cancel=cancel)
+
+    def explain(self, query: str) -> PlanNode:
+        """
+        Dry run: returns the plan tree of a query without executing it
+        (children only receive statistics queries).
+        """
+        route = self._route(query)
+
+        if route.kind == "single":
+            target_db = next(iter(route.required_dbs))
+            return PlanNode(
+                "RemoteQuery", {"database": target_db, "sql": route.physical_sql}
+            )
+        if route.kind == "attached":
+            return PlanNode(
+                "AttachedSQLite",
+                {
+                    "databases": {db: file.path for db, file in route.files.items()},
+                    "sql": route.physical_sql,
+                },
+            )
+        return explain_plan(
+            route.plan,
+            materialized=self.materialized.tables if self.materialized is not None else (),
+            join_processes=(
+                self.join_processes if self._use_partitioned_join(route.plan) else None
+            ),
+        )
+
+    def single_database_route(self, query: str) -> Optional[Tuple[str, str]]:
+        """(child alias, physical SQL) when the query runs whole on one child, else None."""
+        route = self._route(query)
+        if route.kind != "single":
+            return None
+        return next(iter(route.required_dbs)), route.physical_sql
+
+    def _route(self, query: str) -> Route:
+        """
+        Parsed query, routing decision and physical SQL, cached per normalized
+        SQL until the schema or the statistics it was costed with change.
+        """
+        route = self.plan_cache.get(self._route_key(query))
+        if route is None:
+            route = self._plan_route(query)
+            # Planning may itself have refreshed expired statistics
+            self.plan_cache.put(self._route_key(query), route)
+        return route
+
+    def _route_key(self, query: str) -> Tuple[str, int, int]:
+        generation = self.statistics.generation if self.statistics is not None else 0
+        return normalize_sql(query), self.schema_version, generation
+
+    def _plan_route(self, query: str) -> Route:
+        # Parse SQL to find used tables (CTE references are not tables)
         parsed = sqlglot.parse_one(query)
-        tables = [t.name for t in parsed.find_all(exp.Table)]
+        cte_names = {cte.alias for cte in parsed.find_all(exp.CTE)}
+        tables = [t.name for t in parsed.find_all(exp.Table) if t.name not in cte_names]
 
         if not tables:
             raise ValueError("No tables found in query")
@@ -120,29 +518,51 @@ class FederatedAdapter(IDatabaseConnector):
                 raise ValueError(f"Unknown virtual table: {t}")
             required_dbs.add(self.table_to_db[t])
 
-        # Routing Logic
-
-        # CASE A: Single Database Query (Optimization)
         if len(required_dbs) == 1:
-            target_db = list(required_dbs)[0]
-            physical_sql = self._transpile_to_physical(parsed, target_db)
-            print(f"[Federation] Routing to '{target_db}': {physical_sql}")
+            target_db = next(iter(required_dbs))
+            return Route(
+                kind="single",
+                expression=parsed,
+                required_dbs=required_dbs,
+                physical_sql=self._transpile_to_physical(parsed, target_db),
+            )
 
-            # Execute directly on the physical adapter
-            return self.adapters[target_db].execute_query(physical_sql)
+        if self.attach_sqlite and len(required_dbs) <= SQLITE_MAX_ATTACHED:
+            # Children that cannot keep their settings when ATTACHed go federated
+            files = {db: attached_file(db, self.adapters[db]) for db in required_dbs}
+            if all(files.values()):
+                return Route(
+                    kind="attached",
+                    expression=parsed,
+                    required_dbs=required_dbs,
+                    physical_sql=self._transpile_to_physical(
+                        parsed, target_db="", qualify=True
+                    ),
+                    files=files,
+                )
+
+        # Per-scope decomposition: single-database subtrees become derived tables
+        expression, derived = self.decomposer.decompose(parsed)
+        return Route(
+            kind="federated",
+            expression=expression,
+            required_dbs=required_dbs,
+            plan=self.planner.with_derived(derived).plan(expression),
+        )
 
-        # CASE B: Cross-Database Query
-        # For MVP: We assume a simple JOIN between two tables across DBs.
-        # Implementation: Fetch both datasets -> Join in Pandas
-        else:
-            logger.info(
-                f"[Federation] Detected Cross-DB Join across {required_dbs}. Executing in Memory..."
-            )
-            return self._execute_cross_db_join(parsed, tables)
+    def _transpile_to_physical(
+        self, expression: exp.Expression, target_db: str, qualify: bool = False
+    ) -> str:
+        # Generate SQL for the specific dialect (assuming standard SQL for now)
+        # Force dialect="sqlite" to use double quotes (") instead of backticks (`)
+        return self._to_physical(expression, target_db, qualify).sql(dialect="sqlite")
 
-    def _transpile_to_physical(self, expression: exp.Expression, target_db: str) -> str:
+    def _to_physical(
+        self, expression: exp.Expression, target_db: str, qualify: bool = False
+    ) -> exp.Expression:
         """
         Rewrites the AST: Replaces 'virtual_table' with 'physical_table'
+        (or 'db_alias.physical_table' when qualify is set, for ATTACHed databases)
         """
 
         def transformer(node):
@@ -150,111 +570,374 @@ class FederatedAdapter(IDatabaseConnector):
                 virtual_name = node.name
                 if virtual_name in self.table_to_physical:
                     # Replace with real name (e.g., 'customers' -> 'tbl_customers_v1')
+                    # Keep the query alias, or alias by the virtual name, so that
+                    # qualified column references still resolve
                     return exp.Table(
                         this=exp.Identifier(
                             this=self.table_to_physical[virtual_name], quoted=False
-                        )
+                        ),
+                        db=(
+                            exp.to_identifier(self.table_to_db[virtual_name])
+                            if qualify
+                            else None
+                        ),
+                        alias=exp.TableAlias(
+                            this=exp.to_identifier(node.alias or virtual_name)
+                        ),
                     )
             return node
 
-        new_expression = expression.transform(transformer)
-        # Generate SQL for the specific dialect (assuming standard SQL for now)
-        # Force dialect="sqlite" to use double quotes (") instead of backticks (`)
-        return new_expression.sql(dialect="sqlite")
+        return expression.transform(transformer)
 
-    def _execute_cross_db_join(self, expression, tables) -> Generator[Any, None, None]:
+    def _execute_attached(
+        self,
+        sql: str,
+        files: Dict[str, AttachedFile],
+        cancel: Optional[CancellationToken] = None,
+    ) -> Generator[Any, None, None]:
         """
-        Naive Implementation of In-Memory Join.
-        1. Decompose query into "SELECT * FROM table" for each table.
-        2. Load into Pandas.
-        3. Perform Merge.
+        Zero-copy path: every child is a SQLite file, so they are ATTACHed
+        (read-only, with their immutable flag and PRAGMAs) to one connection
+        under their alias and SQLite's own planner runs the whole query.
+        The shortest query_timeout of the children bounds it.
         """
-        # This is complex to generalize. For the MVP, we assume the user
-        # requested a simple join. We will fetch the raw tables involved.
+        timeouts = [file.query_timeout for file in files.values() if file.query_timeout]
+        conn = sqlite3.connect(":memory:", uri=True, check_same_thread=False)
+        try:
+            with bounded(cancel, min(timeouts) if timeouts else None) as token:
+                interrupt_on(conn, token)
+                for db_alias, file in files.items():
+                    schema = quote_identifier(db_alias)
+                    mode = "mode=ro&immutable=1" if file.immutable else "mode=ro"
+                    conn.execute(
+                        f"ATTACH DATABASE ? AS {schema}", (f"{Path(file.path).as_uri()}?{mode}",)
+                    )
+                    for name, value in file.pragmas.items():
+                        conn.execute(f"PRAGMA {schema}.{name} = {value}")
+                    if file.temp_store is not None:
+                        conn.execute(f"PRAGMA temp_store = {file.temp_store}")
+
+                logger.info(f"[Federation] Running on attached SQLite databases: {sql}")
+                with raise_cancelled(token):
+                    cursor = conn.execute(sql)
+                    columns = (
+                        [desc[0] for desc in cursor.description] if cursor.description else []
+                    )
+                    for row in cursor:
+                        yield dict(zip(columns, row))
+        finally:
+            conn.close()
 
-        data_frames = {}
+    def _execute_cross_db_join(
+        self,
+        expression,
+        plan: Optional[QueryPlan] = None,
+        cancel: Optional[CancellationToken] = None,
+    ) -> Generator[Any, None, None]:
+        """
+        Cross-DB execution.
+        1. Decompose query into one scan per table (filters and columns pushed down).
+        2. INNER/LEFT equi-joins run on the native hash join engine:
+           joined tables are hashed, the FROM table is streamed through them.
+        3. Anything else is staged in a local SQLite DB and the original query runs there.
+        """
+        plan = plan or self.planner.plan(expression)
+        fetch_scan = partial(self._fetch_scan, cancel=cancel)
+        if plan.top_n_alias is None:
+            yield from self._execute_plan(plan, fetch_scan, cancel)
+            return
+
+        # Top-N pushed to one child: the output is small, check it before yielding
+        top_scan = plan.scans[plan.alias_map[plan.top_n_alias]]
+        fetched = [0]
+
+        def fetch(scan: TableScan, extra_conditions=None):
+            batches = fetch_scan(scan, extra_conditions)
+            return self._count_rows(batches, fetched) if scan is top_scan else batches
+
+        rows = list(self._execute_plan(plan, fetch, cancel))
+        if len(rows) < plan.top_n_rows and fetched[0] >= top_scan.limit:
+            # Joins/filters dropped some of the top rows: the child may hold more
+            logger.info(
+                f"[Federation] Top-{top_scan.limit} of '{top_scan.virtual_table}' "
+                f"gave {len(rows)} rows. Re-running without the pushed LIMIT."
+            )
+            planner = self.planner.with_derived(plan.derived)
+            plan = planner.plan(expression, push_top_n=False)
+            rows = list(self._execute_plan(plan, fetch_scan, cancel))
+        yield from rows
 
-        for t in tables:
-            db_alias = self.table_to_db[t]
-            real_table = self.table_to_physical[t]
-            adapter = self.adapters[db_alias]
-
-            # Optimization: In a real system, you'd push down filters (WHERE clauses) here!
-            print(f"  -> Fetching data from {db_alias}.{real_table}...")
-            rows = list(adapter.execute_query(f"SELECT * FROM {real_table} LIMIT 1000"))
-
-            safe_dicts = []
-            for row in rows:
-                # SQLAlchemy 1.4+ support
-                if hasattr(row, "_mapping"):
-                    safe_dicts.append(dict(row._mapping))
-                # Legacy SQLAlchemy support
-                elif hasattr(row, "_asdict"):
-                    safe_dicts.append(row._asdict())
-                # Fallback (unsafe)
-                else:
-                    safe_dicts.append(dict(row))
-
-            df = pd.DataFrame(safe_dicts) if safe_dicts else pd.DataFrame()
-
-            # Get columns (Simplified: simplistic column fetch or assume dictionary cursor)
-            # Assuming adapter yields dictionaries or Row objects we can convert
-            # If adapter yields tuples, we need column names from schema.
-            # For robustness, we assume RowProxy (SQLAlchemy) or similar.
-            data_frames[t] = df
-
-        # Now we need to JOIN based on the query 'ON' clause.
-        # Parsing the JOIN conditions from 'expression' is tricky in vanilla Python.
-        # Strategy: Let PandasSQL (sqldf) or DuckDB handle the final dataframe join
-        # OR manual merge if simple.
-
-        # RE-ENABLE DUCKDB FOR IN-MEMORY ONLY?
-        # User said "No DuckDB". So we use `pandasql` or native pandas merge.
-        # But `pandasql` is slow.
-
-        # Let's assume the LLM gave us a valid SQL. We can try to use `sqlite3` in-memory
-        # to act as the joiner if we dump the dataframes there.
-        # This is standard Python library, no extra dependencies.
-
-        import sqlite3
-
-        conn = sqlite3.connect(":memory:")
-        for tbl_name, df in data_frames.items():
-            if not df.empty:
-                df.to_sql(tbl_name, conn, index=False)
+    def _execute_plan(
+        self,
+        plan: QueryPlan,
+        fetch: Callable[..., Iterable[RowBatch]],
+        cancel: Optional[CancellationToken] = None,
+    ) -> Generator[Any, None, None]:
+        if plan.join_steps is not None:
+            if self._use_partitioned_join(plan):
+                executor = PartitionedHashJoinExecutor(
+                    plan,
+                    pools=self._get_join_pools(),
+                    **self._executor_options(fetch, cancel),
+                )
+            else:
+                executor = HashJoinExecutor(plan, **self._executor_options(fetch, cancel))
+            try:
+                executor.build()
+            except BuildSideTooLarge as e:
+                logger.info(f"[Federation] {e}. Falling back to the staged SQLite join.")
             else:
-                logger.warning(f"Table {tbl_name} is empty.")
+                logger.info("[Federation] Executing with native hash join.")
+                yield from executor.execute()
+                return
+
+        yield from self._execute_staged(plan, fetch, cancel)
+
+    def _executor_options(
+        self,
+        fetch: Callable[..., Iterable[RowBatch]],
+        cancel: Optional[CancellationToken] = None,
+    ) -> Dict[str, Any]:
+        return dict(
+            cancel=cancel,
+            fetch=fetch,
+            memory_budget_bytes=self.memory_budget_bytes,
+            fetch_batch_size=self.fetch_batch_size,
+            spill_dir=self.spill_dir,
+            max_workers=self.max_workers,
+            semi_join_max_keys=self.semi_join_max_keys,
+            semi_join_chunk_size=self.semi_join_chunk_size,
+            declared_types=self._declared_types,
+        )
+
+    def _use_partitioned_join(self, plan: QueryPlan) -> bool:
+        if self.join_processes <= 1 or plan.top_n_alias is not None:
+            return False
+        if not PartitionedHashJoinExecutor.supports(plan):
+            return False
+        if self.join_parallel_min_rows <= 0:
+            return True
+        transfer = plan.estimated_transfer_rows()
+        return transfer is not None and transfer >= self.join_parallel_min_rows
+
+    def _get_join_pools(self) -> List[ProcessPoolExecutor]:
+        """
+        Worker processes of partitioned joins, one single-process pool each so
+        that a partition's tasks always reach the process holding its build rows.
+        Started on first use and reused.
+        """
+        if not self._join_pools:
+            # Forking a process that runs fetch threads is unsafe
+            context = multiprocessing.get_context("spawn")
+            self._join_pools = [
+                ProcessPoolExecutor(max_workers=1, mp_context=context)
+                for _ in range(self.join_processes)
+            ]
+        return self._join_pools
+
+    def close(self) -> None:
+        """Stops the join worker processes and closes the materialized cache."""
+        for pool in self._join_pools:
+            pool.shutdown(cancel_futures=True)
+        self._join_pools = []
+        if self.materialized is not None:
+            self.materialized.close()
+
+    def _execute_staged(
+        self,
+        plan: QueryPlan,
+        fetch: Callable[..., Iterable[RowBatch]],
+        cancel: Optional[CancellationToken] = None,
+    ) -> Generator[Any, None, None]:
+        """
+        Streaming In-Memory Join.
+        Fetches every scan concurrently and streams the batches, as they arrive,
+        into a local SQLite staging area (spills to a temporary file when the
+        memory budget is exceeded), then runs the original query against it.
+        """
+        expression = plan.expression
+        staging = StagingArea(self.memory_budget_bytes, spill_dir=self.spill_dir, cancel=cancel)
 
-        # Execute the original query against this temporary memory DB
-        # Since table names in memory match the virtual names, query works as-is!
         try:
-            # We must output SQLite dialect for the Python sqlite3 driver
-            sql_for_memory = expression.sql(dialect="sqlite")
+            with raise_cancelled(cancel):
+                self._stage_scans(staging, list(plan.scans.values()), fetch, cancel)
+
+                # Execute the original query against the staging DB
+                # Since staged table names match the virtual names, query works as-is!
+                # We must output SQLite dialect for the Python sqlite3 driver
+                sql_for_memory = expression.sql(dialect="sqlite")
+
+                # SANITY CHECK: If sqlglot behaves weirdly, manually clean it
+                if "`" in sql_for_memory:
+                    sql_for_memory = sql_for_memory.replace("`", '"')
+
+                logger.info(f"[Federation] Executing In-Memory SQL:\n{sql_for_memory}")
+
+                cursor = staging.execute(sql_for_memory)
 
-            # SANITY CHECK: If sqlglot behaves weirdly, manually clean it
-            if "`" in sql_for_memory:
-                sql_for_memory = sql_for_memory.replace("`", '"')
+                # Yield dictionary-like rows to match IDatabaseConnector expectation
+                columns = (
+                    [desc[0] for desc in cursor.description] if cursor.description else []
+                )
+                for row in cursor:
+                    # Yield a dict so the CLI loop can print it nicely
+                    yield dict(zip(columns, row))
 
-            logger.info(f"[Federation] Executing In-Memory SQL:\n{sql_for_memory}")
-            
-            cursor = conn.execute(sql_for_memory)
+        except Exception:
+            logger.exception("[Federation] Staged SQLite join failed.")
+            raise
+        finally:
+            staging.close()
 
-            # Yield dictionary-like rows to match IDatabaseConnector expectation
-            columns = (
-                [desc[0] for desc in cursor.description] if cursor.description else []
+    def _fetch_scan(
+        self,
+        scan: TableScan,
+        extra_conditions: Optional[List[exp.Expression]] = None,
+        cancel: Optional[CancellationToken] = None,
+    ) -> Iterable[RowBatch]:
+        """Issues one scan against its child adapter and returns its batches."""
+        batch_size = self.child_fetch_batch_sizes.get(scan.db_alias, self.fetch_batch_size)
+        if (
+            self.materialized is not None
+            and scan.source is None
+            and scan.virtual_table in self.materialized
+        ):
+            # Same pushed SQL, answered by the local copy (refreshed if the source changed)
+            local_sql = scan.to_sql(
+                extra_conditions=extra_conditions, table=scan.virtual_table
             )
-            for row in cursor:
-                # Yield a dict so the CLI loop can print it nicely
-                yield dict(zip(columns, row))
+            logger.debug(f"[Federation] Reading materialized {scan.virtual_table}: {local_sql}")
+            return self.materialized.query(scan.virtual_table, local_sql, batch_size)
+
+        adapter = self.adapters[scan.db_alias]
+
+        # Predicate + projection pushdown: only the needed slice is transferred
+        physical_sql = scan.to_sql(extra_conditions=extra_conditions)
+        logger.debug(f"[Federation] Fetching data from {scan.db_alias}: {physical_sql}")
+        return fetch_batches(adapter, physical_sql, batch_size, cancel)
 
-        except Exception as e:
-            print(f"In-Memory Join Failed: {e}")
-            raise e
+    @staticmethod
+    def _count_rows(
+        batches: Iterable[RowBatch], counter: List[int]
+    ) -> Generator[RowBatch, None, None]:
+        try:
+            for batch in batches:
+                counter[0] += len(batch)
+                yield batch
         finally:
-            conn.close()
+            if hasattr(batches, "close"):
+                batches.close()
+
+    def _stage_scans(
+        self,
+        staging: StagingArea,
+        scans: List[TableScan],
+        fetch: Callable[..., Iterable[RowBatch]],
+        cancel: Optional[CancellationToken] = None,
+    ) -> None:
+        """Streams the child scans into the staging area, batch by batch."""
+        reader = ParallelScanReader(
+            {scan.virtual_table: fetch(scan) for scan in scans},
+            max_workers=self.max_workers,
+            cancel=cancel,
+        )
+
+        by_table = {scan.virtual_table: scan for scan in scans}
+        columns = {scan.virtual_table: scan.columns for scan in scans}
+        row_counts = {scan.virtual_table: 0 for scan in scans}
+        for table, batch in reader:
+            if row_counts[table] == 0:
+                if columns[table] is None:
+                    # Unknown schema (SELECT *): take the names from the cursor
+                    if batch.columns is None:
+                        raise ValueError(
+                            f"Child rows of '{table}' carry no column names; schema is required."
+                        )
+                    columns[table] = batch.columns
+                staging.create_table(
+                    table,
+                    columns[table],
+                    self._declared_types(by_table[table], columns[table]),
+                )
+            staging.insert_batch(table, batch.rows)
+            row_counts[table] += len(batch)
+
+        for table, row_count in row_counts.items():
+            if row_count == 0:
+                logger.warning(f"Table {table} is empty.")
+                if columns[table] is None:
+                    raise ValueError(
+                        f"Cannot determine the columns of empty table '{table}'"
+                    )
+                staging.create_table(
+                    table,
+                    columns[table],
+                    self._declared_types(by_table[table], columns[table]),
+                )
+
+        if staging.spilled:
+            logger.info(f"[Federation] Staged {sum(row_counts.values())} rows on disk.")
 
     def execute_ddl(self, query: str) -> None:
         raise NotImplementedError("Federated DDL not supported yet.")
 
     def __init_subclass__(cls):
         return super().__init_subclass__()
+
+
+@ProviderRegistry.register_async_db("federated")
+class AsyncFederatedAdapter(ThreadBridgeAdapter):
+    """
+    Federated queries for asyncio callers.
+
+    Cross-database plans (child fetches, joins, staging) run in the synchronous
+    engine on the bridge's shared worker threads, a batch of rows at a time.
+    Queries routed whole to one child go to that child's async adapter when
+    one is given (e.g. AsyncSQLAlchemyAdapter on asyncpg) and hold no thread.
+    """
+
+    @classmethod
+    def create(cls, settings: Settings) -> "AsyncFederatedAdapter":
+        return cls(
+            FederatedAdapter.create(settings),
+            max_workers=getattr(settings, "DB_ASYNC_WORKERS", 8),
+            fetch_batch_size=getattr(settings, "FEDERATED_FETCH_BATCH_SIZE", 1000),
+        )
+
+    def __init__(
+        self,
+        adapter: FederatedAdapter,
+        children: Optional[Dict[str, IAsyncDatabaseConnector]] = None,
+        **kwargs,
+    ):
+        """
+        children: async adapters of (some of) the federated children, by alias.
+        kwargs: ThreadBridgeAdapter options (executor, max_workers, fetch_batch_size).
+        """
+        super().__init__(adapter, **kwargs)
+        self.children = children or {}
+
+    async def execute_query(
+        self, query: str, cancel: Optional[CancellationToken] = None
+    ) -> AsyncIterator[Any]:
+        if self.children:
+            # Planning is cached, so the bridge below does not parse the query again
+            route = await self._run(self.adapter.single_database_route, query)
+            if route is not None and route[0] in self.children:
+                target_db, physical_sql = route
+                logger.info(f"[Federation] Routing to async '{target_db}': {physical_sql}")
+                rows = self.children[target_db].execute_query(physical_sql, cancel)
+                async with aclosing(rows):
+                    async for row in rows:
+                        yield row
+                return
+
+        rows = super().execute_query(query, cancel)
+        async with aclosing(rows):
+            async for row in rows:
+                yield row
+
+    async def close(self) -> None:
+        for child in self.children.values():
+            await child.close()
+        await super().close()
@@ -0,0 +1,139 @@
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from nlp_sql_engine.core.domain.cancellation import CancellationToken
+from nlp_sql_engine.core.domain.models import RowBatch
+from nlp_sql_engine.core.interfaces.db import IDatabaseConnector
+from nlp_sql_engine.infra.database.federation.staging import iter_batches
+from nlp_sql_engine.infra.database.sqlite_adapter import SQLiteAdapter
+
+
+def dialect_of(adapter: IDatabaseConnector) -> str:
+    """Best-effort dialect name of a child adapter ('sqlite', 'postgresql', ...)."""
+    engine = getattr(adapter, "engine", None)
+    if engine is not None:
+        return engine.dialect.name
+    if isinstance(adapter, SQLiteAdapter):
+        return "sqlite"
+    return ""
+
+
+def sqlite_file_of(adapter: IDatabaseConnector) -> Optional[str]:
+    """Absolute path of a child backed by a local SQLite file, else None."""
+    engine = getattr(adapter, "engine", None)
+    if engine is not None:
+        if engine.dialect.name != "sqlite":
+            return None
+        path = engine.url.database
+    elif isinstance(adapter, SQLiteAdapter):
+        path = adapter.connection_string
+    else:
+        return None
+
+    if not path or path == ":memory:" or path.startswith("file:"):
+        return None
+    path = os.path.abspath(path)
+    return path if os.path.isfile(path) else None
+
+
+# Schema names SQLite keeps for itself: no child can be ATTACHed under them
+RESERVED_SCHEMAS = {"main", "temp"}
+_TEMP_STORES = {"DEFAULT", "FILE", "MEMORY"}
+
+
+@dataclass
+class AttachedFile:
+    """A child ATTACHed on the zero-copy path, with the settings carried over."""
+
+    path: str
+    immutable: bool = False
+    # Per-schema PRAGMAs of the child (cache_size, mmap_size)
+    pragmas: Dict[str, int] = field(default_factory=dict)
+    temp_store: Optional[str] = None
+    query_timeout: Optional[float] = None
+
+
+def attached_file(alias: str, adapter: IDatabaseConnector) -> Optional[AttachedFile]:
+    """
+    How a child is ATTACHed under its alias, or None when it cannot be without
+    losing its configuration: not a local SQLite file, a reserved alias, or
+    settings only its own connections apply (init statements, URI options).
+    """
+    if alias.lower() in RESERVED_SCHEMAS:
+        return None
+    path = sqlite_file_of(adapter)
+    if path is None:
+        return None
+
+    if isinstance(adapter, SQLiteAdapter):
+        temp_store = adapter.temp_store.upper() if adapter.temp_store else None
+        if temp_store is not None and temp_store not in _TEMP_STORES:
+            return None
+        return AttachedFile(
+            path,
+            immutable=adapter.immutable,
+            pragmas={
+                name: int(getattr(adapter, name))
+                for name in ("cache_size", "mmap_size")
+                if getattr(adapter, name) is not None
+            },
+            temp_store=temp_store,
+            query_timeout=adapter.query_timeout,
+        )
+
+    if adapter.engine.url.query or getattr(adapter, "init_statements", None):
+        return None
+    return AttachedFile(path, query_timeout=getattr(adapter, "query_timeout", None))
+
+
+def row_columns(row: Any) -> Optional[List[str]]:
+    """Column names carried by a child row, None for plain tuples."""
+    # SQLAlchemy 1.4+ support
+    if hasattr(row, "_fields"):
+        return list(row._fields)
+    # Dict-like rows
+    if hasattr(row, "keys"):
+        return list(row.keys())
+    return None
+
+
+def batches_from_rows(rows: Iterable[Any], batch_size: int) -> Iterator[RowBatch]:
+    """Groups the row stream of execute_query into RowBatch blocks of plain tuples."""
+    columns = None
+    try:
+        for chunk in iter_batches(rows, batch_size):
+            first = chunk[0]
+            if columns is None:
+                columns = row_columns(first)
+            if type(first) is tuple:
+                values = chunk
+            elif hasattr(first, "keys") and not hasattr(first, "_fields"):
+                values = [tuple(row.values()) for row in chunk]
+            else:
+                values = [tuple(row) for row in chunk]
+            yield RowBatch(columns, values)
+    finally:
+        if hasattr(rows, "close"):
+            rows.close()
+
+
+def fetch_batches(
+    adapter: IDatabaseConnector,
+    sql: str,
+    batch_size: int,
+    cancel: Optional[CancellationToken] = None,
+) -> Iterator[RowBatch]:
+    """
+    Runs a query on a child and returns its result as RowBatch blocks.
+    Uses the adapter's own execute_query_batches when it has one.
+    With a token, the child interrupts the query once it is stopped.
+    """
+    execute_batches = getattr(adapter, "execute_query_batches", None)
+    if execute_batches is not None:
+        if cancel is None:
+            return execute_batches(sql, batch_size)
+        return execute_batches(sql, batch_size, cancel=cancel)
+    if cancel is None:
+        return batches_from_rows(adapter.execute_query(sql), batch_size)
+    return batches_from_rows(adapter.execute_cancellable(sql, cancel), batch_size)
@@ -0,0 +1,131 @@
+from dataclasses import dataclass, field
+from typing import Any, Collection, Dict, List, Optional
+
+from nlp_sql_engine.infra.database.federation.planner import QueryPlan, TableScan
+
+
+class TransferTooLarge(ValueError):
+    """Raised before execution when a query would fetch too many rows from the children."""
+
+
+@dataclass
+class PlanNode:
+    """
+    One operator of an explained query.
+    detail holds operator specific, JSON-friendly information (physical SQL, keys...).
+    """
+
+    operator: str
+    detail: Dict[str, Any] = field(default_factory=dict)
+    estimated_rows: Optional[float] = None
+    children: List["PlanNode"] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "operator": self.operator,
+            "detail": self.detail,
+            "estimated_rows": self.estimated_rows,
+            "children": [child.to_dict() for child in self.children],
+        }
+
+    def render(self, depth: int = 0) -> str:
+        """EXPLAIN-style text tree."""
+        estimate = (
+            f" (rows={self.estimated_rows:.0f})" if self.estimated_rows is not None else ""
+        )
+        lines = [f"{'  ' * depth}-> {self.operator}{estimate}"]
+        for key, value in self.detail.items():
+            lines.append(f"{'  ' * depth}     {key}: {value}")
+        lines.extend(child.render(depth + 1) for child in self.children)
+        return "\n".join(lines)
+
+    def __str__(self) -> str:
+        return self.render()
+
+
+def explain_scan(
+    scan: TableScan,
+    alias: Optional[str] = None,
+    materialized: Collection[str] = (),
+) -> PlanNode:
+    """RemoteScan of a child, or MaterializedScan when the local copy answers it."""
+    local = scan.source is None and scan.virtual_table in materialized
+    detail: Dict[str, Any] = {
+        "table": scan.virtual_table,
+        "database": scan.db_alias,
+        "sql": scan.to_sql(table=scan.virtual_table) if local else scan.to_sql(),
+        "columns": scan.columns or "*",
+    }
+    filters = scan.filter_expression()
+    if filters is not None:
+        detail["pushed_filter"] = filters.sql(dialect="sqlite")
+    if scan.group_by is not None:
+        detail["pushed_group_by"] = scan.group_by
+    if scan.limit is not None:
+        detail["pushed_limit"] = scan.limit
+    if alias and alias != scan.virtual_table:
+        detail["alias"] = alias
+    return PlanNode("MaterializedScan" if local else "RemoteScan", detail, scan.estimated_rows)
+
+
+def explain_plan(
+    plan: QueryPlan,
+    materialized: Collection[str] = (),
+    join_processes: Optional[int] = None,
+) -> PlanNode:
+    """
+    Plan tree of a cross-database query: local finishing on top of the joins/scans.
+    materialized: tables read from the local materialized copies.
+    join_processes: worker processes when the join runs partitioned, else None.
+    """
+    local_sql = plan.expression.sql(dialect="sqlite")
+    transfer = plan.estimated_transfer_rows()
+
+    if plan.join_steps is None:
+        scans = [explain_scan(scan, materialized=materialized) for scan in plan.scans.values()]
+        return PlanNode(
+            "StagedSQLiteJoin",
+            {"sql": local_sql, "estimated_transfer_rows": transfer},
+            None,
+            scans,
+        )
+
+    reductions = {sj.target_alias: sj for sj in plan.semi_joins}
+
+    def scan_node(alias: str) -> PlanNode:
+        node = explain_scan(plan.scans[plan.alias_map[alias]], alias, materialized)
+        if alias in reductions:
+            semi_join = reductions[alias]
+            node.detail["semi_join"] = (
+                f"{semi_join.target_column} IN (keys of "
+                f"{semi_join.source_alias}.{semi_join.source_column})"
+            )
+        return node
+
+    node = scan_node(plan.probe_alias)
+    for step in plan.join_steps:
+        keys = [
+            f"{probe_alias}.{probe_column} = {step.alias}.{build_column}"
+            for probe_alias, probe_column, build_column in step.keys
+        ]
+        detail: Dict[str, Any] = {
+            "type": "LEFT" if step.left_outer else "INNER",
+            "build": step.alias,
+            "keys": keys,
+        }
+        operator = "HashJoin"
+        if join_processes is not None:
+            # Same partition count as PartitionedHashJoinExecutor
+            operator = "PartitionedHashJoin"
+            detail["processes"] = join_processes
+            detail["partitions"] = join_processes * 4
+        node = PlanNode(
+            operator, detail, step.estimated_rows, [node, scan_node(step.alias)]
+        )
+
+    return PlanNode(
+        "LocalFinish",
+        {"sql": local_sql, "estimated_transfer_rows": transfer},
+        plan.estimated_rows,
+        [node],
+    )
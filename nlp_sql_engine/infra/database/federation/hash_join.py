@@ -0,0 +1,588 @@
+from collections import deque
+from operator import itemgetter
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from sqlglot import exp
+
+from nlp_sql_engine.core.domain.cancellation import CancellationToken
+from nlp_sql_engine.core.domain.models import RowBatch
+from nlp_sql_engine.infra.database.federation.parallel import ParallelScanReader
+from nlp_sql_engine.infra.database.federation.planner import (
+    JoinStep,
+    QueryPlan,
+    SemiJoin,
+    TableScan,
+    literal_int,
+)
+from nlp_sql_engine.infra.database.federation.staging import (
+    StagingArea,
+    comparison_affinities,
+    estimate_row_bytes,
+    iter_batches,
+    raise_cancelled,
+    to_affinity,
+)
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+JOINED_TABLE = "__joined"
+
+
+class BuildSideTooLarge(Exception):
+    """Raised when the hash tables of a join would exceed the memory budget."""
+
+
+class MemoryBudget:
+    """Byte budget shared by every hash table of one query."""
+
+    def __init__(self, limit_bytes: int):
+        self.limit_bytes = limit_bytes
+        self.used_bytes = 0
+
+    def consume(self, size: int) -> None:
+        if not self.try_consume(size):
+            raise BuildSideTooLarge(
+                f"Hash join build sides exceeded {self.limit_bytes} bytes"
+            )
+
+    def try_consume(self, size: int) -> bool:
+        if self.used_bytes + size > self.limit_bytes:
+            return False
+        self.used_bytes += size
+        return True
+
+
+class RowLayout:
+    """
+    Positions of (alias, column) pairs inside a joined row.
+    Joined rows are plain tuples: the probe row followed by each build row.
+    """
+
+    def __init__(self):
+        self.columns: List[Tuple[str, str]] = []
+        # Declared SQLite type of each position (None when unknown)
+        self.types: List[Optional[str]] = []
+        self._positions: Dict[Tuple[str, str], int] = {}
+
+    def extend(
+        self, alias: str, columns: List[str], types: Optional[List[Optional[str]]] = None
+    ) -> None:
+        for i, column in enumerate(columns):
+            self._positions[(alias, column.lower())] = len(self.columns)
+            self.columns.append((alias, column))
+            self.types.append(types[i] if types else None)
+
+    def position(self, alias: str, column: str) -> Optional[int]:
+        return self._positions.get((alias, column.lower()))
+
+    def resolve(self, column: exp.Column) -> Optional[int]:
+        """Position of a query column; unqualified names must be unambiguous."""
+        if column.table:
+            return self.position(column.table, column.name)
+        matches = [
+            pos
+            for (alias, name), pos in self._positions.items()
+            if name == column.name.lower()
+        ]
+        return matches[0] if len(matches) == 1 else None
+
+    def alias_positions(self, alias: Optional[str] = None) -> List[Tuple[int, str]]:
+        """(position, column name) of one alias, or of every alias when None."""
+        return [
+            (pos, name)
+            for pos, (a, name) in enumerate(self.columns)
+            if alias is None or a == alias
+        ]
+
+    def width(self) -> int:
+        return len(self.columns)
+
+
+def key_getter(
+    positions: List[int], affinities: Optional[List[Optional[str]]] = None
+) -> Callable[[tuple], Any]:
+    """
+    Join key of a row: a scalar for one position, a tuple for several.
+    affinities: per key column, the affinity SQLite would apply when comparing it.
+    """
+    if not affinities or not any(affinities):
+        return itemgetter(*positions)
+    pairs = list(zip(positions, affinities))
+    if len(pairs) == 1:
+        pos, affinity = pairs[0]
+        return lambda row: to_affinity(row[pos], affinity)
+    return lambda row: tuple(to_affinity(row[pos], affinity) for pos, affinity in pairs)
+
+
+class HashJoinOperator:
+    """
+    Build/probe equi-join.
+    The build side is hashed in memory; the probe side is streamed through.
+    """
+
+    def __init__(
+        self,
+        probe_positions: List[int],
+        build_positions: List[int],
+        build_width: int,
+        left_outer: bool,
+        probe_affinities: Optional[List[Optional[str]]] = None,
+        build_affinities: Optional[List[Optional[str]]] = None,
+    ):
+        # Keys of differently typed columns are converted as SQLite compares them
+        self.probe_key = key_getter(probe_positions, probe_affinities)
+        self.build_key = key_getter(build_positions, build_affinities)
+        # itemgetter returns a scalar for one position and a tuple for several
+        self.composite = len(probe_positions) > 1
+        self.null_row = (None,) * build_width
+        self.left_outer = left_outer
+        self.table: Dict[Any, List[tuple]] = {}
+
+    def _is_null(self, key: Any) -> bool:
+        # SQL semantics: NULL never matches anything
+        return None in key if self.composite else key is None
+
+    def add(self, rows: Iterable[tuple], budget: MemoryBudget) -> None:
+        """Hashes a batch of build rows (tuples), charging them to the budget."""
+        table = self.table
+        for row in rows:
+            key = self.build_key(row)
+            if self._is_null(key):
+                continue
+            table.setdefault(key, []).append(row)
+            budget.consume(estimate_row_bytes(row))
+
+    def probe(self, rows: Iterable[tuple]) -> Iterator[tuple]:
+        table = self.table
+        for row in rows:
+            key = self.probe_key(row)
+            matches = None if self._is_null(key) else table.get(key)
+            if matches:
+                for match in matches:
+                    yield row + match
+            elif self.left_outer:
+                yield row + self.null_row
+
+
+class HashJoinExecutor:
+    """
+    Native federated execution engine for left-deep INNER/LEFT equi-joins.
+
+    The FROM table is streamed from its child database and probed against
+    hash tables built from the joined tables. Simple projections are produced
+    directly from the joined rows; anything else (aggregates, ORDER BY, residual
+    filters) is finished by SQLite over a single staged table of joined rows.
+    """
+
+    def __init__(
+        self,
+        plan: QueryPlan,
+        fetch: Callable[..., Iterable[RowBatch]],
+        memory_budget_bytes: int,
+        fetch_batch_size: int = 1000,
+        spill_dir: Optional[str] = None,
+        max_workers: int = 4,
+        semi_join_max_keys: int = 10000,
+        semi_join_chunk_size: int = 500,
+        declared_types: Optional[Callable[[TableScan], List[Optional[str]]]] = None,
+        cancel: Optional[CancellationToken] = None,
+    ):
+        if plan.join_steps is None or plan.probe_alias is None:
+            raise ValueError("Query plan has no native join pipeline")
+        self.plan = plan
+        self.fetch = fetch
+        self.memory_budget_bytes = memory_budget_bytes
+        self.fetch_batch_size = fetch_batch_size
+        # Declared SQLite types of a scan's columns, used when finishing in SQLite
+        self.declared_types = declared_types or (lambda scan: None)
+        self.spill_dir = spill_dir
+        self.max_workers = max_workers
+        # Semi-join reduction is abandoned when the source has more distinct keys
+        self.semi_join_max_keys = semi_join_max_keys
+        self.semi_join_chunk_size = semi_join_chunk_size
+        # Stops the child fetches and the SQLite finish of the query
+        self.cancel = cancel
+
+        self.layout = RowLayout()
+        self.operators: List[HashJoinOperator] = []
+        self._probe_reader: Optional[ParallelScanReader] = None
+        self._probe_iter: Optional[Iterator[Tuple[str, RowBatch]]] = None
+        # Probe batches read ahead while collecting semi-join keys
+        self._probe_buffer: Deque[RowBatch] = deque()
+
+    def _scan(self, alias: str) -> TableScan:
+        return self.plan.scans[self.plan.alias_map[alias]]
+
+    def build(self) -> None:
+        """
+        Fetches and hashes every build side.
+        Scans that are not reduced by a semi-join (build sides and the probe side)
+        are dispatched concurrently; the probe stream waits in a bounded queue.
+        Reduced scans are fetched afterwards, restricted to the keys of their source.
+        Raises BuildSideTooLarge before any row is produced if the budget is exceeded.
+        """
+        probe_alias = self.plan.probe_alias
+        probe_scan = self._scan(probe_alias)
+        self.layout.extend(
+            probe_alias, probe_scan.columns, self.declared_types(probe_scan)
+        )
+
+        # Operators are created in pipeline order: key positions depend on the layout
+        operators = {}
+        for step in self.plan.join_steps:
+            operators[step.alias] = self._operator_for(step)
+            scan = self._scan(step.alias)
+            self.layout.extend(step.alias, scan.columns, self.declared_types(scan))
+
+        reductions = {sj.target_alias: sj for sj in self.plan.semi_joins}
+        budget = MemoryBudget(self.memory_budget_bytes)
+
+        try:
+            # Phase 1: every scan that does not wait for a key set
+            if probe_alias not in reductions:
+                self._start_probe(self.fetch(probe_scan))
+            self._build_from(
+                operators,
+                {
+                    alias: self.fetch(self._scan(alias))
+                    for alias in operators
+                    if alias not in reductions
+                },
+                budget,
+            )
+
+            # Phase 2: reduced scans, restricted to the keys of the selective side
+            reduced = {}
+            for target, semi_join in reductions.items():
+                keys = self._source_keys(semi_join, operators, budget)
+                if keys is None:
+                    reduced[target] = self.fetch(self._scan(target))
+                else:
+                    reduced[target] = self._reduced_rows(semi_join, keys)
+            if probe_alias in reduced:
+                self._start_probe(reduced.pop(probe_alias))
+            self._build_from(operators, reduced, budget)
+        except BaseException:
+            self.close()
+            raise
+
+        self.operators = [operators[step.alias] for step in self.plan.join_steps]
+
+    def close(self) -> None:
+        """Stops the probe fetch (if still running)."""
+        if self._probe_reader is not None:
+            self._probe_reader.close()
+        self._probe_buffer.clear()
+
+    def _start_probe(self, batches: Iterable[RowBatch]) -> None:
+        self._probe_reader = ParallelScanReader(
+            {self.plan.probe_alias: batches}, max_workers=1, cancel=self.cancel
+        ).start()
+        self._probe_iter = iter(self._probe_reader)
+
+    def _build_from(
+        self,
+        operators: Dict[str, HashJoinOperator],
+        sources: Dict[str, Iterable[RowBatch]],
+        budget: MemoryBudget,
+    ) -> None:
+        if not sources:
+            return
+        reader = ParallelScanReader(sources, max_workers=self.max_workers, cancel=self.cancel)
+        try:
+            for alias, batch in reader:
+                operators[alias].add(batch.rows, budget)
+        finally:
+            reader.close()
+
+    def _source_keys(
+        self,
+        semi_join: SemiJoin,
+        operators: Dict[str, HashJoinOperator],
+        budget: MemoryBudget,
+    ) -> Optional[Set[Any]]:
+        """
+        Distinct non-NULL join keys of the source side, or None when there are
+        too many of them for the reduction to pay off.
+        """
+        source_affinity, target_affinity = comparison_affinities(
+            self._column_type(semi_join.source_alias, semi_join.source_column),
+            self._column_type(semi_join.target_alias, semi_join.target_column),
+        )
+        if target_affinity is not None:
+            # The target values would be converted before comparing: not an IN list
+            return None
+        source_columns = [c.lower() for c in self._scan(semi_join.source_alias).columns]
+        pos = source_columns.index(semi_join.source_column.lower())
+        keys: Set[Any] = set()
+
+        if semi_join.source_alias == self.plan.probe_alias:
+            # Read the probe side ahead; the buffered batches are replayed later.
+            # Another reduction may already have buffered part (or all) of it.
+            for batch in self._probe_buffer:
+                keys.update(batch.column(pos))
+            for _, batch in self._probe_iter:
+                self._probe_buffer.append(batch)
+                keys.update(batch.column(pos))
+                if len(keys) > self.semi_join_max_keys or not budget.try_consume(
+                    sum(estimate_row_bytes(row) for row in batch.rows)
+                ):
+                    return None
+        else:
+            for rows in operators[semi_join.source_alias].table.values():
+                keys.update(row[pos] for row in rows)
+
+        keys.discard(None)
+        if source_affinity is not None:
+            keys = {to_affinity(key, source_affinity) for key in keys}
+        if len(keys) > self.semi_join_max_keys:
+            return None
+        logger.info(
+            f"[Federation] Semi-join: pushing {len(keys)} keys of "
+            f"'{semi_join.source_alias}' to '{semi_join.target_alias}'."
+        )
+        return keys
+
+    def _reduced_rows(
+        self, semi_join: SemiJoin, keys: Set[Any]
+    ) -> Iterator[RowBatch]:
+        """Fetches the target scan with 'column IN (...)', one chunk of keys at a time."""
+        scan = self._scan(semi_join.target_alias)
+        column = exp.Column(this=exp.to_identifier(semi_join.target_column))
+        ordered = list(keys)
+        for start in range(0, len(ordered), self.semi_join_chunk_size):
+            chunk = ordered[start : start + self.semi_join_chunk_size]
+            condition = column.copy().isin(*[exp.convert(key) for key in chunk])
+            yield from self.fetch(scan, [condition])
+
+    def _key_positions(self, step: JoinStep) -> Tuple[List[int], List[int]]:
+        """Key positions of a join step in the joined row and in the build row."""
+        build_columns = [c.lower() for c in self._scan(step.alias).columns]
+        probe_positions = []
+        build_positions = []
+        for probe_alias, probe_column, build_column in step.keys:
+            probe_positions.append(self.layout.position(probe_alias, probe_column))
+            build_positions.append(build_columns.index(build_column.lower()))
+        return probe_positions, build_positions
+
+    def _key_affinities(
+        self, step: JoinStep
+    ) -> Tuple[List[Optional[str]], List[Optional[str]]]:
+        """Affinities applied to the probe and build keys of a join step when compared."""
+        probe_affinities = []
+        build_affinities = []
+        for probe_alias, probe_column, build_column in step.keys:
+            probe, build = comparison_affinities(
+                self.layout.types[self.layout.position(probe_alias, probe_column)],
+                self._column_type(step.alias, build_column),
+            )
+            probe_affinities.append(probe)
+            build_affinities.append(build)
+        return probe_affinities, build_affinities
+
+    def _column_type(self, alias: str, column: str) -> Optional[str]:
+        """Declared SQLite type of a fetched column of a scan (None when unknown)."""
+        scan = self._scan(alias)
+        types = self.declared_types(scan)
+        columns = [c.lower() for c in scan.columns or []]
+        if not types or column.lower() not in columns:
+            return None
+        return types[columns.index(column.lower())]
+
+    def _operator_for(self, step: JoinStep) -> HashJoinOperator:
+        probe_positions, build_positions = self._key_positions(step)
+        probe_affinities, build_affinities = self._key_affinities(step)
+        return HashJoinOperator(
+            probe_positions=probe_positions,
+            build_positions=build_positions,
+            build_width=len(self._scan(step.alias).columns),
+            left_outer=step.left_outer,
+            probe_affinities=probe_affinities,
+            build_affinities=build_affinities,
+        )
+
+    def execute(self) -> Iterator[Dict[str, Any]]:
+        if self._probe_iter is None:
+            self.build()
+
+        rows: Iterable[tuple] = (row for batch in self._probe_batches() for row in batch.rows)
+        for operator in self.operators:
+            rows = operator.probe(rows)
+
+        try:
+            projection = self._direct_projection()
+            if projection is not None:
+                yield from self._project(rows, *projection)
+            else:
+                yield from self._finish_in_sqlite(rows)
+        finally:
+            # Stop pulling from the probe child as soon as we are done
+            self.close()
+
+    def _probe_batches(self) -> Iterator[RowBatch]:
+        while self._probe_buffer:
+            yield self._probe_buffer.popleft()
+        for _, batch in self._probe_iter:
+            yield batch
+
+    # --- Direct projection (no SQL needed after the join) ---
+
+    def _star_positions(self, alias: Optional[str] = None) -> List[Tuple[int, str]]:
+        """Star expansion in the written FROM/JOIN order, whatever the join order."""
+        if alias is not None:
+            return self.layout.alias_positions(alias)
+        return [
+            item
+            for source in self.plan.alias_map
+            for item in self.layout.alias_positions(source)
+        ]
+
+    def _direct_projection(self):
+        """
+        Returns (names, positions, limit, offset) when the query is a plain column
+        projection over the join, else None.
+        """
+        select = self.plan.expression
+        if self.plan.residual_where or select.args.get("distinct"):
+            return None
+        for clause in ("group", "having", "order", "qualify", "windows"):
+            if select.args.get(clause):
+                return None
+
+        names: List[str] = []
+        positions: List[int] = []
+        for item in select.expressions:
+            if isinstance(item, exp.Star):
+                for pos, name in self._star_positions():
+                    positions.append(pos)
+                    names.append(name)
+                continue
+            if isinstance(item, exp.Column) and isinstance(item.this, exp.Star):
+                for pos, name in self.layout.alias_positions(item.table):
+                    positions.append(pos)
+                    names.append(name)
+                continue
+
+            column = item.this if isinstance(item, exp.Alias) else item
+            if not isinstance(column, exp.Column):
+                return None
+            pos = self.layout.resolve(column)
+            if pos is None:
+                return None
+            positions.append(pos)
+            names.append(item.alias_or_name)
+
+        limit = literal_int(select.args.get("limit"))
+        offset = literal_int(select.args.get("offset"))
+        if limit is False or offset is False:
+            return None
+        return names, positions, limit, offset or 0
+
+    @staticmethod
+    def _project(
+        rows: Iterable[tuple],
+        names: List[str],
+        positions: List[int],
+        limit: Optional[int],
+        offset: int,
+    ) -> Iterator[Dict[str, Any]]:
+        if limit is not None and limit <= 0:
+            return
+        getter = itemgetter(*positions) if len(positions) > 1 else None
+        produced = 0
+        for index, row in enumerate(rows):
+            if index < offset:
+                continue
+            values = getter(row) if getter else (row[positions[0]],)
+            yield dict(zip(names, values))
+            produced += 1
+            # LIMIT reached: stop probing (and fetching)
+            if limit is not None and produced >= limit:
+                return
+
+    # --- SQLite finishing (aggregates, ORDER BY, residual filters...) ---
+
+    def _joined_names(self) -> List[str]:
+        """Column names of the staged table of joined rows ("alias.column")."""
+        return [f"{alias}.{name}" for alias, name in self.layout.columns]
+
+    def _finish_in_sqlite(self, rows: Iterable[tuple]) -> Iterator[Dict[str, Any]]:
+        staging = StagingArea(
+            self.memory_budget_bytes, spill_dir=self.spill_dir, cancel=self.cancel
+        )
+        try:
+            with raise_cancelled(self.cancel):
+                staging.create_table(JOINED_TABLE, self._joined_names(), self.layout.types)
+                for batch in iter_batches(rows, self.fetch_batch_size):
+                    staging.insert_batch(JOINED_TABLE, batch)
+
+                sql = self._rewrite_for_joined_table()
+                logger.info(f"[Federation] Finishing hash join in SQLite:\n{sql}")
+                cursor = staging.execute(sql)
+                columns = [desc[0] for desc in cursor.description] if cursor.description else []
+                for row in cursor:
+                    yield dict(zip(columns, row))
+        finally:
+            staging.close()
+
+    def _joined_column(self, pos: int) -> exp.Column:
+        alias, name = self.layout.columns[pos]
+        return exp.Column(this=exp.to_identifier(f"{alias}.{name}", quoted=True))
+
+    def _rewrite_for_joined_table(self) -> str:
+        """Rewrites the query to read from the single staged table of joined rows."""
+        return self._joined_select().sql(dialect="sqlite")
+
+    def _joined_select(self) -> exp.Select:
+        select = self.plan.expression.copy()
+
+        # Expand stars and keep the original output names of bare columns
+        expressions = []
+        for item in select.expressions:
+            if isinstance(item, exp.Star) or (
+                isinstance(item, exp.Column) and isinstance(item.this, exp.Star)
+            ):
+                alias = item.table if isinstance(item, exp.Column) else None
+                for pos, name in self._star_positions(alias):
+                    expressions.append(exp.alias_(self._joined_column(pos), name))
+            elif isinstance(item, exp.Column):
+                expressions.append(exp.alias_(item, item.name))
+            elif not isinstance(item, exp.Alias):
+                # Same output name as the query would have over the real tables
+                expressions.append(exp.alias_(item, item.sql(dialect="sqlite")))
+            else:
+                expressions.append(item)
+        select.set("expressions", expressions)
+
+        select.set("joins", None)
+        select = select.from_(exp.Table(this=exp.to_identifier(JOINED_TABLE)), copy=False)
+
+        output_aliases = {e.alias.lower() for e in expressions if e.alias}
+
+        def transformer(node):
+            if not isinstance(node, exp.Column) or isinstance(node.this, exp.Star):
+                return node
+            # ORDER BY prefers select-list aliases over table columns
+            if (
+                not node.table
+                and node.name.lower() in output_aliases
+                and node.find_ancestor(exp.Order)
+            ):
+                return node
+            pos = self.layout.resolve(node)
+            return node if pos is None else self._joined_column(pos)
+
+        return select.transform(transformer)
@@ -0,0 +1,201 @@
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from nlp_sql_engine.core.domain.models import RowBatch
+from nlp_sql_engine.core.interfaces.db import IDatabaseConnector
+from nlp_sql_engine.infra.database.federation.children import (
+    dialect_of,
+    fetch_batches,
+    sqlite_file_of,
+)
+from nlp_sql_engine.infra.database.federation.staging import (
+    column_definitions,
+    insert_rows,
+    quote_identifier,
+)
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Entry:
+    fingerprint: Any
+    loaded_at: float
+    row_count: int
+
+
+class MaterializedTableCache:
+    """
+    Local SQLite copy of selected (small, dimension-like) virtual tables.
+
+    Before each use the source is fingerprinted and the copy is reloaded only
+    when it changed or is older than ttl_seconds:
+      - SQLite files: PRAGMA data_version on a dedicated read-only connection
+        (changes whenever another connection commits to the file),
+      - other SQLite children: COUNT(*) and MAX(rowid),
+      - anything else: COUNT(*).
+    Row-count fingerprints miss in-place updates; the TTL bounds that staleness.
+    """
+
+    def __init__(
+        self,
+        tables: Iterable[str],
+        adapters: Dict[str, IDatabaseConnector],
+        table_to_db: Dict[str, str],
+        table_to_physical: Dict[str, str],
+        column_lookup: Callable[[str], List[str]],
+        type_lookup: Optional[Callable[[str], Dict[str, Optional[str]]]] = None,
+        ttl_seconds: float = 300,
+        path: Optional[str] = None,
+        batch_size: int = 1000,
+    ):
+        self.tables = set(tables)
+        self.adapters = adapters
+        self.table_to_db = table_to_db
+        self.table_to_physical = table_to_physical
+        self.column_lookup = column_lookup
+        # Declared SQLite types of the copied columns (untyped when None)
+        self.type_lookup = type_lookup or (lambda table_name: {})
+        self.ttl_seconds = ttl_seconds
+        self.batch_size = batch_size
+
+        self.conn = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._entries: Dict[str, _Entry] = {}
+        # Read-only connections used to watch PRAGMA data_version, per db alias
+        self._watchers: Dict[str, sqlite3.Connection] = {}
+        self._lock = threading.RLock()
+
+    def __contains__(self, table_name: str) -> bool:
+        return table_name in self.tables
+
+    def query(self, table_name: str, sql: str, batch_size: int = 1000) -> List[RowBatch]:
+        """Runs SQL against the (refreshed if needed) local copy of a table."""
+        with self._lock:
+            self.ensure_fresh(table_name)
+            cursor = self.conn.execute(sql)
+            columns = [desc[0] for desc in cursor.description]
+            batches = []
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return batches
+                batches.append(RowBatch(columns, rows))
+
+    def ensure_fresh(self, table_name: str) -> None:
+        with self._lock:
+            entry = self._entries.get(table_name)
+            fingerprint = self._fingerprint(table_name)
+            if entry is not None:
+                expired = time.monotonic() - entry.loaded_at >= self.ttl_seconds
+                if not expired and fingerprint == entry.fingerprint:
+                    return
+            self._load(table_name, fingerprint)
+
+    def invalidate(self, table_name: Optional[str] = None) -> None:
+        """Forces a reload on next use (of one table, or all of them)."""
+        with self._lock:
+            if table_name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(table_name, None)
+
+    def close(self) -> None:
+        with self._lock:
+            for watcher in self._watchers.values():
+                watcher.close()
+            self._watchers.clear()
+            self.conn.close()
+
+    # --- Change detection ---
+
+    def _fingerprint(self, table_name: str) -> Any:
+        db_alias = self.table_to_db[table_name]
+        adapter = self.adapters[db_alias]
+        physical = quote_identifier(self.table_to_physical[table_name])
+
+        path = sqlite_file_of(adapter)
+        if path is not None:
+            watcher = self._watchers.get(db_alias)
+            if watcher is None:
+                watcher = sqlite3.connect(
+                    f"{Path(path).as_uri()}?mode=ro", uri=True, check_same_thread=False
+                )
+                self._watchers[db_alias] = watcher
+            return ("data_version", watcher.execute("PRAGMA data_version").fetchone()[0])
+
+        if dialect_of(adapter) == "sqlite":
+            sql = f"SELECT COUNT(*), MAX(rowid) FROM {physical}"
+        else:
+            sql = f"SELECT COUNT(*) FROM {physical}"
+        rows = adapter.execute_query(sql)
+        try:
+            return ("rows", tuple(next(iter(rows))))
+        finally:
+            if hasattr(rows, "close"):
+                rows.close()
+
+    # --- Loading ---
+
+    def _load(self, table_name: str, fingerprint: Any) -> None:
+        adapter = self.adapters[self.table_to_db[table_name]]
+        physical = quote_identifier(self.table_to_physical[table_name])
+        columns = self.column_lookup(table_name)
+        projection = ", ".join(quote_identifier(c) for c in columns) if columns else "*"
+
+        logger.info(f"[Federation] Materializing '{table_name}' locally")
+        loading = quote_identifier(f"{table_name}__loading")
+        self.conn.execute(f"DROP TABLE IF EXISTS {loading}")
+
+        row_count = 0
+        coerce = False
+        batches = fetch_batches(
+            adapter, f"SELECT {projection} FROM {physical}", self.batch_size
+        )
+        try:
+            for batch in batches:
+                if not batch.rows:
+                    continue
+                if row_count == 0:
+                    columns = columns or batch.columns
+                    if not columns:
+                        raise ValueError(
+                            f"Cannot determine the columns of table '{table_name}'"
+                        )
+                    self._create(loading, table_name, columns)
+                placeholders = ", ".join("?" for _ in columns)
+                coerce = insert_rows(
+                    self.conn,
+                    f"INSERT INTO {loading} VALUES ({placeholders})",
+                    batch.rows,
+                    coerce=coerce,
+                )
+                row_count += len(batch)
+        finally:
+            if hasattr(batches, "close"):
+                batches.close()
+
+        if row_count == 0:
+            if not columns:
+                raise ValueError(f"Cannot determine the columns of empty table '{table_name}'")
+            self._create(loading, table_name, columns)
+
+        # Swap in the new copy in one transaction: readers never see a partial table
+        target = quote_identifier(table_name)
+        with self.conn:
+            self.conn.execute(f"DROP TABLE IF EXISTS {target}")
+            self.conn.execute(f"ALTER TABLE {loading} RENAME TO {target}")
+
+        self._entries[table_name] = _Entry(
+            fingerprint=fingerprint, loaded_at=time.monotonic(), row_count=row_count
+        )
+
+    def _create(self, name: str, table_name: str, columns: List[str]) -> None:
+        types = self.type_lookup(table_name)
+        declared = [types.get(c.lower()) for c in columns]
+        self.conn.execute(f"CREATE TABLE {name} ({column_definitions(columns, declared)})")
@@ -0,0 +1,116 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from nlp_sql_engine.core.domain.cancellation import CancellationToken
+from nlp_sql_engine.core.domain.models import RowBatch
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of one source in the shared queue
+_DONE = object()
+
+
+class ParallelScanReader:
+    """
+    Fetches several child scans concurrently on a bounded thread pool.
+    Each source is a stream of RowBatch blocks (sized by the fetch itself).
+
+    Batches are delivered through one bounded queue in arrival order, so the
+    consumer starts working as soon as any child answers, and a slow consumer
+    applies back-pressure instead of buffering whole tables in memory.
+    With a cancel token, iteration raises QueryCancelled / QueryTimeout as soon
+    as it is stopped, even while every child is still busy.
+    """
+
+    def __init__(
+        self,
+        sources: Dict[str, Iterable[RowBatch]],
+        max_workers: int,
+        max_pending_batches: Optional[int] = None,
+        cancel: Optional[CancellationToken] = None,
+    ):
+        self.sources = sources
+        self.cancel = cancel
+        self.max_workers = max(1, min(max_workers, len(sources) or 1))
+        self._queue: queue.Queue = queue.Queue(
+            maxsize=max_pending_batches or 2 * self.max_workers
+        )
+        self._stop = threading.Event()
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def start(self) -> "ParallelScanReader":
+        """Dispatches every scan. Safe to call more than once."""
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="federation-fetch"
+            )
+            for key, batches in self.sources.items():
+                self._pool.submit(self._produce, key, batches)
+        return self
+
+    def __iter__(self) -> Iterator[Tuple[str, RowBatch]]:
+        """Yields (source key, batch) as batches arrive."""
+        self.start()
+        pending = len(self.sources)
+        try:
+            while pending:
+                key, item = self._get()
+                if item is _DONE:
+                    pending -= 1
+                    continue
+                if isinstance(item, BaseException):
+                    raise item
+                yield key, item
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """
+        Stops the producers and waits for the worker threads, unless the query
+        was cancelled: a child that cannot be interrupted finishes in the background.
+        """
+        self._stop.set()
+        if self._pool is not None:
+            stopped = self.cancel is not None and self.cancel.stopped
+            self._pool.shutdown(wait=not stopped, cancel_futures=True)
+
+    def _get(self) -> Tuple[str, Any]:
+        if self.cancel is None:
+            return self._queue.get()
+        while True:
+            self.cancel.check()
+            try:
+                return self._queue.get(timeout=0.05)
+            except queue.Empty:
+                continue
+
+    def _produce(self, key: str, batches: Iterable[RowBatch]) -> None:
+        try:
+            for batch in batches:
+                if self.cancel is not None and self.cancel.stopped:
+                    return
+                if not batch.rows:
+                    continue
+                if not self._put((key, batch)):
+                    return
+            self._put((key, _DONE))
+        except BaseException as e:
+            logger.error(f"[Federation] Fetch of '{key}' failed: {e}")
+            self._put((key, e))
+        finally:
+            if hasattr(batches, "close"):
+                batches.close()
+
+    def _put(self, item: Tuple[str, Any]) -> bool:
+        # Poll so that a closed reader never leaves a worker blocked on a full queue
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
@@ -0,0 +1,442 @@
+import uuid
+from collections import deque
+from concurrent.futures import Executor, Future, TimeoutError as FutureTimeout
+from dataclasses import dataclass
+from operator import itemgetter
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from sqlglot import exp
+
+from nlp_sql_engine.infra.database.federation.hash_join import (
+    JOINED_TABLE,
+    HashJoinExecutor,
+    HashJoinOperator,
+    MemoryBudget,
+    key_getter,
+)
+from nlp_sql_engine.infra.database.federation.planner import (
+    DECOMPOSABLE_AGGREGATES,
+    JoinStep,
+    QueryPlan,
+    combine_partials,
+)
+from nlp_sql_engine.infra.database.federation.staging import (
+    StagingArea,
+    estimate_row_bytes,
+    iter_batches,
+    raise_cancelled,
+)
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+PARTIALS_TABLE = "__partials"
+
+
+@dataclass
+class PartitionTask:
+    """
+    What a worker process does with the partitions of one query (pickled with
+    every task). Exactly one output: projected rows, partial aggregates, or
+    the joined rows.
+    """
+
+    query_id: str
+    probe_positions: List[int]
+    build_positions: List[int]
+    build_width: int
+    left_outer: bool
+    # Affinities applied to the keys when compared (see HashJoinOperator)
+    probe_affinities: Optional[List[Optional[str]]] = None
+    build_affinities: Optional[List[Optional[str]]] = None
+    # Direct projection: positions of the output columns in the joined row
+    projection: Optional[List[int]] = None
+    # Partial aggregation: SQL run over the joined rows staged as JOINED_TABLE
+    partial_sql: Optional[str] = None
+    columns: Optional[List[str]] = None
+    types: Optional[List[Optional[str]]] = None
+    memory_budget_bytes: int = 64 * 1024 * 1024
+    spill_dir: Optional[str] = None
+
+
+# Worker process state: (query id, partition) -> hashed build rows
+_BUILDS: Dict[Tuple[str, int], HashJoinOperator] = {}
+
+
+def _load_partition(task: PartitionTask, index: int, build_rows: List[tuple]) -> None:
+    """Worker entry point: hashes one build partition, kept until _release_query."""
+    operator = HashJoinOperator(
+        task.probe_positions,
+        task.build_positions,
+        task.build_width,
+        task.left_outer,
+        task.probe_affinities,
+        task.build_affinities,
+    )
+    # NULL keys were dropped when partitioning the build side
+    for row in build_rows:
+        operator.table.setdefault(operator.build_key(row), []).append(row)
+    _BUILDS[(task.query_id, index)] = operator
+
+
+def _release_query(query_id: str) -> None:
+    """Worker entry point: drops the build partitions of a finished query."""
+    for key in [key for key in _BUILDS if key[0] == query_id]:
+        del _BUILDS[key]
+
+
+def _join_partition(task: PartitionTask, index: int, probe_rows: List[tuple]) -> List[tuple]:
+    """Worker entry point: probes a loaded build partition and returns the output rows."""
+    joined = _BUILDS[(task.query_id, index)].probe(probe_rows)
+
+    if task.projection is not None:
+        if len(task.projection) == 1:
+            pos = task.projection[0]
+            return [(row[pos],) for row in joined]
+        getter = itemgetter(*task.projection)
+        return [getter(row) for row in joined]
+    if task.partial_sql is None:
+        return list(joined)
+
+    staging = StagingArea(task.memory_budget_bytes, spill_dir=task.spill_dir)
+    try:
+        staging.create_table(JOINED_TABLE, task.columns, task.types)
+        for batch in iter_batches(joined, 1000):
+            staging.insert_batch(JOINED_TABLE, batch)
+        return staging.execute(task.partial_sql).fetchall()
+    finally:
+        staging.close()
+
+
+def split_partial_aggregation(
+    select: exp.Select, joined_columns: Set[str]
+) -> Optional[Tuple[str, str, List[str]]]:
+    """
+    Splits an aggregate query over JOINED_TABLE into a partial query, run on
+    every partition, and a final query combining the partials (PARTIALS_TABLE).
+    Returns (partial SQL, final SQL, partial column names), or None when the
+    query is not an aggregation of SUM/COUNT/MIN/MAX/AVG over group keys.
+    """
+    if select.args.get("distinct") or select.args.get("qualify") or select.args.get("windows"):
+        return None
+    if select.find(exp.Window) or any(node is not select for node in select.find_all(exp.Select)):
+        return None
+
+    group = select.args.get("group")
+    aggregates = list(select.find_all(exp.AggFunc))
+    if not aggregates and not group:
+        return None
+    for agg in aggregates:
+        if not isinstance(agg, DECOMPOSABLE_AGGREGATES) or isinstance(agg.this, exp.Distinct):
+            return None
+    if group and any(group.args.get(arg) for arg in ("rollup", "cube", "grouping_sets")):
+        return None
+
+    # GROUP BY keys, with ordinals and select-list aliases resolved
+    outputs = {
+        item.alias.lower(): item.this
+        for item in select.expressions
+        if isinstance(item, exp.Alias)
+    }
+    key_names: Dict[exp.Expression, str] = {}
+    for key in group.expressions if group else []:
+        if isinstance(key, exp.Literal) and key.is_int:
+            index = int(key.name) - 1
+            if not 0 <= index < len(select.expressions):
+                return None
+            key = select.expressions[index].unalias()
+        elif (
+            isinstance(key, exp.Column)
+            and key.name not in joined_columns
+            and key.name.lower() in outputs
+        ):
+            key = outputs[key.name.lower()]
+        if key.find(exp.AggFunc):
+            return None
+        key_names.setdefault(key, f"__g{len(key_names)}")
+
+    partials: Dict[str, exp.Expression] = {}
+
+    def partial(agg: exp.Expression) -> exp.Expression:
+        sql = agg.sql(dialect="sqlite")
+        if sql not in partials:
+            partials[sql] = exp.alias_(agg.copy(), f"__a{len(partials)}")
+        return exp.column(partials[sql].alias)
+
+    def merge(node: exp.Expression) -> exp.Expression:
+        name = key_names.get(node)
+        if name is not None:
+            return exp.column(name)
+        if isinstance(node, exp.AggFunc):
+            return combine_partials(node, partial)
+        return node
+
+    final = select.copy()
+    final.set("where", None)
+    final.set("group", None)
+    final = final.transform(merge, copy=False)
+    if any(
+        isinstance(column, exp.Column) and column.name in joined_columns
+        for column in final.find_all(exp.Column)
+    ):
+        # A joined column outside of the aggregates and the group keys
+        return None
+    final = final.from_(exp.Table(this=exp.to_identifier(PARTIALS_TABLE)), copy=False)
+    if key_names:
+        final.set(
+            "group", exp.Group(expressions=[exp.column(n) for n in key_names.values()])
+        )
+
+    partial_select = exp.select(
+        *[exp.alias_(key.copy(), name) for key, name in key_names.items()],
+        *partials.values(),
+    ).from_(exp.Table(this=exp.to_identifier(JOINED_TABLE)))
+    where = select.args.get("where")
+    if where is not None:
+        partial_select.set("where", where.copy())
+    if key_names:
+        partial_select = partial_select.group_by(*[k.copy() for k in key_names])
+
+    columns = list(key_names.values()) + [p.alias for p in partials.values()]
+    return (
+        partial_select.sql(dialect="sqlite"),
+        final.sql(dialect="sqlite"),
+        columns,
+    )
+
+
+class PartitionedBuild:
+    """
+    Build side of a partitioned join: rows are hash-partitioned on the join key
+    instead of being hashed into one table. Same add() contract as HashJoinOperator.
+    """
+
+    def __init__(
+        self,
+        probe_positions: List[int],
+        build_positions: List[int],
+        build_width: int,
+        left_outer: bool,
+        partitions: int,
+        probe_affinities: Optional[List[Optional[str]]] = None,
+        build_affinities: Optional[List[Optional[str]]] = None,
+    ):
+        self.probe_positions = probe_positions
+        self.build_positions = build_positions
+        self.build_width = build_width
+        self.left_outer = left_outer
+        self.partitions = partitions
+        self.probe_affinities = probe_affinities
+        self.build_affinities = build_affinities
+        # Converted keys, so equal values land in the same partition
+        self.probe_key = key_getter(probe_positions, probe_affinities)
+        self.build_key = key_getter(build_positions, build_affinities)
+        self.composite = len(probe_positions) > 1
+        # partition index -> build rows (read by semi-join key collection too)
+        self.table: Dict[int, List[tuple]] = {i: [] for i in range(partitions)}
+
+    def is_null(self, key: Any) -> bool:
+        return None in key if self.composite else key is None
+
+    def partition_of(self, key: Any) -> int:
+        return hash(key) % self.partitions
+
+    def add(self, rows: Iterable[tuple], budget: MemoryBudget) -> None:
+        table = self.table
+        for row in rows:
+            key = self.build_key(row)
+            if self.is_null(key):
+                continue
+            table[self.partition_of(key)].append(row)
+            budget.consume(estimate_row_bytes(row))
+
+
+class PartitionedHashJoinExecutor(HashJoinExecutor):
+    """
+    Hash join spread over worker processes, for joins too big for one core.
+
+    Both sides are hash-partitioned on the join key in this process. Every
+    partition belongs to one worker process (one single-process pool each):
+    its build rows are sent and hashed there once, then chunks of probe rows
+    follow through the same pool. Workers return either the projected rows,
+    partial aggregates (combined here by a final query over the partials), or
+    the joined rows (finished here in SQLite).
+    Only single-step joins are partitioned.
+    """
+
+    def __init__(
+        self,
+        plan: QueryPlan,
+        pools: List[Executor],
+        partition_rows: int = 50000,
+        **kwargs,
+    ):
+        super().__init__(plan, **kwargs)
+        # pools[i % processes] owns partition i (tasks of one pool run in order)
+        self.pools = pools
+        self.processes = len(pools)
+        # Probe rows of one partition are shipped in chunks of this size
+        self.partition_rows = partition_rows
+
+    @staticmethod
+    def supports(plan: QueryPlan) -> bool:
+        """Single join step, and no LIMIT that a streamed projection could stop at."""
+        if plan.join_steps is None or len(plan.join_steps) != 1:
+            return False
+        select = plan.expression
+        streamed_limit = select.args.get("limit") or select.args.get("offset")
+        aggregated = select.args.get("group") or select.find(exp.AggFunc)
+        return not streamed_limit or bool(aggregated)
+
+    def _operator_for(self, step: JoinStep) -> PartitionedBuild:
+        probe_positions, build_positions = self._key_positions(step)
+        probe_affinities, build_affinities = self._key_affinities(step)
+        return PartitionedBuild(
+            probe_positions=probe_positions,
+            build_positions=build_positions,
+            build_width=len(self._scan(step.alias).columns),
+            left_outer=step.left_outer,
+            partitions=self.processes * 4,
+            probe_affinities=probe_affinities,
+            build_affinities=build_affinities,
+        )
+
+    def execute(self) -> Iterator[Dict[str, Any]]:
+        if self._probe_iter is None:
+            self.build()
+        build = self.operators[0]
+        task = PartitionTask(
+            query_id=uuid.uuid4().hex,
+            probe_positions=build.probe_positions,
+            build_positions=build.build_positions,
+            build_width=build.build_width,
+            left_outer=build.left_outer,
+            probe_affinities=build.probe_affinities,
+            build_affinities=build.build_affinities,
+            memory_budget_bytes=self.memory_budget_bytes // self.processes,
+            spill_dir=self.spill_dir,
+        )
+
+        projection = self._direct_projection()
+        if projection is not None and projection[2] is None and not projection[3]:
+            names, positions, _, _ = projection
+            task.projection = positions
+            logger.info(f"[Federation] Partitioned hash join on {self.processes} processes.")
+            for rows in self._run(task):
+                for row in rows:
+                    yield dict(zip(names, row))
+            return
+
+        names = self._joined_names()
+        split = split_partial_aggregation(self._joined_select(), set(names))
+        if split is None:
+            logger.info(
+                f"[Federation] Partitioned hash join on {self.processes} processes, "
+                "finished in SQLite."
+            )
+            rows = (row for part in self._run(task) for row in part)
+            yield from self._finish_in_sqlite(rows)
+            return
+
+        partial_sql, final_sql, partial_columns = split
+        task.partial_sql = partial_sql
+        task.columns = names
+        task.types = self.layout.types
+        logger.info(
+            f"[Federation] Partitioned hash join on {self.processes} processes, "
+            f"partial aggregates:\n{partial_sql}\nfinal:\n{final_sql}"
+        )
+        staging = StagingArea(
+            self.memory_budget_bytes, spill_dir=self.spill_dir, cancel=self.cancel
+        )
+        try:
+            with raise_cancelled(self.cancel):
+                staging.create_table(PARTIALS_TABLE, partial_columns)
+                for rows in self._run(task):
+                    staging.insert_batch(PARTIALS_TABLE, rows)
+                cursor = staging.execute(final_sql)
+                columns = [desc[0] for desc in cursor.description] if cursor.description else []
+                for row in cursor:
+                    yield dict(zip(columns, row))
+        finally:
+            staging.close()
+
+    def _result(self, future: Future) -> Any:
+        """Output of a task; stops waiting for it once the query is cancelled."""
+        if self.cancel is None:
+            return future.result()
+        while True:
+            self.cancel.check()
+            try:
+                return future.result(timeout=0.05)
+            except FutureTimeout:
+                continue
+
+    def _run(self, task: PartitionTask) -> Iterator[List[tuple]]:
+        """
+        Partitions the probe stream and yields the output of every task.
+        At most two tasks per process are in flight (oldest consumed first),
+        which bounds the rows held here while the workers catch up.
+        """
+        build = self.operators[0]
+        chunks: List[List[tuple]] = [[] for _ in range(build.partitions)]
+        # partition index -> load of its build rows in the owning worker
+        loaded: Dict[int, Future] = {}
+        pending: Deque[Tuple[int, Future]] = deque()
+        max_pending = 2 * self.processes
+
+        def submit(index: int) -> None:
+            pool = self.pools[index % self.processes]
+            if index not in loaded:
+                # Build rows cross to their worker once, before any of their probe chunks
+                loaded[index] = pool.submit(_load_partition, task, index, build.table[index])
+                build.table[index] = []
+            pending.append((index, pool.submit(_join_partition, task, index, chunks[index])))
+            chunks[index] = []
+
+        def result() -> List[tuple]:
+            index, future = pending.popleft()
+            # A failed load is reported as such, not as its missing partition
+            self._result(loaded[index])
+            return self._result(future)
+
+        try:
+            for batch in self._probe_batches():
+                for row in batch.rows:
+                    key = build.probe_key(row)
+                    if build.is_null(key):
+                        if not build.left_outer:
+                            continue
+                        index = 0
+                    else:
+                        index = build.partition_of(key)
+                        if not build.left_outer and not (
+                            build.table[index] or index in loaded
+                        ):
+                            # Inner join against an empty partition: nothing matches
+                            continue
+                    chunk = chunks[index]
+                    chunk.append(row)
+                    if len(chunk) >= self.partition_rows:
+                        submit(index)
+                        while len(pending) >= max_pending:
+                            yield result()
+
+            for index, chunk in enumerate(chunks):
+                if chunk:
+                    submit(index)
+                    while len(pending) >= max_pending:
+                        yield result()
+            while pending:
+                yield result()
+        finally:
+            for _, future in pending:
+                future.cancel()
+            for pool in self.pools:
+                try:
+                    pool.submit(_release_query, task.query_id)
+                except RuntimeError:
+                    # Pool already shut down: its worker state is gone anyway
+                    pass
+            self.close()
@@ -0,0 +1,86 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+
+from sqlglot import exp
+
+from nlp_sql_engine.infra.database.federation.children import AttachedFile
+from nlp_sql_engine.infra.database.federation.planner import QueryPlan
+
+# Quoted strings/identifiers are kept verbatim, whitespace elsewhere is collapsed
+_QUOTED = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|`[^`]*`)")
+
+
+def normalize_sql(query: str) -> str:
+    """Cache key of a query: insignificant whitespace and trailing ';' removed."""
+    parts = _QUOTED.split(query.strip().rstrip(";").strip())
+    for i in range(0, len(parts), 2):
+        parts[i] = " ".join(parts[i].split())
+    return "".join(parts)
+
+
+@dataclass
+class Route:
+    """
+    Everything execute_query decides before touching a database.
+    kind: 'single' (one child), 'attached' (SQLite ATTACH) or 'federated'.
+    """
+
+    kind: str
+    expression: exp.Expression
+    required_dbs: Set[str]
+    # Physical SQL for 'single' (run on the child) and 'attached' (run locally)
+    physical_sql: Optional[str] = None
+    # 'attached': db alias -> SQLite file and its settings
+    files: Dict[str, AttachedFile] = field(default_factory=dict)
+    # 'federated': decomposed plan
+    plan: Optional[QueryPlan] = None
+
+
+class PlanCache:
+    """
+    Thread-safe bounded LRU of routes. A max_size of 0 disables caching.
+    Entries older than ttl_seconds (when set) are planned again.
+    """
+
+    def __init__(self, max_size: int = 256, ttl_seconds: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        # key -> (entry, time it was stored)
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None and self.ttl_seconds is not None:
+                if time.monotonic() - item[1] >= self.ttl_seconds:
+                    del self._entries[key]
+                    item = None
+            if item is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key: Hashable, entry: Any) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (entry, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
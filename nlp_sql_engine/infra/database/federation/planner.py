@@ -0,0 +1,1076 @@
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from sqlglot import exp
+
+from nlp_sql_engine.infra.database.federation.scopes import DerivedTable, with_clause
+from nlp_sql_engine.infra.database.federation.statistics import StatisticsCollector
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def literal_int(node: Optional[exp.Expression]):
+    """LIMIT/OFFSET value: None when absent, the int for a numeric literal, False otherwise."""
+    if node is None:
+        return None
+    value = node.args.get("expression")
+    if isinstance(value, exp.Literal) and not value.is_string:
+        try:
+            return int(value.this)
+        except ValueError:
+            return False
+    return False
+
+
+# Aggregates that split into partials: SUM/COUNT/MIN/MAX directly, AVG as SUM / COUNT
+DECOMPOSABLE_AGGREGATES = (exp.Sum, exp.Count, exp.Min, exp.Max, exp.Avg)
+
+
+def combine_partials(
+    node: exp.Expression, partial: Callable[[exp.Expression], exp.Expression]
+) -> exp.Expression:
+    """
+    Replaces an aggregate by the combination of its partials.
+    partial(agg) registers an aggregate computed per part and returns its column.
+    """
+    if isinstance(node, exp.Sum):
+        return exp.Sum(this=partial(node))
+    if isinstance(node, exp.Min):
+        return exp.Min(this=partial(node))
+    if isinstance(node, exp.Max):
+        return exp.Max(this=partial(node))
+    if isinstance(node, exp.Count):
+        return exp.func("COALESCE", exp.Sum(this=partial(node)), exp.Literal.number(0))
+    if isinstance(node, exp.Avg):
+        total = exp.Sum(this=partial(exp.Sum(this=node.this.copy())))
+        count = exp.Sum(this=partial(exp.Count(this=node.this.copy())))
+        return exp.Div(
+            this=exp.Cast(this=total, to=exp.DataType.build("REAL")),
+            expression=count,
+        )
+    return node
+
+
+@dataclass
+class TableScan:
+    """
+    A single fetch issued against the child database that owns a virtual table.
+    One scan is created per virtual table, even if the query references it
+    several times (self-joins, subqueries).
+    """
+
+    virtual_table: str
+    db_alias: str
+    physical_table: str
+
+    # Query alias -> conjuncts pushed down for that reference.
+    # Conjuncts are already rewritten against the physical table (unqualified columns).
+    predicates: Dict[str, List[exp.Expression]] = field(default_factory=dict)
+
+    # True when at least one reference needs the table unfiltered
+    # (e.g. it is used inside a subquery we do not decompose).
+    unfiltered: bool = False
+
+    # Columns to fetch, in table order. None means every column (SELECT *).
+    columns: Optional[List[str]] = None
+
+    # Rows expected after the pushed filters (None without statistics)
+    estimated_rows: Optional[float] = None
+
+    # Partial aggregation pushed to the child: GROUP BY these columns and
+    # compute (output name, aggregate) pairs. columns then lists keys + outputs.
+    group_by: Optional[List[str]] = None
+    aggregates: List[Tuple[str, exp.Expression]] = field(default_factory=list)
+
+    # Top-N pushdown: only the first 'limit' rows in this order are fetched
+    order_by: List[exp.Ordered] = field(default_factory=list)
+    limit: Optional[int] = None
+
+    # Single-database subquery read in place of a physical table
+    source: Optional[DerivedTable] = None
+
+    # Rendered SQL without extras (plans are cached and executed many times)
+    _sql: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    def filter_expression(self) -> Optional[exp.Expression]:
+        """
+        Combines the pushed conjuncts of every reference.
+        References are OR-ed so that each one still receives all of its rows.
+        """
+        if self.unfiltered or not self.predicates:
+            return None
+        if any(not conjuncts for conjuncts in self.predicates.values()):
+            return None
+
+        branches = [exp.and_(*conjuncts) for conjuncts in self.predicates.values()]
+        if len(branches) == 1:
+            return branches[0]
+        return exp.or_(*branches)
+
+    def to_sql(
+        self,
+        limit: Optional[int] = None,
+        extra_conditions: Optional[List[exp.Expression]] = None,
+        table: Optional[str] = None,
+    ) -> str:
+        """
+        Renders the physical SQL sent to the child adapter.
+        extra_conditions are AND-ed with the pushed filters (e.g. semi-join key lists).
+        table overrides the physical table name (e.g. a local materialized copy).
+        """
+        plain = limit is None and not extra_conditions and table is None
+        if plain and self._sql is not None:
+            return self._sql
+
+        if self.source is not None:
+            source = exp.Subquery(
+                this=self.source.body.copy(),
+                alias=exp.TableAlias(this=exp.to_identifier(self.virtual_table)),
+            )
+        else:
+            source = exp.Table(this=exp.to_identifier(table or self.physical_table))
+
+        if self.group_by is not None:
+            projection = [exp.Column(this=exp.to_identifier(c)) for c in self.group_by]
+            projection += [exp.alias_(agg.copy(), name) for name, agg in self.aggregates]
+        elif self.columns:
+            projection = [exp.Column(this=exp.to_identifier(c)) for c in self.columns]
+        else:
+            projection = [exp.Star()]
+
+        select = exp.select(*projection).from_(source)
+        condition = self.filter_expression()
+        if condition is not None:
+            select = select.where(condition)
+        for extra in extra_conditions or []:
+            select = select.where(extra)
+        if self.group_by:
+            select = select.group_by(
+                *[exp.Column(this=exp.to_identifier(c)) for c in self.group_by]
+            )
+        if self.order_by:
+            select = select.order_by(*[o.copy() for o in self.order_by])
+        if limit is None:
+            limit = self.limit
+        if limit is not None:
+            select = select.limit(limit)
+
+        sql = select.sql(dialect="sqlite")
+        if self.source is not None and sql == self._passthrough_sql():
+            # Nothing added to the subquery: send it as written
+            sql = self.source.body.sql(dialect="sqlite")
+        if plain:
+            self._sql = sql
+        return sql
+
+    def _passthrough_sql(self) -> str:
+        columns = self.source.columns
+        projection = (
+            [exp.Column(this=exp.to_identifier(c)) for c in columns] if columns else [exp.Star()]
+        )
+        return (
+            exp.select(*projection)
+            .from_(
+                exp.Subquery(
+                    this=self.source.body.copy(),
+                    alias=exp.TableAlias(this=exp.to_identifier(self.virtual_table)),
+                )
+            )
+            .sql(dialect="sqlite")
+        )
+
+
+@dataclass
+class JoinStep:
+    """
+    One build/probe hash join of a left-deep pipeline.
+    The joined table is the build side; rows flowing through the pipeline probe it.
+    """
+
+    alias: str
+    virtual_table: str
+    left_outer: bool
+    # (probe_alias, probe_column, build_column) equi-join pairs from the ON clause
+    keys: List[Tuple[str, str, str]] = field(default_factory=list)
+    # Rows expected out of this join (None without statistics)
+    estimated_rows: Optional[float] = None
+
+
+@dataclass
+class SemiJoin:
+    """
+    Key-set reduction: the distinct join keys of the (selective) source side are
+    pushed to the target side's child as 'target_column IN (...)'.
+    """
+
+    source_alias: str
+    source_column: str
+    target_alias: str
+    target_column: str
+
+
+@dataclass
+class QueryPlan:
+    """
+    Result of planning a cross-database query.
+    The original expression is still executed locally on top of the scans,
+    so anything pushed down is only a reduction of the transferred data.
+    With aggregate pushdown, expression is the rewritten query that finishes
+    the partial aggregates.
+    """
+
+    expression: exp.Expression
+    scans: Dict[str, TableScan] = field(default_factory=dict)
+
+    # Top-level alias -> virtual table (in FROM/JOIN order)
+    alias_map: Dict[str, str] = field(default_factory=dict)
+
+    # Native hash join pipeline: the FROM table is streamed through the join steps.
+    # None when the query shape needs the SQLite staging engine.
+    probe_alias: Optional[str] = None
+    join_steps: Optional[List[JoinStep]] = None
+
+    # True when WHERE conjuncts remain that were not pushed to a child
+    residual_where: bool = False
+
+    # Semi-join reductions of the native pipeline (at most one per target)
+    semi_joins: List[SemiJoin] = field(default_factory=list)
+
+    # Alias whose scan carries a pushed ORDER BY ... LIMIT (see _push_top_n)
+    top_n_alias: Optional[str] = None
+    # LIMIT of the query: fewer output rows means the pushed top-N may have been too small
+    top_n_rows: Optional[int] = None
+
+    # Rows expected out of the join pipeline (None without statistics)
+    estimated_rows: Optional[float] = None
+
+    # Single-database subqueries the expression reads as tables (see ScopeDecomposer)
+    derived: Dict[str, DerivedTable] = field(default_factory=dict)
+
+    def estimated_transfer_rows(self) -> Optional[float]:
+        """Rows fetched from all children, None when any scan has no estimate."""
+        estimates = [scan.estimated_rows for scan in self.scans.values()]
+        if any(rows is None for rows in estimates):
+            return None
+        return sum(estimates)
+
+
+class FederatedPlanner:
+    """
+    Decomposes a cross-database query into per-table scans.
+    Responsibility: decide which parts of the query can run inside the child databases.
+    """
+
+    def __init__(
+        self,
+        table_to_db: Dict[str, str],
+        table_to_physical: Dict[str, str],
+        column_lookup: Callable[[str], List[str]],
+        statistics: Optional[StatisticsCollector] = None,
+    ):
+        self.table_to_db = table_to_db
+        self.table_to_physical = table_to_physical
+        # Returns the column names of a virtual table (used to resolve unqualified columns)
+        self.column_lookup = column_lookup
+        # Optional: enables cardinality estimates and cost-based join ordering
+        self.statistics = statistics
+        self.derived: Dict[str, DerivedTable] = {}
+
+    def with_derived(self, derived: Dict[str, DerivedTable]) -> "FederatedPlanner":
+        """Planner that also resolves the derived tables of one query."""
+        if not derived:
+            return self
+        planner = FederatedPlanner(
+            table_to_db={**self.table_to_db, **{n: d.db_alias for n, d in derived.items()}},
+            table_to_physical={**self.table_to_physical, **{n: n for n in derived}},
+            column_lookup=lambda name: (
+                derived[name].columns or [] if name in derived else self.column_lookup(name)
+            ),
+            statistics=self.statistics,
+        )
+        planner.derived = derived
+        return planner
+
+    def plan(self, expression: exp.Expression, push_top_n: bool = True) -> QueryPlan:
+        plan = QueryPlan(expression=expression, derived=self.derived)
+
+        # Every table reference gets a scan, wherever it appears in the tree
+        for table in expression.find_all(exp.Table):
+            self._scan_for(plan, table.name)
+
+        if not isinstance(expression, exp.Select):
+            # UNION / set operations: no pushdown, fetch the tables as-is
+            for scan in plan.scans.values():
+                scan.unfiltered = True
+                scan.columns = self.column_lookup(scan.virtual_table) or None
+            return plan
+
+        # Projection pushdown: every scope reading a table contributes columns
+        for v_table, columns in self._required_columns(expression).items():
+            # Explicit column lists also name the staged columns; None = unknown schema
+            plan.scans[v_table].columns = columns or self.column_lookup(v_table) or None
+
+        alias_map = self._alias_map(expression)
+        top_level = {id(node) for node in self._sources(expression)}
+
+        # References outside the top-level FROM/JOIN list (subqueries, CTEs)
+        # must see the whole table.
+        for table in expression.find_all(exp.Table):
+            if id(table) not in top_level:
+                plan.scans[table.name].unfiltered = True
+
+        for alias, v_table in alias_map.items():
+            plan.scans[v_table].predicates.setdefault(alias, [])
+
+        pushed = set()
+        for alias, conjunct in self._pushable_conjuncts(expression, alias_map):
+            scan = plan.scans[alias_map[alias]]
+            scan.predicates[alias].append(self._to_physical_predicate(conjunct))
+            pushed.add(id(conjunct))
+
+        plan.alias_map = alias_map
+        where = expression.args.get("where")
+        plan.residual_where = any(
+            id(c) not in pushed
+            for c in self._split_conjuncts(where.this if where else None)
+        )
+
+        if self.statistics is not None:
+            for scan in plan.scans.values():
+                scan.estimated_rows = self._estimate_scan_rows(scan)
+
+        # Eager aggregation: rewrites plan.expression, never the query we were given
+        self._push_aggregates(expression, plan)
+        if push_top_n:
+            self._push_top_n(expression, plan)
+
+        native = self._native_join(expression, plan, pushed)
+        if native is not None:
+            plan.probe_alias, plan.join_steps = native
+            if self.statistics is not None:
+                self._order_joins(plan)
+            plan.semi_joins = self._semi_joins(plan)
+            if self.statistics is not None:
+                self._estimate_pipeline(plan)
+
+        return plan
+
+    # --- Top-N pushdown ---
+
+    def _push_top_n(self, select: exp.Select, plan: QueryPlan) -> None:
+        """
+        Pushes ORDER BY ... LIMIT n (or a bare LIMIT) to the one table the sort
+        keys belong to. Every output row comes from a row of that table and sorts
+        by it, so the first n output rows only need its first n rows, as long as
+        the joins and residual filters keep enough of them. The executor checks
+        that and re-runs without the pushdown otherwise (see QueryPlan.top_n_rows).
+        """
+        alias_map = plan.alias_map
+        limit = literal_int(select.args.get("limit"))
+        offset = literal_int(select.args.get("offset"))
+        if limit is None or limit is False or offset is False:
+            return
+        if len(alias_map) < 2 or len(set(alias_map.values())) != len(alias_map):
+            return
+        if with_clause(select) is not None:
+            return
+        for clause in ("group", "having", "distinct", "qualify"):
+            if select.args.get(clause):
+                return
+        if select.find(exp.AggFunc, exp.Window) or any(
+            node is not select for node in select.find_all(exp.Select)
+        ):
+            return
+
+        order = select.args.get("order")
+        ordered = order.expressions if order else []
+        if ordered:
+            owners = set()
+            physical = []
+            for item in ordered:
+                key = self._order_key(select, item.this)
+                owner = self._owner_alias(key, alias_map) if key is not None else None
+                if owner is None:
+                    return
+                owners.add(owner)
+                pushed_item = item.copy()
+                pushed_item.set("this", self._to_physical_predicate(key))
+                physical.append(pushed_item)
+            if len(owners) != 1:
+                return
+            alias = owners.pop()
+        else:
+            from_clause = self._from_clause(select)
+            if from_clause is None or not isinstance(from_clause.this, exp.Table):
+                return
+            alias = from_clause.this.alias_or_name
+            physical = []
+
+        scan = plan.scans[alias_map[alias]]
+        if alias in self._nullable_aliases(select) or scan.unfiltered:
+            return
+        if scan.group_by is not None:
+            return
+
+        scan.order_by = physical
+        scan.limit = limit + (offset or 0)
+        if scan.estimated_rows is not None:
+            scan.estimated_rows = min(scan.estimated_rows, float(scan.limit))
+        plan.top_n_alias = alias
+        plan.top_n_rows = limit
+        logger.info(f"[Federation] Top-{scan.limit} pushed to '{scan.virtual_table}'")
+
+    @staticmethod
+    def _order_key(
+        select: exp.Select, key: exp.Expression
+    ) -> Optional[exp.Expression]:
+        """Resolves ORDER BY ordinals and output aliases to the selected expression."""
+        if isinstance(key, exp.Literal) and not key.is_string:
+            index = int(key.this) - 1
+            if not 0 <= index < len(select.expressions):
+                return None
+            item = select.expressions[index]
+            return item.this if isinstance(item, exp.Alias) else item
+        if isinstance(key, exp.Column) and not key.table:
+            for item in select.expressions:
+                if isinstance(item, exp.Alias) and item.alias.lower() == key.name.lower():
+                    return item.this
+        return key
+
+    # --- Aggregate pushdown ---
+
+    def _push_aggregates(self, select: exp.Select, plan: QueryPlan) -> None:
+        """
+        Pushes partial aggregation to the child owning every aggregated column.
+
+        The table is pre-aggregated on all of its columns used outside aggregates
+        (join keys, GROUP BY, residual filters...), so each partial row joins
+        exactly like the rows it summarises. The local query then combines the
+        partials: SUM -> SUM, COUNT -> SUM, MIN/MAX -> MIN/MAX, AVG -> SUM / SUM.
+        """
+        alias_map = plan.alias_map
+        if len(alias_map) < 2 or len(set(alias_map.values())) != len(alias_map):
+            return
+        if with_clause(select) is not None or any(
+            node is not select for node in select.find_all(exp.Select)
+        ):
+            return
+        if select.find(exp.Window) or any(
+            isinstance(item, exp.Star)
+            or (isinstance(item, exp.Column) and isinstance(item.this, exp.Star))
+            for item in select.expressions
+        ):
+            return
+
+        aggregates = list(select.find_all(exp.AggFunc))
+        if not aggregates:
+            return
+
+        owner = None
+        for agg in aggregates:
+            if not isinstance(agg, DECOMPOSABLE_AGGREGATES):
+                return
+            # DISTINCT does not decompose, nested aggregates are not plain partials
+            if agg.find(exp.Distinct) or len(list(agg.find_all(exp.AggFunc))) != 1:
+                return
+            for column in agg.find_all(exp.Column):
+                alias = self._resolve_column(column, alias_map)
+                if alias is None or owner not in (None, alias):
+                    return
+                owner = alias
+        if owner is None:
+            # Only COUNT(*): nothing ties the count to one table
+            return
+
+        scan = plan.scans[alias_map[owner]]
+        if owner in self._nullable_aliases(select) or scan.unfiltered or not scan.columns:
+            return
+
+        rewritten = select.copy()
+
+        # Pushed filters are applied before the child groups: drop them locally
+        for alias, conjunct in self._pushable_conjuncts(rewritten, alias_map):
+            if alias == owner:
+                conjunct.replace(exp.true())
+
+        # Every other reference to the table becomes a grouping key
+        canonical = {c.lower(): c for c in self.column_lookup(alias_map[owner])}
+        keys: List[str] = []
+        for column in rewritten.find_all(exp.Column):
+            if column.find_ancestor(exp.AggFunc):
+                continue
+            if self._resolve_column(column, alias_map) != owner:
+                continue
+            name = canonical.get(column.name.lower())
+            if name is None:
+                return
+            if name not in keys:
+                keys.append(name)
+
+        if not self._aggregation_reduces(scan, keys):
+            return
+
+        # Unaliased items keep the name the original query would produce
+        for item in rewritten.expressions:
+            if not isinstance(item, exp.Alias) and item.find(exp.AggFunc):
+                item.replace(exp.alias_(item.copy(), item.sql(dialect="sqlite")))
+
+        partials: Dict[str, str] = {}
+
+        def partial(agg: exp.Expression) -> exp.Column:
+            physical = self._to_physical_predicate(agg)
+            sql = physical.sql(dialect="sqlite")
+            if sql not in partials:
+                partials[sql] = f"__agg_{len(partials)}"
+                scan.aggregates.append((partials[sql], physical))
+            return exp.column(partials[sql], table=owner)
+
+        rewritten = rewritten.transform(
+            lambda node: combine_partials(node, partial), copy=False
+        )
+
+        scan.group_by = keys
+        scan.columns = keys + [name for name, _ in scan.aggregates]
+        plan.expression = rewritten
+        logger.info(
+            f"[Federation] Partial aggregation pushed to '{scan.virtual_table}' "
+            f"(GROUP BY {', '.join(keys) or '()'})"
+        )
+
+    def _aggregation_reduces(self, scan: TableScan, keys: List[str]) -> bool:
+        """False when statistics say the grouping keys are (nearly) unique."""
+        if self.statistics is None or not keys:
+            return True
+        stats = self.statistics.table_stats(scan.virtual_table)
+        if stats is None:
+            return True
+        if any(key.lower() in stats.unique_columns for key in keys):
+            return False
+        if len(keys) == 1:
+            distinct = self.statistics.distinct_values(scan.virtual_table, keys[0])
+            if distinct:
+                if distinct * 2 > stats.row_count:
+                    return False
+                if scan.estimated_rows is not None:
+                    scan.estimated_rows = min(scan.estimated_rows, float(distinct))
+        return True
+
+    # --- Cost model ---
+
+    def _estimate_scan_rows(self, scan: TableScan) -> Optional[float]:
+        stats = self.statistics.table_stats(scan.virtual_table)
+        if stats is None:
+            return None
+        rows = float(stats.row_count)
+        if scan.filter_expression() is None:
+            return rows
+
+        # References are OR-ed: add up the branches, capped at the table size
+        selectivity = sum(
+            self._conjunction_selectivity(scan.virtual_table, conjuncts)
+            for conjuncts in scan.predicates.values()
+        )
+        return rows * min(1.0, selectivity)
+
+    def _conjunction_selectivity(
+        self, v_table: str, conjuncts: List[exp.Expression]
+    ) -> float:
+        selectivity = 1.0
+        for conjunct in conjuncts:
+            selectivity *= self._selectivity(v_table, conjunct)
+        return selectivity
+
+    def _known_distinct(self, v_table: str, column: exp.Expression) -> Optional[int]:
+        """NDV from already collected stats only (filters never trigger a scan)."""
+        if not isinstance(column, exp.Column):
+            return None
+        stats = self.statistics.table_stats(v_table)
+        if stats is None:
+            return None
+        name = column.name.lower()
+        if name in stats.unique_columns:
+            return stats.row_count
+        column_stats = stats.columns.get(name)
+        return column_stats.distinct if column_stats else None
+
+    def _selectivity(self, v_table: str, predicate: exp.Expression) -> float:
+        """Classic System R style estimates, refined by NDV when known."""
+        if isinstance(predicate, exp.Paren):
+            return self._selectivity(v_table, predicate.this)
+        if isinstance(predicate, exp.Not):
+            return 1.0 - self._selectivity(v_table, predicate.this)
+        if isinstance(predicate, exp.Or):
+            left = self._selectivity(v_table, predicate.this)
+            right = self._selectivity(v_table, predicate.expression)
+            return left + right - left * right
+        if isinstance(predicate, exp.And):
+            return self._selectivity(v_table, predicate.this) * self._selectivity(
+                v_table, predicate.expression
+            )
+        if isinstance(predicate, exp.EQ):
+            distinct = self._known_distinct(v_table, predicate.this) or self._known_distinct(
+                v_table, predicate.expression
+            )
+            return 1.0 / distinct if distinct else 0.1
+        if isinstance(predicate, exp.In):
+            distinct = self._known_distinct(v_table, predicate.this)
+            values = len(predicate.expressions) or 1
+            return min(1.0, values / distinct if distinct else values * 0.1)
+        if isinstance(predicate, (exp.GT, exp.GTE, exp.LT, exp.LTE)):
+            return 1.0 / 3
+        if isinstance(predicate, exp.Between):
+            return 0.25
+        if isinstance(predicate, exp.Is):
+            return 0.1
+        if isinstance(predicate, (exp.Like, exp.ILike)):
+            return 0.2
+        return 0.5
+
+    def _order_joins(self, plan: QueryPlan) -> None:
+        """
+        Cost-based ordering of an INNER-only pipeline:
+        the largest table is streamed (probe), the others are hashed, and the
+        next table joined is always the one giving the smallest intermediate result.
+        Pipelines with LEFT joins keep the written order.
+        """
+        if any(step.left_outer for step in plan.join_steps):
+            return
+
+        estimates = {
+            alias: plan.scans[v_table].estimated_rows
+            for alias, v_table in plan.alias_map.items()
+        }
+        if any(rows is None for rows in estimates.values()):
+            return
+
+        # Undirected equi-join graph: alias -> [(other_alias, column, other_column)]
+        edges: Dict[str, List[Tuple[str, str, str]]] = {a: [] for a in plan.alias_map}
+        for step in plan.join_steps:
+            for probe_alias, probe_column, build_column in step.keys:
+                edges[step.alias].append((probe_alias, build_column, probe_column))
+                edges[probe_alias].append((step.alias, probe_column, build_column))
+
+        probe_alias = max(plan.alias_map, key=lambda a: estimates[a])
+        placed = [probe_alias]
+        current_rows = estimates[probe_alias]
+        steps = []
+
+        while len(placed) < len(plan.alias_map):
+            best = None
+            for alias in plan.alias_map:
+                if alias in placed:
+                    continue
+                keys = [
+                    (other, other_column, column)
+                    for other, column, other_column in edges[alias]
+                    if other in placed
+                ]
+                if not keys:
+                    continue
+                output = current_rows * estimates[alias]
+                for other, other_column, column in keys:
+                    output /= max(
+                        self._join_distinct(plan, other, other_column, estimates[other]),
+                        self._join_distinct(plan, alias, column, estimates[alias]),
+                        1.0,
+                    )
+                if best is None or output < best[0]:
+                    best = (output, alias, keys)
+
+            if best is None:
+                # Disconnected graph: keep the written order
+                return
+            output, alias, keys = best
+            steps.append(
+                JoinStep(
+                    alias=alias,
+                    virtual_table=plan.alias_map[alias],
+                    left_outer=False,
+                    keys=keys,
+                )
+            )
+            placed.append(alias)
+            current_rows = output
+
+        if probe_alias != plan.probe_alias or [s.alias for s in steps] != [
+            s.alias for s in plan.join_steps
+        ]:
+            logger.info(
+                f"[Federation] Cost-based join order: {' -> '.join(placed)} "
+                f"(estimated rows {estimates})"
+            )
+        plan.probe_alias = probe_alias
+        plan.join_steps = steps
+
+    def _estimate_pipeline(self, plan: QueryPlan) -> None:
+        """Estimates semi-join reduced scans and the output of every join step."""
+        estimates = {
+            alias: plan.scans[v_table].estimated_rows
+            for alias, v_table in plan.alias_map.items()
+        }
+        if any(rows is None for rows in estimates.values()):
+            return
+
+        # A reduced target keeps about (source keys / target NDV) of its rows
+        for semi_join in plan.semi_joins:
+            target = plan.scans[plan.alias_map[semi_join.target_alias]]
+            distinct = self._join_distinct(
+                plan,
+                semi_join.target_alias,
+                semi_join.target_column,
+                estimates[semi_join.target_alias],
+            )
+            fraction = min(1.0, estimates[semi_join.source_alias] / max(distinct, 1.0))
+            target.estimated_rows = estimates[semi_join.target_alias] * fraction
+            estimates[semi_join.target_alias] = target.estimated_rows
+
+        current_rows = estimates[plan.probe_alias]
+        for step in plan.join_steps:
+            output = current_rows * estimates[step.alias]
+            for probe_alias, probe_column, build_column in step.keys:
+                output /= max(
+                    self._join_distinct(
+                        plan, probe_alias, probe_column, estimates[probe_alias]
+                    ),
+                    self._join_distinct(
+                        plan, step.alias, build_column, estimates[step.alias]
+                    ),
+                    1.0,
+                )
+            if step.left_outer:
+                # Unmatched rows are kept, NULL-extended
+                output = max(output, current_rows)
+            step.estimated_rows = output
+            current_rows = output
+        plan.estimated_rows = current_rows
+
+    def _join_distinct(
+        self, plan: QueryPlan, alias: str, column: str, estimated_rows: float
+    ) -> float:
+        """NDV of a join column after filters (bounded by the estimated rows)."""
+        distinct = self.statistics.distinct_values(plan.alias_map[alias], column)
+        if not distinct:
+            return estimated_rows
+        return min(float(distinct), estimated_rows)
+
+    def _semi_joins(self, plan: QueryPlan) -> List[SemiJoin]:
+        """
+        Picks key-set reductions along the equi-join edges.
+        A selective side (much smaller estimate, or filtered vs unfiltered
+        without statistics) reduces its partner. The reduced side must not
+        be preserved by an outer join: LEFT joins only reduce their build side.
+        """
+
+        def filtered(alias: str) -> bool:
+            return bool(plan.scans[plan.alias_map[alias]].predicates.get(alias))
+
+        def selective(source: str, target: str) -> bool:
+            source_rows = plan.scans[plan.alias_map[source]].estimated_rows
+            target_rows = plan.scans[plan.alias_map[target]].estimated_rows
+            if source_rows is None or target_rows is None:
+                return filtered(source) and not filtered(target)
+            # With statistics: worth it when the source is much smaller
+            return source_rows * 2 < target_rows
+
+        reductions: Dict[str, SemiJoin] = {}
+        for step in plan.join_steps or []:
+            for probe_alias, probe_column, build_column in step.keys:
+                candidates = [
+                    SemiJoin(probe_alias, probe_column, step.alias, build_column)
+                ]
+                if not step.left_outer:
+                    candidates.append(
+                        SemiJoin(step.alias, build_column, probe_alias, probe_column)
+                    )
+                for candidate in candidates:
+                    if candidate.target_alias in reductions:
+                        continue
+                    if selective(candidate.source_alias, candidate.target_alias):
+                        reductions[candidate.target_alias] = candidate
+
+        # Sources are fetched before their targets: no chains
+        return [
+            sj for sj in reductions.values() if sj.source_alias not in reductions
+        ]
+
+    def _native_join(
+        self, select: exp.Select, plan: QueryPlan, pushed: Set[int]
+    ) -> Optional[Tuple[str, List[JoinStep]]]:
+        """
+        Extracts a left-deep equi-join pipeline (INNER / LEFT joins) from the query.
+        Returns None when the shape is not supported natively.
+        """
+        alias_map = plan.alias_map
+        from_clause = self._from_clause(select)
+        if from_clause is None or not isinstance(from_clause.this, exp.Table):
+            return None
+
+        # Self-joins share a scan, subqueries/CTEs need the full SQL engine
+        if len(set(alias_map.values())) != len(alias_map):
+            return None
+        if with_clause(select) is not None or any(
+            node is not select for node in select.find_all(exp.Select)
+        ):
+            return None
+        if any(
+            scan.unfiltered or scan.columns is None for scan in plan.scans.values()
+        ):
+            return None
+
+        probe_alias = from_clause.this.alias_or_name
+        seen = [probe_alias]
+        steps = []
+
+        for join in select.args.get("joins") or []:
+            side = (join.side or "").upper()
+            kind = (join.kind or "").upper()
+            if not isinstance(join.this, exp.Table) or join.args.get("using"):
+                return None
+            if side not in ("", "LEFT") or kind not in ("", "INNER", "OUTER"):
+                return None
+
+            alias = join.this.alias_or_name
+            keys = []
+            for conjunct in self._split_conjuncts(join.args.get("on")):
+                if id(conjunct) in pushed:
+                    # Already applied by the child database
+                    continue
+                key = self._equi_key(conjunct, alias, seen, alias_map)
+                if key is None:
+                    return None
+                keys.append(key)
+
+            if not keys:
+                return None
+            steps.append(
+                JoinStep(
+                    alias=alias,
+                    virtual_table=alias_map[alias],
+                    left_outer=side == "LEFT",
+                    keys=keys,
+                )
+            )
+            seen.append(alias)
+
+        return probe_alias, steps
+
+    def _equi_key(
+        self,
+        conjunct: exp.Expression,
+        build_alias: str,
+        probe_aliases: List[str],
+        alias_map: Dict[str, str],
+    ) -> Optional[Tuple[str, str, str]]:
+        """Matches 'probe.col = build.col' (either order) and returns the key pair."""
+        if not isinstance(conjunct, exp.EQ):
+            return None
+        left, right = conjunct.this, conjunct.expression
+        if not isinstance(left, exp.Column) or not isinstance(right, exp.Column):
+            return None
+
+        left_alias = self._resolve_column(left, alias_map)
+        right_alias = self._resolve_column(right, alias_map)
+        if right_alias == build_alias and left_alias in probe_aliases:
+            return left_alias, left.name, right.name
+        if left_alias == build_alias and right_alias in probe_aliases:
+            return right_alias, right.name, left.name
+        return None
+
+    def _required_columns(self, select: exp.Select) -> Dict[str, Optional[List[str]]]:
+        """
+        Walks every exp.Column of the query and returns, per virtual table,
+        the columns it must provide (None = all of them).
+        """
+        alias_map = self._alias_map(select)
+        top_level = {id(node) for node in self._sources(select)}
+        referenced: Dict[str, Optional[Set[str]]] = {}
+
+        for table in select.find_all(exp.Table):
+            v_table = table.name
+            known = self.column_lookup(v_table)
+            # Unknown schema or a reference we do not analyse: fetch every column
+            if not known or id(table) not in top_level:
+                referenced[v_table] = None
+            else:
+                referenced.setdefault(v_table, set())
+
+        # SELECT * needs every column of every top-level table
+        if any(isinstance(e, exp.Star) for e in select.expressions):
+            return {v_table: None for v_table in referenced}
+
+        for column in select.find_all(exp.Column):
+            if isinstance(column.this, exp.Star):
+                # "t.*"
+                v_table = alias_map.get(column.table)
+                if v_table:
+                    referenced[v_table] = None
+                continue
+
+            if column.table:
+                owners = [column.table] if column.table in alias_map else []
+            else:
+                # Unqualified and possibly ambiguous: keep it for every candidate
+                owners = list(alias_map)
+
+            for alias in owners:
+                columns = referenced.get(alias_map[alias])
+                if columns is None:
+                    continue
+                for known in self.column_lookup(alias_map[alias]):
+                    if known.lower() == column.name.lower():
+                        columns.add(known)
+
+        result: Dict[str, Optional[List[str]]] = {}
+        for v_table, columns in referenced.items():
+            if columns is None:
+                result[v_table] = None
+                continue
+            ordered = [c for c in self.column_lookup(v_table) if c in columns]
+            # A table used only for its row count (e.g. COUNT(*)) still needs one column
+            result[v_table] = ordered or self.column_lookup(v_table)[:1]
+        return result
+
+    # --- Helpers ---
+
+    def _scan_for(self, plan: QueryPlan, v_table: str) -> TableScan:
+        if v_table not in plan.scans:
+            plan.scans[v_table] = TableScan(
+                virtual_table=v_table,
+                db_alias=self.table_to_db[v_table],
+                physical_table=self.table_to_physical[v_table],
+                source=self.derived.get(v_table),
+            )
+        return plan.scans[v_table]
+
+    @staticmethod
+    def _from_clause(select: exp.Select) -> Optional[exp.From]:
+        # The key was renamed from 'from' to 'from_' in recent sqlglot releases
+        return select.args.get("from_") or select.args.get("from")
+
+    def _sources(self, select: exp.Select) -> List[exp.Expression]:
+        """Returns the FROM source followed by every JOIN source, in order."""
+        sources = []
+        from_clause = self._from_clause(select)
+        if from_clause is not None:
+            sources.append(from_clause.this)
+        for join in select.args.get("joins") or []:
+            sources.append(join.this)
+        return sources
+
+    def _alias_map(self, select: exp.Select) -> Dict[str, str]:
+        """Maps each top-level alias (or bare table name) to its virtual table."""
+        alias_map = {}
+        for source in self._sources(select):
+            if isinstance(source, exp.Table):
+                alias_map[source.alias_or_name] = source.name
+        return alias_map
+
+    def _nullable_aliases(self, select: exp.Select) -> Set[str]:
+        """
+        Aliases on the NULL-supplying side of an outer join.
+        Filtering those before the join would change the result.
+        """
+        nullable: Set[str] = set()
+        seen: List[str] = []
+        from_clause = self._from_clause(select)
+        if from_clause is not None:
+            seen.append(from_clause.this.alias_or_name)
+
+        for join in select.args.get("joins") or []:
+            alias = join.this.alias_or_name
+            side = (join.side or "").upper()
+            if side in ("RIGHT", "FULL"):
+                nullable.update(seen)
+            if side in ("LEFT", "FULL"):
+                nullable.add(alias)
+            seen.append(alias)
+        return nullable
+
+    @staticmethod
+    def _split_conjuncts(condition: Optional[exp.Expression]) -> List[exp.Expression]:
+        if condition is None:
+            return []
+        if isinstance(condition, exp.Paren) and isinstance(condition.this, exp.And):
+            return FederatedPlanner._split_conjuncts(condition.this)
+        if isinstance(condition, exp.And):
+            return FederatedPlanner._split_conjuncts(
+                condition.this
+            ) + FederatedPlanner._split_conjuncts(condition.expression)
+        return [condition]
+
+    def _pushable_conjuncts(self, select: exp.Select, alias_map: Dict[str, str]):
+        """
+        Yields (alias, conjunct) pairs that only reference a single table
+        and can safely be evaluated inside that table's child database.
+        """
+        nullable = self._nullable_aliases(select)
+
+        # WHERE: any single-table conjunct on a row-preserving table
+        where = select.args.get("where")
+        for conjunct in self._split_conjuncts(where.this if where else None):
+            alias = self._owner_alias(conjunct, alias_map)
+            if alias and alias not in nullable:
+                yield alias, conjunct
+
+        # ON: inner joins filter both sides, LEFT joins only filter the joined table
+        for join in select.args.get("joins") or []:
+            side = (join.side or "").upper()
+            if side in ("RIGHT", "FULL"):
+                continue
+            joined_alias = join.this.alias_or_name
+            for conjunct in self._split_conjuncts(join.args.get("on")):
+                alias = self._owner_alias(conjunct, alias_map)
+                if not alias:
+                    continue
+                if side == "LEFT" and alias != joined_alias:
+                    continue
+                if alias in nullable and alias != joined_alias:
+                    continue
+                yield alias, conjunct
+
+    def _owner_alias(
+        self, conjunct: exp.Expression, alias_map: Dict[str, str]
+    ) -> Optional[str]:
+        """Returns the alias a conjunct depends on, or None if it is not pushable."""
+        if conjunct.find(exp.Subquery, exp.Select, exp.AggFunc, exp.Window, exp.Star):
+            return None
+
+        owners = set()
+        for column in conjunct.find_all(exp.Column):
+            owner = self._resolve_column(column, alias_map)
+            if owner is None:
+                return None
+            owners.add(owner)
+
+        if len(owners) != 1:
+            return None
+        return owners.pop()
+
+    def _resolve_column(
+        self, column: exp.Column, alias_map: Dict[str, str]
+    ) -> Optional[str]:
+        qualifier = column.table
+        if qualifier:
+            return qualifier if qualifier in alias_map else None
+
+        # Unqualified: the column must exist in exactly one referenced table
+        name = column.name.lower()
+        candidates = [
+            alias
+            for alias, v_table in alias_map.items()
+            if name in {c.lower() for c in self.column_lookup(v_table)}
+        ]
+        return candidates[0] if len(candidates) == 1 else None
+
+    @staticmethod
+    def _to_physical_predicate(conjunct: exp.Expression) -> exp.Expression:
+        """Strips table qualifiers so the predicate runs against the physical table."""
+
+        def transformer(node):
+            if isinstance(node, exp.Column) and node.table:
+                return exp.column(node.this.copy())
+            return node
+
+        return conjunct.copy().transform(transformer)
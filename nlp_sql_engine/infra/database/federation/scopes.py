@@ -0,0 +1,332 @@
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from sqlglot import exp
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+DERIVED_PREFIX = "__derived_"
+
+
+@dataclass
+class DerivedTable:
+    """
+    A subtree of the query that touches a single database (CTE, derived table,
+    subquery or UNION branch). It is sent to that database whole and the rest
+    of the query reads its result like a table.
+    """
+
+    name: str
+    db_alias: str
+    # Physical query run by the child (virtual names already replaced)
+    body: exp.Expression
+    # Output column names, None when they cannot be told from the SQL
+    columns: Optional[List[str]] = None
+
+
+def with_clause(node: exp.Expression) -> Optional[exp.With]:
+    # The key was renamed from 'with' to 'with_' in recent sqlglot releases
+    return node.args.get("with_") or node.args.get("with")
+
+
+class ScopeDecomposer:
+    """
+    Splits a cross-database query along its scopes.
+
+    Every CTE, derived table, subquery or UNION branch that only touches one
+    database (and does not reference the outer query) becomes a DerivedTable,
+    so its joins, filters and aggregates run inside that database. CTEs that
+    span several databases are inlined as derived tables and decomposed further.
+    What is left is the cross-database part, planned and finished locally.
+    """
+
+    def __init__(
+        self,
+        table_to_db: Dict[str, str],
+        column_lookup: Callable[[str], List[str]],
+        to_physical: Callable[[exp.Expression, str], exp.Expression],
+    ):
+        self.table_to_db = table_to_db
+        self.column_lookup = column_lookup
+        # Rewrites virtual table names of a subtree for one database
+        self.to_physical = to_physical
+
+    def decompose(
+        self, expression: exp.Expression
+    ) -> Tuple[exp.Expression, Dict[str, DerivedTable]]:
+        """Returns the rewritten query and the derived tables it now reads."""
+        expression = expression.copy()
+        ctes = {cte.alias: cte for cte in expression.find_all(exp.CTE)}
+        for cte in ctes.values():
+            self._apply_column_aliases(cte)
+        cte_dbs: Dict[str, Set[str]] = {}
+        derived: Dict[str, DerivedTable] = {}
+        pushed_ctes: List[exp.CTE] = []
+
+        def dbs_of(node: exp.Expression, visiting: Tuple[str, ...] = ()) -> Set[str]:
+            dbs: Set[str] = set()
+            for table in node.find_all(exp.Table):
+                name = table.name
+                if name in ctes:
+                    if name in visiting:
+                        # Recursive reference: already being counted
+                        continue
+                    if name not in cte_dbs:
+                        cte_dbs[name] = dbs_of(ctes[name].this, visiting + (name,))
+                    dbs |= cte_dbs[name]
+                elif name in self.table_to_db:
+                    dbs.add(self.table_to_db[name])
+            return dbs
+
+        def push(node: exp.Expression, name: str, columns=None) -> None:
+            db_alias = next(iter(dbs_of(node)))
+            body = self._with_referenced_ctes(node.copy(), ctes)
+            derived[name] = DerivedTable(
+                name=name,
+                db_alias=db_alias,
+                body=self.to_physical(body, db_alias),
+                columns=columns or self._output_columns(node, ctes),
+            )
+            logger.info(f"[Federation] Pushing subquery '{name}' to '{db_alias}' whole")
+
+        def pushable(node: exp.Expression) -> bool:
+            return len(dbs_of(node)) == 1 and not self._is_correlated(node, ctes)
+
+        def new_name() -> str:
+            return f"{DERIVED_PREFIX}{len(derived) + 1}"
+
+        def visit(node: exp.Expression) -> None:
+            for child in list(node.iter_expressions()):
+                if isinstance(child, exp.CTE):
+                    if pushable(child.this):
+                        if child.parent.args.get("recursive"):
+                            # Sent as WITH RECURSIVE x AS (...) SELECT * FROM x
+                            columns = self._output_columns(child.this, ctes)
+                            push(self._read(child.alias), child.alias, columns)
+                        else:
+                            push(child.this, child.alias)
+                        pushed_ctes.append(child)
+                    else:
+                        visit(child)
+                elif isinstance(child, exp.Subquery) and pushable(child.this):
+                    if isinstance(child.parent, (exp.From, exp.Join)):
+                        alias = child.args.get("alias")
+                        if alias is not None and alias.columns:
+                            # Column alias lists have no table equivalent
+                            visit(child)
+                            continue
+                        name = new_name()
+                        push(child.this, name)
+                        child.replace(
+                            exp.Table(
+                                this=exp.to_identifier(name),
+                                alias=exp.TableAlias(
+                                    this=exp.to_identifier(child.alias or name)
+                                ),
+                            )
+                        )
+                    else:
+                        name = new_name()
+                        push(child.this, name)
+                        child.set("this", self._read(name))
+                elif (
+                    isinstance(child, (exp.Select, exp.SetOperation))
+                    and isinstance(node, (exp.SetOperation, exp.Exists))
+                    and pushable(child)
+                ):
+                    name = new_name()
+                    push(child, name)
+                    child.replace(self._read(name))
+                else:
+                    visit(child)
+
+        visit(expression)
+
+        for cte in pushed_ctes:
+            cte.pop()
+        self._inline_ctes(expression)
+        return expression, derived
+
+    # --- Helpers ---
+
+    def _output_columns(
+        self, query: exp.Expression, ctes: Dict[str, exp.CTE], seen: Tuple[str, ...] = ()
+    ) -> Optional[List[str]]:
+        """
+        Output names of a SELECT / set operation ('*' expanded from known schemas).
+        None when some output is unnamed, ambiguous or cannot be expanded.
+        """
+        while isinstance(query, exp.SetOperation):
+            query = query.this
+        if isinstance(query, exp.Subquery):
+            return self._output_columns(query.this, ctes, seen)
+        if not isinstance(query, exp.Select):
+            return None
+
+        names: List[str] = []
+        for item in query.expressions:
+            if isinstance(item, exp.Star):
+                expanded = self._star_columns(query, None, ctes, seen)
+            elif isinstance(item, exp.Column) and isinstance(item.this, exp.Star):
+                expanded = self._star_columns(query, item.table, ctes, seen)
+            else:
+                expanded = [item.output_name] if item.output_name else None
+            if expanded is None:
+                return None
+            names.extend(expanded)
+
+        if len({name.lower() for name in names}) != len(names):
+            return None
+        return names
+
+    def _star_columns(
+        self,
+        select: exp.Select,
+        qualifier: Optional[str],
+        ctes: Dict[str, exp.CTE],
+        seen: Tuple[str, ...],
+    ) -> Optional[List[str]]:
+        """Columns a '*' (or 'qualifier.*') expands to, in FROM/JOIN order."""
+        joins = select.args.get("joins") or []
+        if any(join.args.get("using") or join.args.get("method") for join in joins):
+            # USING / NATURAL joins merge columns
+            return None
+        from_clause = select.args.get("from_") or select.args.get("from")
+        sources = ([from_clause.this] if from_clause else []) + [j.this for j in joins]
+
+        names: List[str] = []
+        for source in sources:
+            if qualifier and source.alias_or_name != qualifier:
+                continue
+            if isinstance(source, exp.Table) and source.name in ctes:
+                if source.name in seen:
+                    return None
+                columns = self._output_columns(
+                    ctes[source.name].this, ctes, seen + (source.name,)
+                )
+            elif isinstance(source, exp.Table):
+                columns = self.column_lookup(source.name) or None
+            elif isinstance(source, exp.Subquery):
+                columns = self._output_columns(source.this, ctes, seen)
+            else:
+                columns = None
+            if columns is None:
+                return None
+            names.extend(columns)
+        return names
+
+    @staticmethod
+    def _apply_column_aliases(cte: exp.CTE) -> None:
+        """'WITH t(a, b) AS (SELECT x, y ...)' -> 'WITH t AS (SELECT x AS a, y AS b ...)'."""
+        alias = cte.args.get("alias")
+        columns = alias.columns if alias is not None else None
+        if not columns:
+            return
+        select = cte.this
+        while isinstance(select, exp.SetOperation):
+            # A set operation takes its column names from the leftmost SELECT
+            select = select.this
+        if not isinstance(select, exp.Select) or len(select.expressions) != len(columns):
+            return
+        select.set(
+            "expressions",
+            [
+                exp.alias_(item.unalias() if isinstance(item, exp.Alias) else item, column.name)
+                for item, column in zip(select.expressions, columns)
+            ],
+        )
+        alias.set("columns", None)
+
+    @staticmethod
+    def _read(name: str) -> exp.Select:
+        return exp.select("*").from_(exp.Table(this=exp.to_identifier(name)))
+
+    @staticmethod
+    def _with_referenced_ctes(
+        body: exp.Expression, ctes: Dict[str, exp.CTE]
+    ) -> exp.Expression:
+        """Prepends the definitions of the outer CTEs a pushed subtree reads."""
+        own = {cte.alias for cte in body.find_all(exp.CTE)}
+        needed: List[str] = []
+
+        def collect(node: exp.Expression) -> None:
+            for table in node.find_all(exp.Table):
+                name = table.name
+                if name in ctes and name not in own and name not in needed:
+                    needed.append(name)
+                    collect(ctes[name].this)
+
+        collect(body)
+        if not needed:
+            return body
+        # Definition order: a CTE may only read the ones before it
+        order = list(ctes)
+        definitions = [ctes[name].copy() for name in sorted(needed, key=order.index)]
+        recursive = any(ctes[name].parent.args.get("recursive") for name in needed)
+        existing = with_clause(body)
+        if existing is not None:
+            definitions += list(existing.expressions)
+            recursive = recursive or bool(existing.args.get("recursive"))
+        body.set("with_", exp.With(expressions=definitions, recursive=recursive or None))
+        return body
+
+    def _is_correlated(self, node: exp.Expression, ctes: Dict[str, exp.CTE]) -> bool:
+        """
+        True when the subtree may reference a column of an enclosing query.
+        Unqualified columns that cannot be matched to a table of the subtree
+        count as outer references (conservative).
+        """
+        aliases = {table.alias_or_name for table in node.find_all(exp.Table)}
+        aliases |= {sub.alias for sub in node.find_all(exp.Subquery) if sub.alias}
+
+        names: Set[str] = set()
+        for table in node.find_all(exp.Table):
+            if table.name in ctes:
+                names.update(
+                    c.lower()
+                    for c in self._output_columns(ctes[table.name].this, ctes) or []
+                )
+            else:
+                names.update(c.lower() for c in self.column_lookup(table.name))
+        for select in node.find_all(exp.Select):
+            names.update(item.output_name.lower() for item in select.expressions)
+
+        for column in node.find_all(exp.Column):
+            if isinstance(column.this, exp.Star):
+                continue
+            if column.table:
+                if column.table not in aliases:
+                    return True
+            elif column.name.lower() not in names:
+                return True
+        return False
+
+    @staticmethod
+    def _inline_ctes(expression: exp.Expression) -> None:
+        """
+        Replaces the references to the remaining (cross-database) CTEs with
+        their definition, so that the planner only sees tables and subqueries.
+        """
+        for with_node in list(expression.find_all(exp.With)):
+            if with_node.args.get("recursive") and with_node.expressions:
+                raise ValueError(
+                    "Recursive CTEs spanning several databases are not supported"
+                )
+            for cte in list(with_node.expressions):
+                scope = with_node.parent
+                for table in list(scope.find_all(exp.Table)):
+                    if table.name != cte.alias or table.find_ancestor(exp.CTE) is cte:
+                        continue
+                    table.replace(
+                        exp.Subquery(
+                            this=cte.this.copy(),
+                            alias=exp.TableAlias(
+                                this=exp.to_identifier(table.alias_or_name)
+                            ),
+                        )
+                    )
+                cte.pop()
+            if not with_node.expressions:
+                with_node.pop()
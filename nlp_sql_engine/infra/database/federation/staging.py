@@ -0,0 +1,266 @@
+import os
+import re
+import sqlite3
+import tempfile
+from contextlib import contextmanager
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from nlp_sql_engine.core.domain.cancellation import CancellationToken
+from nlp_sql_engine.infra.database.sqlite_adapter import PROGRESS_STEPS
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Types the sqlite3 driver can bind without an adapter
+_NATIVE_TYPES = (int, float, str, bytes, type(None))
+
+
+# Declared child types -> SQLite affinity of the staged column.
+# Anything else (dates, booleans, blobs...) is staged without a type: values kept as-is.
+_AFFINITIES = {
+    "INTEGER": {
+        "INT", "INTEGER", "BIGINT", "SMALLINT", "TINYINT", "MEDIUMINT",
+        "INT2", "INT4", "INT8", "SERIAL", "BIGSERIAL", "SMALLSERIAL",
+    },
+    "REAL": {"REAL", "FLOAT", "DOUBLE", "DOUBLE PRECISION", "FLOAT4", "FLOAT8"},
+    "NUMERIC": {"NUMERIC", "DECIMAL", "NUMBER", "MONEY"},
+    "TEXT": {
+        "TEXT", "VARCHAR", "CHAR", "NVARCHAR", "NCHAR", "CHARACTER",
+        "CHARACTER VARYING", "CLOB", "STRING", "TINYTEXT", "MEDIUMTEXT", "LONGTEXT",
+    },
+}
+_NUMERIC_AFFINITIES = {"INTEGER", "REAL", "NUMERIC"}
+# Text SQLite converts to a number under numeric affinity
+_NUMBER_TEXT = re.compile(r"\s*[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?\s*")
+
+
+def quote_identifier(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def interrupt_on(conn: sqlite3.Connection, cancel: Optional[CancellationToken]) -> None:
+    """Makes SQLite abort any statement running on conn once the token is stopped."""
+    if cancel is not None:
+        conn.set_progress_handler(lambda: int(cancel.stopped), PROGRESS_STEPS)
+
+
+@contextmanager
+def raise_cancelled(cancel: Optional[CancellationToken]) -> Iterator[None]:
+    """Reports statements aborted through interrupt_on as QueryCancelled / QueryTimeout."""
+    try:
+        yield
+    except sqlite3.OperationalError as e:
+        if cancel is not None and cancel.stopped:
+            raise cancel.exception() from e
+        raise
+
+
+def sqlite_affinity(declared_type: Optional[str]) -> Optional[str]:
+    """SQLite column type matching a child's declared type, None if unknown."""
+    if not declared_type:
+        return None
+    base = re.sub(r"\(.*", "", declared_type).strip().upper()
+    base = base.replace(" UNSIGNED", "")
+    for affinity, names in _AFFINITIES.items():
+        if base in names:
+            return affinity
+    return None
+
+
+def comparison_affinities(
+    left: Optional[str], right: Optional[str]
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Affinity SQLite applies to each operand of 'left = right' between two columns
+    of those affinities (None: the operand is compared as stored).
+    """
+    if left in _NUMERIC_AFFINITIES and right not in _NUMERIC_AFFINITIES:
+        return None, "NUMERIC"
+    if right in _NUMERIC_AFFINITIES and left not in _NUMERIC_AFFINITIES:
+        return "NUMERIC", None
+    if left == "TEXT" and right is None:
+        return None, "TEXT"
+    if right == "TEXT" and left is None:
+        return "TEXT", None
+    return None, None
+
+
+def to_affinity(value: Any, affinity: Optional[str]) -> Any:
+    """Value converted the way SQLite applies an affinity before comparing."""
+    if affinity in _NUMERIC_AFFINITIES:
+        if isinstance(value, str) and _NUMBER_TEXT.fullmatch(value):
+            text = value.strip()
+            try:
+                return int(text)
+            except ValueError:
+                return float(text)
+    elif affinity == "TEXT":
+        if isinstance(value, Decimal):
+            value = float(value)
+        if isinstance(value, int):
+            return str(int(value))
+        if isinstance(value, float):
+            # SQLite renders REAL values with 15 significant digits
+            text = f"{value:.15g}"
+            return text if any(c in text for c in ".eni") else text + ".0"
+    return value
+
+
+def column_definitions(
+    columns: List[str], types: Optional[List[Optional[str]]] = None
+) -> str:
+    """Column list of a CREATE TABLE, with declared types where known."""
+    definitions = []
+    for i, column in enumerate(columns):
+        declared = types[i] if types else None
+        definitions.append(
+            f"{quote_identifier(column)} {declared}" if declared else quote_identifier(column)
+        )
+    return ", ".join(definitions)
+
+
+def insert_rows(
+    conn: sqlite3.Connection, sql: str, rows: List[Sequence[Any]], coerce: bool = False
+) -> bool:
+    """
+    executemany of one batch, converting values only when the driver rejects them
+    (e.g. Decimal from Postgres). Commits the batch. Returns True once conversion
+    was needed, so the caller can convert up front from then on.
+    """
+    if not coerce:
+        try:
+            conn.executemany(sql, rows)
+            conn.commit()
+            return False
+        except (sqlite3.ProgrammingError, sqlite3.InterfaceError):
+            conn.rollback()
+    conn.executemany(sql, [tuple(_coerce_value(v) for v in row) for row in rows])
+    conn.commit()
+    return True
+
+
+def _coerce_value(value: Any) -> Any:
+    """Converts driver-specific values (Decimal, datetime...) into SQLite-bindable ones."""
+    if isinstance(value, _NATIVE_TYPES):
+        return value
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (bytearray, memoryview)):
+        return bytes(value)
+    return str(value)
+
+
+def estimate_row_bytes(row: Sequence[Any]) -> int:
+    """Rough in-memory footprint of a row once stored in SQLite."""
+    size = 0
+    for value in row:
+        if isinstance(value, (str, bytes)):
+            size += len(value) + 4
+        else:
+            size += 9
+    return size
+
+
+class StagingArea:
+    """
+    Local SQLite database that child results are streamed into before the
+    federated query is evaluated.
+
+    Starts in memory. Once the estimated size of the staged data exceeds the
+    memory budget, the database is copied to a temporary file (SQLite backup API)
+    and loading continues on disk, so peak memory stays bounded.
+    """
+
+    def __init__(
+        self,
+        memory_budget_bytes: int,
+        spill_dir: Optional[str] = None,
+        cancel: Optional[CancellationToken] = None,
+    ):
+        """cancel: statements on the staging DB are aborted once it is stopped."""
+        self.memory_budget_bytes = memory_budget_bytes
+        self.spill_dir = spill_dir
+        self.cancel = cancel
+        self.conn = sqlite3.connect(":memory:", check_same_thread=False)
+        interrupt_on(self.conn, cancel)
+        self.spill_path: Optional[str] = None
+        self.staged_bytes = 0
+        self._coerce_tables = set()
+
+    @property
+    def spilled(self) -> bool:
+        return self.spill_path is not None
+
+    def create_table(
+        self, name: str, columns: List[str], types: Optional[List[Optional[str]]] = None
+    ) -> None:
+        """types: declared SQLite types, so staged values keep the child's affinity."""
+        self.conn.execute(
+            f"CREATE TABLE {quote_identifier(name)} ({column_definitions(columns, types)})"
+        )
+
+    def insert_batch(self, name: str, rows: List[Sequence[Any]]) -> None:
+        """Inserts one batch of rows and spills to disk if the budget is exceeded."""
+        if not rows:
+            return
+
+        placeholders = ", ".join("?" for _ in rows[0])
+        sql = f"INSERT INTO {quote_identifier(name)} VALUES ({placeholders})"
+
+        # Non-native values seen once: convert every later batch up front
+        if insert_rows(self.conn, sql, rows, coerce=name in self._coerce_tables):
+            self._coerce_tables.add(name)
+
+        self.staged_bytes += estimate_row_bytes(rows[0]) * len(rows)
+        if not self.spilled and self.staged_bytes > self.memory_budget_bytes:
+            self._spill()
+
+    def execute(self, sql: str) -> sqlite3.Cursor:
+        return self.conn.execute(sql)
+
+    def close(self) -> None:
+        self.conn.close()
+        if self.spill_path:
+            try:
+                os.remove(self.spill_path)
+            except OSError as e:
+                logger.warning(f"Could not remove spill file {self.spill_path}: {e}")
+            self.spill_path = None
+
+    def _spill(self) -> None:
+        fd, path = tempfile.mkstemp(
+            prefix="federation_", suffix=".db", dir=self.spill_dir
+        )
+        os.close(fd)
+
+        logger.info(
+            f"[Federation] Staged data exceeded {self.memory_budget_bytes} bytes. "
+            f"Spilling to {path}"
+        )
+        disk_conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.backup(disk_conn)
+        self.conn.close()
+
+        # Scratch data: no need for durability
+        disk_conn.execute("PRAGMA journal_mode=OFF")
+        disk_conn.execute("PRAGMA synchronous=OFF")
+        self.conn = disk_conn
+        self.spill_path = path
+        interrupt_on(self.conn, self.cancel)
+
+
+def iter_batches(rows: Iterable[Any], batch_size: int) -> Iterable[List[Any]]:
+    """Groups a row iterator into lists of at most batch_size rows (fetchmany-style)."""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,211 @@
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Set
+
+from nlp_sql_engine.core.interfaces.db import IDatabaseConnector
+from nlp_sql_engine.infra.database.federation.children import dialect_of
+from nlp_sql_engine.infra.database.federation.staging import quote_identifier
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ColumnStats:
+    distinct: Optional[int] = None
+    min_value: Any = None
+    max_value: Any = None
+
+
+@dataclass
+class TableStats:
+    row_count: int
+    # Columns known to be unique (primary key), their NDV equals the row count
+    unique_columns: Set[str] = field(default_factory=set)
+    columns: Dict[str, ColumnStats] = field(default_factory=dict)
+    collected_at: float = field(default_factory=time.monotonic)
+
+
+def _first_row(adapter: IDatabaseConnector, sql: str) -> Optional[Any]:
+    rows = adapter.execute_query(sql)
+    try:
+        return next(iter(rows), None)
+    finally:
+        if hasattr(rows, "close"):
+            rows.close()
+
+
+class StatisticsCollector:
+    """
+    Gathers and caches table statistics from the federated children:
+    row counts, and distinct-value estimates and min/max for join columns.
+
+    Cheap sources are preferred (sqlite_stat1, pg_class, primary keys from
+    reflection); a full COUNT(*) / COUNT(DISTINCT) scan is the fallback.
+    Entries expire after ttl_seconds. generation changes whenever cached
+    numbers are replaced or dropped, so plans costed with them can be redone.
+    """
+
+    def __init__(
+        self,
+        adapters: Dict[str, IDatabaseConnector],
+        table_to_db: Dict[str, str],
+        table_to_physical: Dict[str, str],
+        ttl_seconds: float = 600,
+    ):
+        self.adapters = adapters
+        self.table_to_db = table_to_db
+        self.table_to_physical = table_to_physical
+        self.ttl_seconds = ttl_seconds
+        self._cache: Dict[str, TableStats] = {}
+        self._lock = threading.Lock()
+        self.generation = 0
+
+    def invalidate(self, table_name: Optional[str] = None) -> None:
+        with self._lock:
+            if table_name is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(table_name, None)
+            self.generation += 1
+
+    def table_stats(self, table_name: str) -> Optional[TableStats]:
+        """Row count (and unique columns) of a virtual table, None if unavailable."""
+        if table_name not in self.table_to_db:
+            # Derived tables (pushed subqueries) have no statistics
+            return None
+        with self._lock:
+            stats = self._cache.get(table_name)
+            if stats and time.monotonic() - stats.collected_at < self.ttl_seconds:
+                return stats
+
+        try:
+            stats = self._collect_table(table_name)
+        except Exception as e:
+            logger.warning(f"[Federation] Could not collect stats for '{table_name}': {e}")
+            return None
+
+        with self._lock:
+            if table_name in self._cache:
+                # Expired numbers were refreshed
+                self.generation += 1
+            self._cache[table_name] = stats
+        return stats
+
+    def column_stats(self, table_name: str, column: str) -> Optional[ColumnStats]:
+        """NDV and min/max of one column, collected on first use."""
+        stats = self.table_stats(table_name)
+        if stats is None:
+            return None
+
+        key = column.lower()
+        if key in stats.columns:
+            return stats.columns[key]
+
+        try:
+            column_stats = self._collect_column(table_name, column, stats)
+        except Exception as e:
+            logger.warning(
+                f"[Federation] Could not collect stats for '{table_name}.{column}': {e}"
+            )
+            column_stats = ColumnStats()
+
+        with self._lock:
+            stats.columns[key] = column_stats
+        return column_stats
+
+    def distinct_values(self, table_name: str, column: str) -> Optional[int]:
+        stats = self.table_stats(table_name)
+        if stats is None:
+            return None
+        if column.lower() in stats.unique_columns:
+            return stats.row_count
+        column_stats = self.column_stats(table_name, column)
+        return column_stats.distinct if column_stats else None
+
+    # --- Collection ---
+
+    def _collect_table(self, table_name: str) -> TableStats:
+        adapter = self.adapters[self.table_to_db[table_name]]
+        physical = self.table_to_physical[table_name]
+        dialect = dialect_of(adapter)
+
+        row_count = None
+        if dialect == "sqlite":
+            row_count = self._sqlite_stat1_rows(adapter, physical)
+        elif dialect == "postgresql":
+            row = _first_row(
+                adapter,
+                f"SELECT reltuples::bigint FROM pg_class WHERE relname = '{physical}'",
+            )
+            # reltuples is -1 / 0 until the table has been analyzed
+            if row and row[0] and row[0] > 0:
+                row_count = int(row[0])
+
+        if row_count is None:
+            row = _first_row(adapter, f"SELECT COUNT(*) FROM {quote_identifier(physical)}")
+            row_count = int(row[0]) if row else 0
+
+        return TableStats(
+            row_count=row_count,
+            unique_columns=self._unique_columns(adapter, physical, dialect),
+        )
+
+    @staticmethod
+    def _sqlite_stat1_rows(adapter: IDatabaseConnector, physical: str) -> Optional[int]:
+        # Only present after ANALYZE; the first number of 'stat' is the row count
+        try:
+            row = _first_row(
+                adapter, f"SELECT stat FROM sqlite_stat1 WHERE tbl = '{physical}' LIMIT 1"
+            )
+        except Exception:
+            return None
+        if not row or not row[0]:
+            return None
+        match = re.match(r"\d+", str(row[0]))
+        return int(match.group(0)) if match else None
+
+    @staticmethod
+    def _unique_columns(
+        adapter: IDatabaseConnector, physical: str, dialect: str
+    ) -> Set[str]:
+        """Single-column primary keys, via SQLAlchemy reflection or PRAGMA."""
+        try:
+            inspector = getattr(adapter, "inspector", None)
+            if inspector is not None:
+                pk = inspector.get_pk_constraint(physical)
+                columns = pk.get("constrained_columns") or []
+                return {columns[0].lower()} if len(columns) == 1 else set()
+            if dialect == "sqlite":
+                rows = list(adapter.execute_query(f"PRAGMA table_info({physical})"))
+                pk_columns = [row[1] for row in rows if row[5]]
+                return {pk_columns[0].lower()} if len(pk_columns) == 1 else set()
+        except Exception as e:
+            logger.debug(f"Primary key reflection failed for '{physical}': {e}")
+        return set()
+
+    def _collect_column(
+        self, table_name: str, column: str, stats: TableStats
+    ) -> ColumnStats:
+        adapter = self.adapters[self.table_to_db[table_name]]
+        physical = quote_identifier(self.table_to_physical[table_name])
+        quoted = quote_identifier(column)
+
+        if column.lower() in stats.unique_columns:
+            row = _first_row(adapter, f"SELECT MIN({quoted}), MAX({quoted}) FROM {physical}")
+            return ColumnStats(
+                distinct=stats.row_count,
+                min_value=row[0] if row else None,
+                max_value=row[1] if row else None,
+            )
+
+        row = _first_row(
+            adapter,
+            f"SELECT COUNT(DISTINCT {quoted}), MIN({quoted}), MAX({quoted}) FROM {physical}",
+        )
+        if not row:
+            return ColumnStats()
+        return ColumnStats(distinct=int(row[0]), min_value=row[1], max_value=row[2])
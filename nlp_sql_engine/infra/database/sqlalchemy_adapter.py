@@ -1,13 +1,59 @@
-from typing import Generator, Any, List
-from sqlalchemy import create_engine, inspect, text
-from sqlalchemy.exc import ArgumentError
+import asyncio
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Generator, Iterator, List, Optional
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import ArgumentError, ResourceClosedError
 from nlp_sql_engine.config.settings import Settings
-from nlp_sql_engine.core.interfaces.db import IDatabaseConnector
+from nlp_sql_engine.core.domain.cancellation import CancellationToken, QueryCancelled, bounded
+from nlp_sql_engine.core.domain.models import RowBatch
+from nlp_sql_engine.core.interfaces.db import IAsyncDatabaseConnector, IDatabaseConnector
 from nlp_sql_engine.app.registry import ProviderRegistry
 
 import logging
 logger = logging.getLogger(__name__)
 
+# Statements after which the reflected schema is dropped
+_DDL_RE = re.compile(r"^\s*(CREATE|ALTER|DROP|RENAME|TRUNCATE)\b", re.IGNORECASE)
+
+# Async driver used when an async adapter gets a plain URI ('postgresql://...')
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg", "mysql": "aiomysql"}
+
+
+def engine_options(
+    pool_size: Optional[int] = None,
+    max_overflow: Optional[int] = None,
+    pool_recycle: Optional[int] = None,
+    pool_pre_ping: bool = False,
+) -> Dict[str, Any]:
+    """create_engine / create_async_engine pool arguments (unset ones omitted)."""
+    engine_kwargs: Dict[str, Any] = {}
+    if pool_size is not None:
+        engine_kwargs["pool_size"] = pool_size
+    if max_overflow is not None:
+        engine_kwargs["max_overflow"] = max_overflow
+    if pool_recycle is not None:
+        engine_kwargs["pool_recycle"] = pool_recycle
+    if pool_pre_ping:
+        engine_kwargs["pool_pre_ping"] = True
+    return engine_kwargs
+
+
+def run_on_connect(engine: Engine, statements: List[str]) -> None:
+    """Runs statements on every new DBAPI connection of the engine's pool."""
+    @event.listens_for(engine, "connect")
+    def init_connection(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+
 @ProviderRegistry.register_db("sqlalchemy")
 class SQLAlchemyAdapter(IDatabaseConnector):
     @classmethod
@@ -23,13 +69,94 @@ class SQLAlchemyAdapter(IDatabaseConnector):
             logger.warning("DB_CONNECTION_STRING not set in settings. Using in-memory SQLite.")
             conn_string = "sqlite:///:memory:"
             
-        return cls(connection_string=conn_string)
-    
-    def __init__(self, connection_string: str):
+        return cls(
+            connection_string=conn_string,
+            fetch_batch_size=getattr(settings, "DB_FETCH_BATCH_SIZE", 1000),
+            schema_cache_ttl=getattr(settings, "DB_SCHEMA_CACHE_TTL_SECONDS", None),
+            **cls.pool_options(settings),
+        )
+
+    @staticmethod
+    def pool_options(settings: Settings) -> Dict[str, Any]:
+        """Connection pool keyword arguments configured in settings (unset ones omitted)."""
+        options = {
+            "pool_size": getattr(settings, "DB_POOL_SIZE", None),
+            "max_overflow": getattr(settings, "DB_MAX_OVERFLOW", None),
+            "pool_recycle": getattr(settings, "DB_POOL_RECYCLE_SECONDS", None),
+            "pool_pre_ping": getattr(settings, "DB_POOL_PRE_PING", False),
+            "init_statements": getattr(settings, "DB_CONNECTION_INIT_STATEMENTS", []),
+        }
+        # 0 is meaningful (e.g. max_overflow=0: never exceed pool_size)
+        return {key: value for key, value in options.items() if value is not None}
+
+    def __init__(
+        self,
+        connection_string: str,
+        pool_size: Optional[int] = None,
+        max_overflow: Optional[int] = None,
+        statement_timeout: Optional[float] = None,
+        fetch_batch_size: int = 1000,
+        schema_cache_ttl: Optional[float] = None,
+        pool_recycle: Optional[int] = None,
+        pool_pre_ping: bool = False,
+        init_statements: Optional[List[str]] = None,
+    ):
+        """
+        pool_size / max_overflow: connection pool limits (SQLAlchemy defaults if None).
+        pool_recycle: seconds after which a pooled connection is replaced.
+        pool_pre_ping: test connections on checkout, replacing dead ones
+        (instead of failing the first query after a server restart or idle kill).
+        init_statements: SQL run on every new connection (PRAGMAs, SET ...).
+        statement_timeout: seconds before a statement is cancelled. Enforced by the
+        server on PostgreSQL and MySQL; elsewhere the driver connection is
+        interrupted from the client when it can be (e.g. SQLite).
+        fetch_batch_size: rows per round-trip of streamed results.
+        schema_cache_ttl: seconds the reflected schema is trusted (None = until
+        invalidate_schema() or a DDL statement through execute_ddl).
+        """
+        self.fetch_batch_size = fetch_batch_size
+        self.schema_cache_ttl = schema_cache_ttl
+        self.init_statements = list(init_statements or [])
+        # Rendered get_table_schema strings, reflected for all tables at once
+        self._schema_cache: Dict[str, str] = {}
+        # Objects reflected one by one (views, other schemas): served, not listed
+        self._extra_schemas: Dict[str, str] = {}
+        self._schema_loaded_at: Optional[float] = None
+        self._schema_lock = threading.RLock()
+        # Client-side deadline, for backends without a server-side timeout
+        self.query_timeout: Optional[float] = None
         # Supports 'postgresql://...', 'mysql://...', 'sqlite://...'
         try:
-            self.engine = create_engine(connection_string)
+            engine_kwargs = engine_options(pool_size, max_overflow, pool_recycle, pool_pre_ping)
+
+            backend = make_url(connection_string).get_backend_name()
+            if statement_timeout and backend == "postgresql":
+                timeout_ms = int(statement_timeout * 1000)
+                engine_kwargs["connect_args"] = {
+                    "options": f"-c statement_timeout={timeout_ms}"
+                }
+
+            self.engine = create_engine(connection_string, **engine_kwargs)
+
+            # Registered before anything connects (inspect() already does)
+            statements = list(self.init_statements)
+            if statement_timeout and backend == "mysql":
+                timeout_ms = int(statement_timeout * 1000)
+                statements.append(f"SET SESSION max_execution_time = {timeout_ms}")
+            if statements:
+                run_on_connect(self.engine, statements)
+
+            # Server-side cursors (PostgreSQL, MySQL...): results are streamed
+            # instead of being loaded whole into client memory by the driver
+            self.streaming = self.engine.dialect.supports_server_side_cursors
             self.inspector = inspect(self.engine)
+
+            if statement_timeout and backend == "sqlite":
+                self.query_timeout = statement_timeout
+            elif statement_timeout and backend not in ("mysql", "postgresql"):
+                logger.warning(
+                    f"statement_timeout is not supported for '{backend}', ignoring it."
+                )
             
         except ArgumentError as e:
             logger.error(f"Failed to create engine with connection string: {connection_string}")
@@ -43,15 +170,66 @@ class SQLAlchemyAdapter(IDatabaseConnector):
                 f"Original Error: {str(e)}"
             ) from e
 
+    def invalidate_schema(self) -> None:
+        """
+        Drops the reflected schema, including the inspector's own cache;
+        the next schema call reflects the database again.
+        """
+        with self._schema_lock:
+            self._schema_cache = {}
+            self._extra_schemas = {}
+            self._schema_loaded_at = None
+            self.inspector = inspect(self.engine)
+
+    def _schemas(self) -> Dict[str, str]:
+        """Table name -> rendered schema, reflected in bulk when missing or stale."""
+        with self._schema_lock:
+            if self._schema_loaded_at is not None and (
+                self.schema_cache_ttl is None
+                or time.monotonic() - self._schema_loaded_at < self.schema_cache_ttl
+            ):
+                return self._schema_cache
+            if self._schema_loaded_at is not None:
+                self.invalidate_schema()
+
+            # Two round-trips for the whole schema instead of two per table
+            columns = self.inspector.get_multi_columns()
+            fks = self.inspector.get_multi_foreign_keys()
+            self._schema_cache = {
+                table_name: self._render_schema(
+                    table_name, table_columns, fks.get((schema, table_name), [])
+                )
+                for (schema, table_name), table_columns in columns.items()
+            }
+            self._schema_loaded_at = time.monotonic()
+            return self._schema_cache
+
     def get_all_table_names(self) -> List[str]:
-        return self.inspector.get_table_names()
+        return list(self._schemas())
 
     def get_table_schema(self, table_name: str) -> str:
         """
         Introspects the DB to generate a CREATE TABLE-style description
         including columns, types, and FOREIGN KEYS.
         """
-        columns = self.inspector.get_columns(table_name)
+        schemas = self._schemas()
+        if table_name in schemas:
+            return schemas[table_name]
+
+        # Not a table of the default schema (view, 'schema.table'...): reflect it alone
+        with self._schema_lock:
+            if table_name in self._extra_schemas:
+                return self._extra_schemas[table_name]
+            schema = self._render_schema(
+                table_name,
+                self.inspector.get_columns(table_name),
+                self.inspector.get_foreign_keys(table_name),
+            )
+            self._extra_schemas[table_name] = schema
+        return schema
+
+    @staticmethod
+    def _render_schema(table_name: str, columns: List[dict], fks: List[dict]) -> str:
         if not columns:
             return ""
 
@@ -62,7 +240,6 @@ class SQLAlchemyAdapter(IDatabaseConnector):
             schema += f"  {col['name']} {col['type']}\n"
 
         # Foreign Keys
-        fks = self.inspector.get_foreign_keys(table_name)
         if fks:
             schema += "  -- Relationships --\n"
             for fk in fks:
@@ -76,24 +253,316 @@ class SQLAlchemyAdapter(IDatabaseConnector):
 
     def get_schema(self) -> str:
         """Aggregates all table schemas."""
-        tables = self.get_all_table_names()
-        return "\n\n".join([self.get_table_schema(t) for t in tables])
+        return "\n\n".join(self._schemas().values())
 
     def execute_query(self, query: str) -> Generator[Any, None, None]:
         """
         Yields results row-by-row to satisfy memory efficiency.
         """
-        with self.engine.connect() as conn:
-            # SQLAlchemy 'text' object is required for raw SQL
-            result = conn.execute(text(query))
-            
+        cancel = CancellationToken(self.query_timeout) if self.query_timeout else None
+        yield from self._execute(query, cancel)
+
+    def execute_cancellable(
+        self, query: str, cancel: CancellationToken
+    ) -> Generator[Any, None, None]:
+        """
+        execute_query that cancels the running statement through the driver
+        (psycopg cancel(), sqlite3 interrupt()) once the token is stopped.
+        Drivers without either are checked between rows only.
+        """
+        with bounded(cancel, self.query_timeout) as token:
+            yield from self._execute(query, token)
+
+    def _execute(
+        self, query: str, cancel: Optional[CancellationToken]
+    ) -> Generator[Any, None, None]:
+        with self.engine.connect() as conn, self._cancellable(conn, cancel):
+            # SQLAlchemy 'text' object is required for raw SQL.
+            # yield_per streams through a server-side cursor where supported
+            result = conn.execution_options(
+                stream_results=True, yield_per=self.fetch_batch_size
+            ).execute(text(query))
+
             if result.returns_rows:
                 for row in result:
+                    if cancel is not None:
+                        cancel.check()
                     # Converts SQLAlchemy Row object to tuple/dict
                     yield row
             else:
                 conn.commit()
 
+    @contextmanager
+    def _cancellable(self, conn, cancel: Optional[CancellationToken]) -> Iterator[None]:
+        """
+        Aborts the statement running on conn through the driver once the token
+        is cancelled or its deadline passes; driver errors caused by the abort
+        are raised as QueryCancelled / QueryTimeout.
+        """
+        if cancel is None:
+            yield
+            return
+        stop = self._driver_cancel(conn)
+        unregister = cancel.on_cancel(stop) if stop else None
+        timer = None
+        if stop and cancel.remaining() is not None:
+            # Deadline: cancel from a timer thread, the statement may never yield
+            timer = threading.Timer(cancel.remaining(), stop)
+            timer.daemon = True
+            timer.start()
+        try:
+            cancel.check()
+            yield
+        except Exception as e:
+            # DBAPIError through SQLAlchemy, the driver's own error from raw cursors
+            if cancel.stopped and not isinstance(e, QueryCancelled):
+                raise cancel.exception() from e
+            raise
+        finally:
+            if timer is not None:
+                timer.cancel()
+            if unregister is not None:
+                unregister()
+
+    @staticmethod
+    def _driver_cancel(conn) -> Optional[Callable[[], None]]:
+        """Thread-safe call that aborts the statement running on a connection."""
+        dbapi_connection = conn.connection.dbapi_connection
+        for name in ("cancel", "interrupt"):
+            method = getattr(dbapi_connection, name, None)
+            if callable(method):
+                return method
+        return None
+
+    def execute_query_batches(
+        self,
+        query: str,
+        batch_size: Optional[int] = None,
+        cancel: Optional[CancellationToken] = None,
+    ) -> Generator[RowBatch, None, None]:
+        """
+        Yields results in RowBatch blocks (bulk transfers, e.g. federation).
+        Drivers with server-side cursors stream batch by batch; others are read
+        with the DBAPI cursor's fetchmany, skipping the per-row Row objects.
+        query_timeout and cancel apply as in execute_cancellable.
+        """
+        batch_size = batch_size or self.fetch_batch_size
+        with bounded(cancel, self.query_timeout) as token:
+            if self.streaming:
+                yield from self._stream_batches(query, batch_size, token)
+            else:
+                yield from self._fetch_batches(query, batch_size, token)
+
+    def _fetch_batches(
+        self, query: str, batch_size: int, cancel: Optional[CancellationToken]
+    ) -> Generator[RowBatch, None, None]:
+        with self.engine.connect() as conn, self._cancellable(conn, cancel):
+            cursor = conn.connection.cursor()
+            try:
+                cursor.execute(query)
+                if cursor.description is None:
+                    return
+                columns = [desc[0] for desc in cursor.description]
+                while True:
+                    if cancel is not None:
+                        cancel.check()
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    # Some drivers return their own row type
+                    if type(rows[0]) is not tuple:
+                        rows = [tuple(row) for row in rows]
+                    yield RowBatch(columns, rows)
+            finally:
+                cursor.close()
+
+    def _stream_batches(
+        self, query: str, batch_size: int, cancel: Optional[CancellationToken]
+    ) -> Generator[RowBatch, None, None]:
+        with self.engine.connect() as conn, self._cancellable(conn, cancel):
+            result = conn.execution_options(yield_per=batch_size).exec_driver_sql(query)
+            if not result.returns_rows:
+                return
+            columns = list(result.keys())
+            try:
+                for partition in result.partitions(batch_size):
+                    if cancel is not None:
+                        cancel.check()
+                    yield RowBatch(columns, [tuple(row) for row in partition])
+            finally:
+                result.close()
+
     def execute_ddl(self, query: str) -> None:
         with self.engine.begin() as conn: # 'begin' auto-commits on exit
-            conn.execute(text(query))
\ No newline at end of file
+            conn.execute(text(query))
+        if _DDL_RE.match(query):
+            self.invalidate_schema()
+
+
+@ProviderRegistry.register_async_db("sqlalchemy")
+class AsyncSQLAlchemyAdapter(IAsyncDatabaseConnector):
+    """
+    SQLAlchemy adapter on an AsyncEngine (create_async_engine). Statements run
+    on the event loop through the async drivers (asyncpg, aiomysql, aiosqlite)
+    and results are streamed with server-side cursors, fetch_batch_size rows
+    per round-trip. Requires sqlalchemy[asyncio] and the backend's async driver.
+    """
+
+    @classmethod
+    def create(cls, settings: Settings) -> "AsyncSQLAlchemyAdapter":
+        conn_string = getattr(settings, "DB_CONNECTION_STRING", "")
+        if not conn_string:
+            logger.warning("DB_CONNECTION_STRING not set in settings. Using in-memory SQLite.")
+            conn_string = "sqlite:///:memory:"
+        return cls(
+            connection_string=conn_string,
+            fetch_batch_size=getattr(settings, "DB_FETCH_BATCH_SIZE", 1000),
+            query_timeout=getattr(settings, "DB_QUERY_TIMEOUT_SECONDS", None),
+            **SQLAlchemyAdapter.pool_options(settings),
+        )
+
+    def __init__(
+        self,
+        connection_string: str,
+        pool_size: Optional[int] = None,
+        max_overflow: Optional[int] = None,
+        pool_recycle: Optional[int] = None,
+        pool_pre_ping: bool = False,
+        init_statements: Optional[List[str]] = None,
+        fetch_batch_size: int = 1000,
+        query_timeout: Optional[float] = None,
+    ):
+        """
+        connection_string: async URI ('postgresql+asyncpg://...'); plain ones get
+        the default async driver of their backend (ASYNC_DRIVERS).
+        query_timeout: seconds after which a query is abandoned (QueryTimeout).
+        Pool arguments and init_statements: see SQLAlchemyAdapter.
+        """
+        try:
+            from sqlalchemy.ext.asyncio import create_async_engine
+        except ImportError as e:
+            raise ImportError(
+                "AsyncSQLAlchemyAdapter requires 'sqlalchemy[asyncio]' and an async "
+                "driver (aiosqlite, asyncpg, aiomysql)."
+            ) from e
+
+        try:
+            url = make_url(connection_string)
+        except ArgumentError as e:
+            raise ValueError(f"Invalid Database Connection String: '{connection_string}'") from e
+        backend = url.get_backend_name()
+        if "+" not in url.drivername and backend in ASYNC_DRIVERS:
+            url = url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+        self.fetch_batch_size = fetch_batch_size
+        self.query_timeout = query_timeout
+        self.engine = create_async_engine(
+            url, **engine_options(pool_size, max_overflow, pool_recycle, pool_pre_ping)
+        )
+        if init_statements:
+            run_on_connect(self.engine.sync_engine, list(init_statements))
+        self._schema_cache: Optional[Dict[str, str]] = None
+
+    def invalidate_schema(self) -> None:
+        self._schema_cache = None
+
+    async def _schemas(self) -> Dict[str, str]:
+        """Table name -> rendered schema, reflected in bulk on first use."""
+        if self._schema_cache is None:
+
+            def reflect(sync_conn) -> Dict[str, str]:
+                inspector = inspect(sync_conn)
+                columns = inspector.get_multi_columns()
+                fks = inspector.get_multi_foreign_keys()
+                return {
+                    table_name: SQLAlchemyAdapter._render_schema(
+                        table_name, table_columns, fks.get((schema, table_name), [])
+                    )
+                    for (schema, table_name), table_columns in columns.items()
+                }
+
+            async with self.engine.connect() as conn:
+                self._schema_cache = await conn.run_sync(reflect)
+        return self._schema_cache
+
+    async def get_all_table_names(self) -> List[str]:
+        return list(await self._schemas())
+
+    async def get_table_schema(self, table_name: str) -> str:
+        return (await self._schemas()).get(table_name, "")
+
+    async def get_schema(self) -> str:
+        return "\n\n".join((await self._schemas()).values())
+
+    async def execute_query(
+        self, query: str, cancel: Optional[CancellationToken] = None
+    ) -> AsyncIterator[Any]:
+        """
+        Yields rows as they are streamed. A stopped token is noticed between
+        round-trips; a deadline also aborts the round-trip in progress.
+        """
+        with bounded(cancel, self.query_timeout) as cancel:
+            async with self.engine.connect() as conn:
+                if cancel is not None:
+                    cancel.check()
+                result = await self._bounded(conn, conn.stream(text(query)), cancel)
+                try:
+                    result.keys()
+                except ResourceClosedError:
+                    # Statement without a result set (e.g. INSERT): keep its changes
+                    await conn.commit()
+                    return
+                partitions = result.partitions(self.fetch_batch_size)
+                try:
+                    while True:
+                        if cancel is not None:
+                            cancel.check()
+                        try:
+                            partition = await self._bounded(conn, anext(partitions), cancel)
+                        except StopAsyncIteration:
+                            break
+                        for row in partition:
+                            yield row
+                finally:
+                    await partitions.aclose()
+                    await result.close()
+
+    async def _bounded(
+        self, conn, awaitable: Awaitable[Any], cancel: Optional[CancellationToken]
+    ) -> Any:
+        """Awaits one round-trip, aborting it at the token's deadline (QueryTimeout)."""
+        if cancel is None:
+            return await awaitable
+        task = asyncio.ensure_future(awaitable)
+        try:
+            # Shielded: a cancelled round-trip may wait for the statement to end
+            return await asyncio.wait_for(asyncio.shield(task), cancel.remaining())
+        except asyncio.TimeoutError as e:
+            await self._interrupt(conn)
+            task.cancel()
+            await asyncio.wait({task})
+            if not task.cancelled():
+                task.exception()
+            raise cancel.exception() from e
+
+    @staticmethod
+    async def _interrupt(conn) -> None:
+        """
+        Stops the statement still running in the driver. aiosqlite runs it on its
+        own thread, which would otherwise block the connection until it ends;
+        asyncpg cancels it when the awaiting task is cancelled.
+        """
+        interrupt = getattr(conn.sync_connection.connection.driver_connection, "interrupt", None)
+        if interrupt is not None:
+            result = interrupt()
+            if asyncio.iscoroutine(result):
+                await result
+
+    async def execute_ddl(self, query: str) -> None:
+        async with self.engine.begin() as conn:
+            await conn.execute(text(query))
+        if _DDL_RE.match(query):
+            self.invalidate_schema()
+
+    async def close(self) -> None:
+        await self.engine.dispose()
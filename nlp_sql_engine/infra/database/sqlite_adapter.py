@@ -1,48 +1,203 @@
 import sqlite3
-from typing import Generator, Any, List
+import threading
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Generator, Any, Iterator, List, Optional
+from nlp_sql_engine.core.domain.cancellation import CancellationToken, bounded
+from nlp_sql_engine.core.domain.models import RowBatch
 from nlp_sql_engine.core.interfaces.db import IDatabaseConnector
 from nlp_sql_engine.app.registry import ProviderRegistry
+from nlp_sql_engine.infra.database.async_bridge import ThreadBridgeAdapter
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# SQLite VM instructions between two checks of a query's cancellation token
+PROGRESS_STEPS = 1000
 
 
 @ProviderRegistry.register_db("sqlite")
 class SQLiteAdapter(IDatabaseConnector):
-    def __init__(self, connection_string: str):
+    """
+    SQLite driver adapter, safe to share between threads.
+
+    File databases: every query checks out its own read connection from a small
+    pool (returned when its generator finishes), so concurrent queries never
+    share a cursor; execute_ddl goes through a single writer connection.
+    WAL journaling lets readers run while the writer commits.
+
+    In-memory databases only exist inside one connection: it is shared, and a
+    lock serializes each call into it (execute / fetchmany), not whole queries.
+
+    Every connection is opened with the same profile (mmap, page cache, temp
+    store). Read-only files are opened with mode=ro and query_only; immutable
+    ones also skip locking and change detection altogether (immutable=1).
+    """
+
+    def __init__(
+        self,
+        connection_string: str,
+        fetch_batch_size: int = 1000,
+        pool_size: int = 5,
+        wal: bool = True,
+        mmap_size: Optional[int] = None,
+        cache_size: Optional[int] = None,
+        temp_store: Optional[str] = None,
+        read_only: bool = False,
+        immutable: bool = False,
+        query_timeout: Optional[float] = None,
+        statement_timeout: Optional[float] = None,
+    ):
+        """
+        fetch_batch_size: rows pulled per fetchmany call (the cursor arraysize).
+        pool_size: idle read connections kept open for reuse.
+        wal: switch file databases to WAL journaling on first connection.
+        mmap_size: bytes of the file read through memory mapping (PRAGMA mmap_size).
+        cache_size: page cache per connection, pages or -KiB (PRAGMA cache_size).
+        temp_store: 'MEMORY' keeps sorts and temporary tables off disk.
+        read_only: open with mode=ro and PRAGMA query_only; DDL is rejected.
+        immutable: the file never changes while open (implies read_only).
+        query_timeout: seconds after which a query is interrupted (QueryTimeout).
+        statement_timeout: same, under the SQLAlchemyAdapter / attachment option name.
+        """
+        # Accept SQLAlchemy-style URIs too ('sqlite:///path/to.db')
+        if connection_string.startswith("sqlite:///"):
+            connection_string = connection_string[len("sqlite:///"):] or ":memory:"
         self.connection_string = connection_string
-        self.conn = None
+        self.fetch_batch_size = fetch_batch_size
+        self.pool_size = pool_size
+        self.wal = wal
+        self.in_memory = connection_string in ("", ":memory:") or "mode=memory" in connection_string
+        self.mmap_size = mmap_size
+        self.cache_size = cache_size
+        self.temp_store = temp_store
+        self.query_timeout = query_timeout or statement_timeout
+        self.immutable = immutable and not self.in_memory
+        self.read_only = (read_only or immutable) and not self.in_memory
+        if (read_only or immutable) and self.in_memory:
+            logger.warning("Read-only / immutable profile ignored for an in-memory database.")
+        # What sqlite3.connect opens: the plain path, or a URI carrying the open mode
+        self._target = self._open_target()
+
+        self._idle: List[sqlite3.Connection] = []
+        self._pool_lock = threading.Lock()
+        self._writer: Optional[sqlite3.Connection] = None
+        self._write_lock = threading.Lock()
+        self._wal_checked = False
+        # Serializes calls into the shared connection of an in-memory database
+        self._guard = threading.RLock() if self.in_memory else nullcontext()
+
+    # --- Connections ---
+
+    def _open_target(self) -> str:
+        if not self.read_only:
+            return self.connection_string
+        params = "mode=ro&immutable=1" if self.immutable else "mode=ro"
+        if self.connection_string.startswith("file:"):
+            separator = "&" if "?" in self.connection_string else "?"
+            return f"{self.connection_string}{separator}{params}"
+        return f"{Path(self.connection_string).resolve().as_uri()}?{params}"
+
+    def _open(self) -> sqlite3.Connection:
+        # check_same_thread=False: a pooled connection is reused by other threads
+        # (never by two at once, except the guarded in-memory connection)
+        conn = sqlite3.connect(
+            self._target,
+            check_same_thread=False,
+            uri=self._target.startswith("file:"),
+        )
+        if self.mmap_size is not None:
+            conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        if self.cache_size is not None:
+            conn.execute(f"PRAGMA cache_size = {int(self.cache_size)}")
+        if self.temp_store is not None:
+            if self.temp_store.upper() not in ("DEFAULT", "FILE", "MEMORY"):
+                raise ValueError(f"Invalid SQLite temp_store '{self.temp_store}'")
+            conn.execute(f"PRAGMA temp_store = {self.temp_store.upper()}")
+        if self.read_only:
+            conn.execute("PRAGMA query_only = ON")
+            return conn
+        if self.wal and not self.in_memory and not self._wal_checked:
+            self._wal_checked = True
+            try:
+                mode = conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+                if mode.lower() != "wal":
+                    logger.warning(f"SQLite '{self.connection_string}' stays in {mode} mode.")
+            except sqlite3.OperationalError as e:
+                logger.warning(f"Could not enable WAL on '{self.connection_string}': {e}")
+        return conn
+
+    def _writer_connection(self) -> sqlite3.Connection:
+        if self._writer is None:
+            self._writer = self._open()
+        return self._writer
+
+    @contextmanager
+    def _reader(self) -> Iterator[sqlite3.Connection]:
+        """A connection for the duration of one read."""
+        if self.in_memory:
+            with self._write_lock:
+                conn = self._writer_connection()
+            yield conn
+            return
+
+        with self._pool_lock:
+            conn = self._idle.pop() if self._idle else None
+        if conn is None:
+            conn = self._open()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                # Statements that wrote through execute_query are not kept half done
+                conn.rollback()
+            with self._pool_lock:
+                if len(self._idle) < self.pool_size:
+                    self._idle.append(conn)
+                    conn = None
+            if conn is not None:
+                conn.close()
 
-    def _connect(self):
-        """Lazy connection to the database."""
-        if self.conn is None:
-            # check_same_thread=False is needed if we run this in a multi-threaded web app later
-            self.conn = sqlite3.connect(self.connection_string, check_same_thread=False)
+    def close(self) -> None:
+        """Closes the idle read connections and the writer."""
+        with self._pool_lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+        with self._write_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+    # --- Schema ---
 
     def get_table_schema(self, table_name: str) -> str:
         """
         Fetches schema for a SINGLE table.
         Used by the Router to retrieve details only for relevant tables.
         """
-        self._connect()
-        assert self.conn is not None
-        cursor = self.conn.cursor()
+        with self._reader() as conn, self._guard:
+            cursor = conn.cursor()
+
+            # Safe formatting for table name (PRAGMA statements don't support standard parameter substitution)
+            # In production, Validate table_name strictly to prevent injection.
+            cursor.execute(f"PRAGMA table_info({table_name});")
+            columns = cursor.fetchall()
 
-        # Safe formatting for table name (PRAGMA statements don't support standard parameter substitution)
-        # In production, Validate table_name strictly to prevent injection.
-        cursor.execute(f"PRAGMA table_info({table_name});")
-        columns = cursor.fetchall()
+            if not columns:
+                return ""
 
-        if not columns:
-            return ""
+            # Get Foreign Keys
+            # Output: (id, seq, table, from, to, on_update, on_delete, match)
+            cursor.execute(f"PRAGMA foreign_key_list({table_name});")
+            fks = cursor.fetchall()
 
         schema = f"Table: {table_name}\n"
         for col in columns:
             # col[1] is name, col[2] is type
             schema += f"  {col[1]} {col[2]}\n"
 
-        # Get Foreign Keys
-        # Output: (id, seq, table, from, to, on_update, on_delete, match)
-        cursor.execute(f"PRAGMA foreign_key_list({table_name});")
-        fks = cursor.fetchall()
-
         if fks:
             schema += "  -- Relationships --\n"
             for fk in fks:
@@ -53,11 +208,10 @@ class SQLiteAdapter(IDatabaseConnector):
 
     def get_all_table_names(self) -> List[str]:
         """Returns a list of all table names in the database."""
-        self._connect()
-        assert self.conn is not None
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-        tables = cursor.fetchall()
+        with self._reader() as conn, self._guard:
+            cursor = conn.cursor()
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
+            tables = cursor.fetchall()
         return [table[0] for table in tables]
 
     def get_schema(self) -> str:
@@ -71,26 +225,123 @@ class SQLiteAdapter(IDatabaseConnector):
             full_schema.append(self.get_table_schema(table))
         return "\n\n".join(full_schema)
 
+    # --- Execution ---
+
     def execute_query(self, query: str) -> Generator[Any, None, None]:
         """
         Executes SQL and yields results row by row.
         Satisfies Challenge #2: Memory Efficient Handle.
+        Rows are read from the cursor fetch_batch_size at a time.
+        """
+        with bounded(None, self.query_timeout) as token:
+            for batch in self._fetch(query, self.fetch_batch_size, cancel=token):
+                yield from batch
+
+    def execute_cancellable(
+        self, query: str, cancel: CancellationToken
+    ) -> Generator[Any, None, None]:
+        """execute_query interrupted inside SQLite once the token is stopped."""
+        with bounded(cancel, self.query_timeout) as token:
+            for batch in self._fetch(query, self.fetch_batch_size, cancel=token):
+                yield from batch
+
+    def execute_query_batches(
+        self,
+        query: str,
+        batch_size: Optional[int] = None,
+        cancel: Optional[CancellationToken] = None,
+    ) -> Generator[RowBatch, None, None]:
+        """
+        Yields results in RowBatch blocks (one fetchmany call each), for bulk
+        consumers such as the federated engine or exporters.
         """
-        self._connect()
-        assert self.conn is not None
-        cursor = self.conn.cursor()
-        cursor.execute(query)
+        columns: List[str] = []
+        with bounded(cancel, self.query_timeout) as token:
+            for rows in self._fetch(
+                query, batch_size or self.fetch_batch_size, columns, token
+            ):
+                yield RowBatch(columns, rows)
 
-        while True:
-            row = cursor.fetchone()
-            if row is None:
-                break
-            yield row
+    def _fetch(
+        self,
+        query: str,
+        batch_size: int,
+        columns: Optional[List[str]] = None,
+        cancel: Optional[CancellationToken] = None,
+    ) -> Generator[List[tuple], None, None]:
+        """
+        fetchmany loop on a checked-out connection; fills columns (if given)
+        from the cursor description before the first batch.
+        """
+        with self._reader() as conn:
+            with self._guard:
+                cursor = conn.cursor()
+                cursor.arraysize = batch_size
+            try:
+                self._interruptible(conn, cancel, cursor.execute, query)
+                if cursor.description is None:
+                    # Statement without a result set (e.g. INSERT): keep its changes
+                    with self._guard:
+                        conn.commit()
+                    return
+                if columns is not None:
+                    columns.extend(desc[0] for desc in cursor.description)
+                while True:
+                    rows = self._interruptible(conn, cancel, cursor.fetchmany)
+                    if not rows:
+                        break
+                    yield rows
+            finally:
+                with self._guard:
+                    cursor.close()
+
+    def _interruptible(
+        self, conn: sqlite3.Connection, cancel: Optional[CancellationToken], call, *args
+    ) -> Any:
+        """
+        One guarded call into SQLite. With a token, a progress handler aborts the
+        statement as soon as the token is stopped (cancelled or past its deadline).
+        """
+        with self._guard:
+            if cancel is None:
+                return call(*args)
+            cancel.check()
+            conn.set_progress_handler(lambda: int(cancel.stopped), PROGRESS_STEPS)
+            try:
+                return call(*args)
+            except sqlite3.OperationalError as e:
+                if cancel.stopped:
+                    raise cancel.exception() from e
+                raise
+            finally:
+                conn.set_progress_handler(None, 0)
 
     def execute_ddl(self, query: str) -> None:
         """Executes DDL statements like CREATE, INSERT, etc."""
-        self._connect()
-        assert self.conn is not None
-        cursor = self.conn.cursor()
-        cursor.execute(query)
-        self.conn.commit()
+        if self.read_only:
+            raise ValueError(f"SQLite database '{self.connection_string}' is opened read-only")
+        with self._write_lock, self._guard:
+            conn = self._writer_connection()
+            cursor = conn.cursor()
+            try:
+                cursor.execute(query)
+                conn.commit()
+            finally:
+                cursor.close()
+
+
+@ProviderRegistry.register_async_db("sqlite")
+class AsyncSQLiteAdapter(ThreadBridgeAdapter):
+    """
+    SQLiteAdapter for asyncio callers. sqlite3 has no async API: queries run on
+    the bridge's worker threads, each with its own pooled read connection.
+    """
+
+    def __init__(self, connection_string: str, max_workers: int = 8, **options):
+        """options: SQLiteAdapter keyword arguments (fetch_batch_size, read_only...)."""
+        # One idle read connection per worker thread
+        options.setdefault("pool_size", max_workers)
+        adapter = SQLiteAdapter(connection_string, **options)
+        super().__init__(
+            adapter, max_workers=max_workers, fetch_batch_size=adapter.fetch_batch_size
+        )
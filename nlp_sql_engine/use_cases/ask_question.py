@@ -1,4 +1,5 @@
-from typing import Generator, Any
+from typing import Generator, Any, Iterable, Iterator, Optional
+from nlp_sql_engine.core.domain.cancellation import CancellationToken
 from nlp_sql_engine.core.interfaces.manager import IDatabaseManager
 from nlp_sql_engine.services.gen_pipeline import SQLPipelineService
 from nlp_sql_engine.services.schema_router import SchemaRouter
@@ -15,12 +16,21 @@ class AskQuestionUseCase:
         db_manager: IDatabaseManager,
         pipeline_service: SQLPipelineService,
         schema_router: SchemaRouter,
+        query_timeout: Optional[float] = None,
     ):
         self.db_manager = db_manager
         self.pipeline_service = pipeline_service
         self.schema_router = schema_router
+        # Seconds a generated query may run (and stream) before it is interrupted
+        self.query_timeout = query_timeout
 
-    def execute(self, query: NLQuery) -> Generator[PipelineResult, None, None]:
+    def execute(
+        self, query: NLQuery, cancel: Optional[CancellationToken] = None
+    ) -> Generator[PipelineResult, None, None]:
+        """
+        cancel: token the caller can trigger (e.g. client disconnect) to stop
+        the running query; its rows then raise QueryCancelled.
+        """
         try:
             # Get relevant schema using the Schema Router
             relevant_schema, target_db_name = self.schema_router.route(query.question)
@@ -34,7 +44,18 @@ class AskQuestionUseCase:
 
             while attempt <= max_retries:
                 try:
-                    rows = active_adapter.execute_query(query_model.query)
+                    if cancel is None and not self.query_timeout:
+                        rows = active_adapter.execute_query(query_model.query)
+                    else:
+                        token = CancellationToken(self.query_timeout, parent=cancel)
+                        try:
+                            rows = self._closing(
+                                active_adapter.execute_cancellable(query_model.query, token),
+                                token,
+                            )
+                        except Exception:
+                            token.close()
+                            raise
                     yield PipelineResult(
                         sql_query=query_model, result=QueryResult(rows=rows, columns=[])
                     )
@@ -57,3 +78,11 @@ class AskQuestionUseCase:
                         )
         except Exception as e:
             yield PipelineResult(error=f"Schema Routing Error: {str(e)}")
+
+    @staticmethod
+    def _closing(rows: Iterable[Any], token: CancellationToken) -> Iterator[Any]:
+        """Rows of one attempt; its token leaves the caller's once they are read."""
+        try:
+            yield from rows
+        finally:
+            token.close()
@@ -1,5 +1,6 @@
-from typing import List, Tuple
+from typing import Any, Generator, List, Tuple
 from nlp_sql_engine.config.settings import Settings
+from nlp_sql_engine.core.interfaces.db import IDatabaseConnector
 from nlp_sql_engine.core.interfaces.embedding import IEmbeddingProvider
 from nlp_sql_engine.core.interfaces.llm import ILLMProvider
 
@@ -32,4 +33,29 @@ class SmartMockLLM(ILLMProvider):
 
     def invoke(self, messages: List[Tuple[str, str]]) -> str:
         # Always return a valid query for the 'users' table
-        return "SELECT id, name, role FROM users;"
\ No newline at end of file
+        return "SELECT id, name, role FROM users;"
+
+class RecordingDBAdapter(IDatabaseConnector):
+    """
+    Wraps a real adapter and records every query sent to it.
+    Allows asserting what the Federated layer pushes down to a child DB.
+    """
+    def __init__(self, inner: IDatabaseConnector):
+        self.inner = inner
+        self.queries: List[str] = []
+
+    def get_schema(self) -> str:
+        return self.inner.get_schema()
+
+    def execute_query(self, query: str) -> Generator[Any, None, None]:
+        self.queries.append(query)
+        return self.inner.execute_query(query)
+
+    def execute_ddl(self, query: str) -> None:
+        self.inner.execute_ddl(query)
+
+    def get_all_table_names(self) -> List[str]:
+        return self.inner.get_all_table_names()
+
+    def get_table_schema(self, table_name: str) -> str:
+        return self.inner.get_table_schema(table_name)
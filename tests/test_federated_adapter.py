@@ -0,0 +1,790 @@
+import sqlite3
+import pytest
+import sqlglot
+from nlp_sql_engine.infra.database.federated_adapter import FederatedAdapter
+from nlp_sql_engine.infra.database.sqlalchemy_adapter import SQLAlchemyAdapter
+
+from tests.mocks import RecordingDBAdapter
+
+
+def _seed(path, statements):
+    conn = sqlite3.connect(path)
+    for statement in statements:
+        conn.execute(statement)
+    conn.commit()
+    conn.close()
+
+
+@pytest.fixture
+def federation(tmp_path):
+    """Two physical databases (crm, sales) exposed through virtual table names."""
+    crm_path = tmp_path / "crm.db"
+    sales_path = tmp_path / "sales.db"
+
+    _seed(crm_path, [
+        "CREATE TABLE customers (id INTEGER PRIMARY KEY, name TEXT, country TEXT)",
+        "INSERT INTO customers VALUES (1, 'Alice', 'USA'), (2, 'Bob', 'UK'), (3, 'Diana', 'USA')",
+    ])
+    _seed(sales_path, [
+        "CREATE TABLE orders (id INTEGER PRIMARY KEY, customer_id INTEGER, total_amount REAL)",
+        "INSERT INTO orders VALUES (1001, 1, 1250.0), (1002, 2, 150.0), (1003, 3, 50.0), (1004, 1, 20.0)",
+    ])
+
+    adapters = {
+        "crm": RecordingDBAdapter(SQLAlchemyAdapter(f"sqlite:///{crm_path}")),
+        "sales": RecordingDBAdapter(SQLAlchemyAdapter(f"sqlite:///{sales_path}")),
+    }
+    return FederatedAdapter(
+        adapters=adapters,
+        table_mapping={"customers": "crm.customers", "orders": "sales.orders"},
+        relationship_graph=[(("orders", "customer_id"), ("customers", "id"))],
+    )
+
+
+def test_cross_db_join_pushes_single_table_filters(federation):
+    rows = list(federation.execute_query(
+        "SELECT c.name, o.total_amount FROM orders o "
+        "JOIN customers c ON o.customer_id = c.id "
+        "WHERE c.country = 'USA' AND o.total_amount > 40 ORDER BY o.id"
+    ))
+
+    assert rows == [
+        {"name": "Alice", "total_amount": 1250.0},
+        {"name": "Diana", "total_amount": 50.0},
+    ]
+    crm_sql = federation.adapters["crm"].queries[-1]
+    sales_sql = federation.adapters["sales"].queries[-1]
+    assert "country = 'USA'" in crm_sql
+    assert "total_amount > 40" in sales_sql
+
+
+def test_outer_join_filters_are_not_pushed_to_nullable_side(federation):
+    rows = list(federation.execute_query(
+        "SELECT o.id, c.name FROM orders o "
+        "LEFT JOIN customers c ON o.customer_id = c.id AND c.country = 'UK' "
+        "WHERE name IS NULL ORDER BY o.id"
+    ))
+
+    # ON-clause filter of the joined table is pushed, the WHERE on it is not
+    assert [r["id"] for r in rows] == [1001, 1003, 1004]
+    crm_sql = federation.adapters["crm"].queries[-1]
+    assert "country = 'UK'" in crm_sql
+    assert "IS NULL" not in crm_sql
+
+
+def test_cross_db_join_fetches_only_referenced_columns(federation):
+    rows = list(federation.execute_query(
+        "SELECT COUNT(*) AS n FROM orders o JOIN customers c ON o.customer_id = c.id "
+        "WHERE country = 'USA'"
+    ))
+
+    assert rows == [{"n": 3}]
+    crm_sql = federation.adapters["crm"].queries[-1]
+    sales_sql = federation.adapters["sales"].queries[-1]
+    assert crm_sql.startswith("SELECT id, country FROM customers")
+    assert sales_sql.startswith("SELECT customer_id FROM orders")
+
+
+@pytest.mark.parametrize("join_processes", [0, 2])
+def test_native_join_compares_mixed_type_keys_like_sqlite(tmp_path, join_processes):
+    _seed(tmp_path / "crm.db", [
+        "CREATE TABLE customers (id INTEGER PRIMARY KEY, name TEXT)",
+        "INSERT INTO customers VALUES (1, 'Alice'), (2, 'Bob'), (3, 'Diana')",
+    ])
+    _seed(tmp_path / "sales.db", [
+        "CREATE TABLE orders (id INTEGER PRIMARY KEY, customer_id TEXT)",
+        "INSERT INTO orders VALUES (1001, '1'), (1002, '2'), (1003, '3'), (1004, '1'), (1005, 'x')",
+    ])
+    query = (
+        "SELECT c.name, o.id FROM orders o JOIN customers c ON o.customer_id = c.id "
+        "ORDER BY o.id"
+    )
+    reference = sqlite3.connect(tmp_path / "sales.db")
+    reference.execute(f"ATTACH DATABASE '{tmp_path / 'crm.db'}' AS crm")
+    expected = [{"name": name, "id": id_} for name, id_ in reference.execute(
+        query.replace("JOIN customers", "JOIN crm.customers")
+    )]
+    reference.close()
+
+    federation = FederatedAdapter(
+        adapters={
+            "crm": SQLAlchemyAdapter(f"sqlite:///{tmp_path / 'crm.db'}"),
+            "sales": SQLAlchemyAdapter(f"sqlite:///{tmp_path / 'sales.db'}"),
+        },
+        table_mapping={"customers": "crm.customers", "orders": "sales.orders"},
+        attach_sqlite=False,
+        join_processes=join_processes,
+        join_parallel_min_rows=0,
+    )
+    try:
+        assert len(expected) == 4
+        assert list(federation.execute_query(query)) == expected
+        # Keys pushed to the INTEGER side as a semi-join are converted too
+        federation.refresh_statistics()
+        assert list(federation.execute_query(query)) == expected
+    finally:
+        federation.close()
+
+
+def test_cross_db_join_is_not_truncated_and_spills_to_disk(tmp_path):
+    _seed(tmp_path / "a.db", [
+        "CREATE TABLE items (id INTEGER PRIMARY KEY, payload TEXT)",
+        "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 3000) "
+        "INSERT INTO items SELECT i, printf('%0100d', i) FROM n",
+    ])
+    _seed(tmp_path / "b.db", [
+        "CREATE TABLE tags (item_id INTEGER, tag TEXT)",
+        "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 3000) "
+        "INSERT INTO tags SELECT i, 'tag' FROM n",
+    ])
+    adapter = FederatedAdapter(
+        adapters={
+            "a": SQLAlchemyAdapter(f"sqlite:///{tmp_path / 'a.db'}"),
+            "b": SQLAlchemyAdapter(f"sqlite:///{tmp_path / 'b.db'}"),
+        },
+        table_mapping={"items": "a.items", "tags": "b.tags"},
+        fetch_batch_size=500,
+        memory_budget_mb=0.1,
+        spill_dir=str(tmp_path),
+    )
+
+    rows = list(adapter.execute_query(
+        "SELECT COUNT(*) AS n FROM items i JOIN tags t ON i.id = t.item_id WHERE i.payload <> ''"
+    ))
+
+    assert rows == [{"n": 3000}]
+    # Spill file is removed once the query finished
+    assert not list(tmp_path.glob("federation_*.db"))
+
+
+def test_native_hash_join_streams_left_join_without_staging(federation, monkeypatch):
+    from nlp_sql_engine.infra.database import federated_adapter
+
+    def no_staging(*args, **kwargs):
+        raise AssertionError("simple equi-join should not be staged in SQLite")
+
+    monkeypatch.setattr(federated_adapter.FederatedAdapter, "_execute_staged", no_staging)
+
+    rows = list(federation.execute_query(
+        "SELECT o.id, c.name FROM customers c "
+        "LEFT JOIN orders o ON o.customer_id = c.id AND o.total_amount > 100"
+    ))
+
+    assert sorted(rows, key=lambda r: r["name"]) == [
+        {"id": 1001, "name": "Alice"},
+        {"id": 1002, "name": "Bob"},
+        {"id": None, "name": "Diana"},
+    ]
+
+
+def test_native_hash_join_falls_back_when_build_side_exceeds_budget(federation):
+    federation.memory_budget_bytes = 10
+
+    rows = list(federation.execute_query(
+        "SELECT c.name, SUM(o.total_amount) AS spent FROM orders o "
+        "JOIN customers c ON o.customer_id = c.id GROUP BY c.name ORDER BY spent DESC"
+    ))
+
+    assert rows == [
+        {"name": "Alice", "spent": 1270.0},
+        {"name": "Bob", "spent": 150.0},
+        {"name": "Diana", "spent": 50.0},
+    ]
+
+
+def test_child_scans_are_fetched_concurrently(federation):
+    import threading
+
+    # Both fetches must be in flight at the same time to pass the barrier
+    barrier = threading.Barrier(2, timeout=5)
+
+    def synchronized(adapter):
+        inner = adapter.execute_query
+
+        def execute_query(query):
+            rows = inner(query)
+            barrier.wait()
+            yield from rows
+        return execute_query
+
+    # Statistics lookups are single queries; keep only the scans behind the barrier
+    federation.planner.statistics = None
+    for adapter in federation.adapters.values():
+        adapter.execute_query = synchronized(adapter)
+
+    rows = list(federation.execute_query(
+        "SELECT c.name, o.id FROM orders o JOIN customers c ON o.customer_id = c.id "
+        "WHERE o.total_amount > 100 AND c.name <> '' ORDER BY o.id"
+    ))
+
+    # Both sides are filtered, so no semi-join serializes the fetches
+    assert rows == [{"name": "Alice", "id": 1001}, {"name": "Bob", "id": 1002}]
+
+
+def test_semi_join_pushes_selective_keys_to_the_other_database(federation):
+    rows = list(federation.execute_query(
+        "SELECT o.id, c.name FROM orders o JOIN customers c ON o.customer_id = c.id "
+        "WHERE c.country = 'USA' ORDER BY o.id"
+    ))
+
+    assert [r["id"] for r in rows] == [1001, 1003, 1004]
+    sales_sql = federation.adapters["sales"].queries[-1]
+    assert "customer_id IN (1, 3)" in sales_sql
+
+
+def test_semi_join_is_skipped_above_the_key_threshold(federation):
+    federation.semi_join_max_keys = 1
+
+    rows = list(federation.execute_query(
+        "SELECT o.id FROM orders o JOIN customers c ON o.customer_id = c.id "
+        "WHERE c.country = 'USA' ORDER BY o.id"
+    ))
+
+    assert [r["id"] for r in rows] == [1001, 1003, 1004]
+    assert " IN (" not in federation.adapters["sales"].queries[-1]
+
+
+def test_cost_based_order_streams_the_largest_table(federation):
+    query = "SELECT * FROM customers c JOIN orders o ON o.customer_id = c.id"
+    plan = federation.planner.plan(sqlglot.parse_one(query))
+
+    # orders (4 rows) outweighs customers (3 rows): it is streamed, customers hashed
+    assert plan.probe_alias == "o"
+    assert [step.alias for step in plan.join_steps] == ["c"]
+
+    rows = list(federation.execute_query(query))
+    # SELECT * keeps the written column order
+    assert [list(r.keys()) for r in rows][0] == ["id", "name", "country", "customer_id", "total_amount"]
+    assert sorted(r["name"] for r in rows) == ["Alice", "Alice", "Bob", "Diana"]
+
+
+def test_statistics_are_cached_until_refreshed(federation):
+    query = "SELECT c.name, o.id FROM orders o JOIN customers c ON o.customer_id = c.id"
+    list(federation.execute_query(query))
+    counted = [q for q in federation.adapters["crm"].queries if "COUNT(" in q]
+    assert counted
+
+    list(federation.execute_query(query))
+    assert [q for q in federation.adapters["crm"].queries if "COUNT(" in q] == counted
+
+    federation.refresh_statistics("customers")
+    list(federation.execute_query(query))
+    assert len([q for q in federation.adapters["crm"].queries if "COUNT(" in q]) > len(counted)
+
+
+def test_partial_aggregates_are_pushed_to_the_fact_table(federation):
+    # Tiny tables: statistics would judge the grouping not worth pushing
+    federation.planner.statistics = None
+
+    rows = list(federation.execute_query(
+        "SELECT c.country, SUM(o.total_amount) AS total, AVG(o.total_amount), COUNT(*) AS n "
+        "FROM orders o JOIN customers c ON o.customer_id = c.id "
+        "WHERE o.total_amount > 30 GROUP BY c.country ORDER BY c.country"
+    ))
+
+    assert rows == [
+        {"country": "UK", "total": 150.0, "AVG(o.total_amount)": 150.0, "n": 1},
+        {"country": "USA", "total": 1300.0, "AVG(o.total_amount)": 650.0, "n": 2},
+    ]
+    sales_sql = federation.adapters["sales"].queries[-1]
+    assert "GROUP BY customer_id" in sales_sql
+    assert "SUM(total_amount)" in sales_sql
+
+
+def test_top_n_is_pushed_to_the_table_owning_the_sort_key(federation):
+    rows = list(federation.execute_query(
+        "SELECT c.name, o.total_amount FROM orders o JOIN customers c ON o.customer_id = c.id "
+        "ORDER BY o.total_amount DESC LIMIT 2"
+    ))
+
+    assert rows == [
+        {"name": "Alice", "total_amount": 1250.0},
+        {"name": "Bob", "total_amount": 150.0},
+    ]
+    sales_sql = federation.adapters["sales"].queries[-1]
+    assert "ORDER BY total_amount DESC LIMIT 2" in sales_sql
+
+
+def test_top_n_is_re_run_when_the_join_drops_the_top_rows(federation):
+    # Keep the filter on customers local so that Alice's top order is fetched, then dropped
+    federation.semi_join_max_keys = 0
+
+    rows = list(federation.execute_query(
+        "SELECT o.id, c.name FROM orders o JOIN customers c ON o.customer_id = c.id "
+        "WHERE c.name <> 'Alice' ORDER BY o.total_amount DESC LIMIT 1"
+    ))
+
+    assert rows == [{"id": 1002, "name": "Bob"}]
+    scans = [q for q in federation.adapters["sales"].queries if "FROM orders" in q]
+    assert scans[-2].endswith("LIMIT 1")
+    assert "LIMIT" not in scans[-1]
+
+
+def test_sqlite_children_are_attached_and_joined_by_sqlite(federation, monkeypatch):
+    # Unwrapped SQLite file adapters qualify for the ATTACH fast path
+    federation.adapters = {
+        alias: adapter.inner for alias, adapter in federation.adapters.items()
+    }
+    monkeypatch.setattr(
+        federation, "_execute_cross_db_join",
+        lambda *args, **kwargs: pytest.fail("data should not be copied between databases"),
+    )
+
+    rows = list(federation.execute_query(
+        "SELECT c.name, SUM(o.total_amount) AS total FROM orders o "
+        "JOIN customers c ON o.customer_id = c.id GROUP BY c.name ORDER BY c.name"
+    ))
+
+    assert rows == [
+        {"name": "Alice", "total": 1270.0},
+        {"name": "Bob", "total": 150.0},
+        {"name": "Diana", "total": 50.0},
+    ]
+    assert federation._transpile_to_physical(
+        sqlglot.parse_one("SELECT c.name FROM customers c"), target_db="", qualify=True
+    ) == "SELECT c.name FROM crm.customers AS c"
+
+
+def test_repeated_queries_reuse_the_cached_plan(federation, monkeypatch):
+    from nlp_sql_engine.infra.database.federation.plan_cache import normalize_sql
+
+    query = "SELECT c.name, o.id FROM orders o JOIN customers c ON o.customer_id = c.id"
+    first = list(federation.execute_query(query))
+
+    monkeypatch.setattr(
+        federation.planner, "plan", lambda *args, **kwargs: pytest.fail("re-planned")
+    )
+    again = list(federation.execute_query("  " + query.replace(" JOIN", "\n  JOIN") + ";"))
+
+    assert again == first
+    assert federation.plan_cache.hits == 1
+    assert len(federation.plan_cache) == 1
+    # Whitespace inside literals is significant
+    assert normalize_sql("SELECT 'a  b'") != normalize_sql("SELECT 'a b'")
+
+
+def test_cached_plans_expire_with_their_statistics(federation, monkeypatch):
+    plans = []
+    plan = federation.planner.plan
+    monkeypatch.setattr(
+        federation.planner, "plan", lambda *a, **kw: plans.append(1) or plan(*a, **kw)
+    )
+    query = "SELECT c.name, o.id FROM orders o JOIN customers c ON o.customer_id = c.id"
+    list(federation.execute_query(query))
+    list(federation.execute_query(query))
+    assert len(plans) == 1
+
+    # Numbers refreshed (e.g. while planning another query): the plan is redone
+    federation.statistics.ttl_seconds = 0
+    federation.statistics.table_stats("customers")
+    federation.statistics.ttl_seconds = 600
+    list(federation.execute_query(query))
+    assert len(plans) == 2
+
+    # Cached plans live no longer than the statistics they were costed with
+    federation.plan_cache.ttl_seconds = 0
+    list(federation.execute_query(query))
+    assert len(plans) == 3
+
+
+def test_attach_path_keeps_child_settings_or_falls_back(federation):
+    from nlp_sql_engine.infra.database.sqlite_adapter import SQLiteAdapter
+
+    crm = federation.adapters["crm"].inner.engine.url.database
+    sales = federation.adapters["sales"].inner.engine.url.database
+    query = (
+        "SELECT c.name, o.id FROM orders o JOIN customers c ON o.customer_id = c.id "
+        "WHERE c.name LIKE 'alice' ORDER BY o.id"
+    )
+
+    def build(crm_adapter, crm_alias="crm"):
+        return FederatedAdapter(
+            adapters={crm_alias: crm_adapter, "sales": SQLAlchemyAdapter(f"sqlite:///{sales}")},
+            table_mapping={"customers": f"{crm_alias}.customers", "orders": "sales.orders"},
+        )
+
+    # Immutable profile, PRAGMAs and timeout are carried over to the ATTACH
+    attached = build(SQLiteAdapter(crm, immutable=True, cache_size=-4096, query_timeout=5))
+    route = attached._route(query)
+    assert route.kind == "attached"
+    assert route.files["crm"].immutable and route.files["crm"].query_timeout == 5
+    assert [r["id"] for r in attached.execute_query(query)] == [1001, 1004]
+
+    # Init statements only run on the child's connections: federated, and honored
+    sensitive = build(SQLAlchemyAdapter(
+        f"sqlite:///{crm}", init_statements=["PRAGMA case_sensitive_like = ON"]
+    ))
+    assert sensitive._route(query).kind == "federated"
+    assert list(sensitive.execute_query(query)) == []
+
+    # SQLite's own schema names cannot be ATTACHed to
+    reserved = build(SQLAlchemyAdapter(f"sqlite:///{crm}"), crm_alias="main")
+    assert reserved._route(query).kind == "federated"
+    assert [r["id"] for r in reserved.execute_query(query)] == [1001, 1004]
+
+
+def test_plan_cache_is_bounded_and_cleared_on_schema_refresh(federation):
+    federation.plan_cache.max_size = 2
+    for customer_id in (1, 2, 3):
+        list(federation.execute_query(f"SELECT name FROM customers WHERE id = {customer_id}"))
+    assert len(federation.plan_cache) == 2
+
+    federation.refresh_schema()
+    assert len(federation.plan_cache) == 0
+
+
+def test_explain_describes_pushdowns_and_join_strategy_without_running(federation):
+    plan = federation.explain(
+        "SELECT c.name, o.total_amount FROM orders o JOIN customers c ON o.customer_id = c.id "
+        "WHERE c.country = 'USA'"
+    )
+    tree = plan.to_dict()
+
+    assert tree["operator"] == "LocalFinish"
+    join = tree["children"][0]
+    assert join["operator"] == "HashJoin"
+    assert join["detail"]["keys"] == ["o.customer_id = c.id"]
+    probe, build = join["children"]
+    assert probe["detail"]["semi_join"] == "customer_id IN (keys of c.id)"
+    assert build["detail"]["pushed_filter"] == "country = 'USA'"
+    assert build["estimated_rows"] is not None
+    assert "HashJoin" in str(plan)
+    # Only statistics were gathered: no scan reached the children
+    for adapter in federation.adapters.values():
+        assert not any(q.startswith("SELECT customer_id") for q in adapter.queries)
+        assert not any(q.startswith("SELECT id, name") for q in adapter.queries)
+
+
+def test_explain_shows_materialized_scans_and_partitioned_joins(federation):
+    explained = FederatedAdapter(
+        adapters=federation.adapters,
+        table_mapping=federation.table_mapping,
+        attach_sqlite=False,
+        materialized_tables=["customers"],
+        join_processes=2,
+        join_parallel_min_rows=0,
+    )
+    tree = explained.explain(
+        "SELECT c.name, o.total_amount FROM orders o JOIN customers c ON o.customer_id = c.id"
+    ).to_dict()
+
+    join = tree["children"][0]
+    assert join["operator"] == "PartitionedHashJoin"
+    assert join["detail"]["processes"] == 2
+    operators = {child["detail"]["table"]: child["operator"] for child in join["children"]}
+    assert operators == {"orders": "RemoteScan", "customers": "MaterializedScan"}
+    # Nothing was loaded nor a worker process started
+    assert not explained._join_pools
+    explained.close()
+
+
+def test_queries_above_the_transfer_limit_are_rejected_before_fetching(federation):
+    from nlp_sql_engine.infra.database.federation.explain import TransferTooLarge
+
+    federation.max_transfer_rows = 5
+    with pytest.raises(TransferTooLarge):
+        federation.execute_query(
+            "SELECT c.name, o.id FROM orders o JOIN customers c ON o.customer_id = c.id"
+        )
+    assert not any("FROM orders" in q for q in federation.adapters["sales"].queries)
+
+
+def test_materialized_tables_are_reloaded_only_when_the_source_changes(federation, monkeypatch):
+    crm = federation.adapters["crm"].inner
+    cached = FederatedAdapter(
+        adapters={"crm": crm, "sales": federation.adapters["sales"]},
+        table_mapping=federation.table_mapping,
+        attach_sqlite=False,
+        materialized_tables=["customers"],
+    )
+    loads = []
+    load = cached.materialized._load
+    monkeypatch.setattr(
+        cached.materialized, "_load", lambda table, fp: (loads.append(table), load(table, fp))
+    )
+    query = (
+        "SELECT c.name, o.id FROM orders o JOIN customers c ON o.customer_id = c.id "
+        "WHERE o.id = 1004"
+    )
+
+    assert list(cached.execute_query(query)) == [{"name": "Alice", "id": 1004}]
+    assert list(cached.execute_query(query)) == [{"name": "Alice", "id": 1004}]
+    assert loads == ["customers"]
+
+    # A commit from another connection bumps PRAGMA data_version
+    _seed(crm.engine.url.database, ["UPDATE customers SET name = 'Alicia' WHERE id = 1"])
+
+    assert list(cached.execute_query(query)) == [{"name": "Alicia", "id": 1004}]
+    assert loads == ["customers", "customers"]
+
+
+def test_attachments_accept_per_child_adapter_type_and_options(tmp_path):
+    from nlp_sql_engine.config.settings import Settings
+    from nlp_sql_engine.infra.database.sqlite_adapter import SQLiteAdapter
+
+    _seed(tmp_path / "crm.db", ["CREATE TABLE customers (id INTEGER PRIMARY KEY, name TEXT)"])
+    _seed(tmp_path / "sales.db", ["CREATE TABLE orders (id INTEGER PRIMARY KEY)"])
+    settings = Settings(
+        FEDERATED_ATTACHMENTS={
+            "crm": {"uri": f"sqlite:///{tmp_path / 'crm.db'}", "type": "sqlite",
+                    "fetch_batch_size": 50, "statement_timeout": 5},
+            "sales": {"uri": f"sqlite:///{tmp_path / 'sales.db'}", "pool_size": 2,
+                      "statement_timeout": 5},
+        },
+        VIRTUAL_SCHEMA={"customers": "crm.customers", "orders": "sales.orders"},
+    )
+
+    federation = FederatedAdapter.create(settings)
+
+    assert isinstance(federation.adapters["crm"], SQLiteAdapter)
+    assert isinstance(federation.adapters["sales"], SQLAlchemyAdapter)
+    assert federation.adapters["sales"].engine.pool.size() == 2
+    assert federation.child_fetch_batch_sizes == {"crm": 50}
+    # One timeout option name for both adapter types
+    assert federation.adapters["crm"].query_timeout == 5
+    assert federation.adapters["sales"].query_timeout == 5
+
+    settings.FEDERATED_ATTACHMENTS = {"crm": {"uri": "sqlite://", "type": "sqlite", "max_overflow": 2}}
+    with pytest.raises(ValueError, match="Unsupported options"):
+        FederatedAdapter.create(settings)
+
+
+def test_child_rows_are_transferred_as_typed_batches(tmp_path):
+    _seed(tmp_path / "crm.db", [
+        "CREATE TABLE customers (id INTEGER PRIMARY KEY, zip TEXT)",
+        "INSERT INTO customers VALUES (1, '02134'), (2, '90210')",
+    ])
+    _seed(tmp_path / "sales.db", [
+        "CREATE TABLE orders (id INTEGER PRIMARY KEY, customer_id INTEGER)",
+        "INSERT INTO orders VALUES (1001, 1), (1002, 2)",
+    ])
+    crm = SQLAlchemyAdapter(f"sqlite:///{tmp_path / 'crm.db'}")
+    federation = FederatedAdapter(
+        adapters={"crm": crm, "sales": SQLAlchemyAdapter(f"sqlite:///{tmp_path / 'sales.db'}")},
+        table_mapping={"customers": "crm.customers", "orders": "sales.orders"},
+        relationship_graph=[],
+        attach_sqlite=False,
+    )
+
+    batches = list(crm.execute_query_batches("SELECT id, zip FROM customers", batch_size=1))
+    assert [b.columns for b in batches] == [["id", "zip"], ["id", "zip"]]
+    assert batches[0].rows == [(1, "02134")] and batches[1].column(1) == ("90210",)
+
+    # Evaluated locally: the staged zip column keeps its TEXT affinity,
+    # so 100 is compared as text, exactly as the child would compare it
+    rows = list(federation.execute_query(
+        "SELECT o.id FROM orders o JOIN customers c ON o.customer_id = c.id "
+        "WHERE c.zip > 100 OR o.id > 5000 ORDER BY o.id"
+    ))
+    assert rows == [{"id": 1002}]
+
+
+def test_single_database_scopes_are_sent_whole(federation):
+    rows = list(federation.execute_query(
+        "WITH spend AS (SELECT customer_id, SUM(total_amount) AS spent FROM orders "
+        "GROUP BY customer_id) "
+        "SELECT c.name, s.spent FROM spend s JOIN customers c ON c.id = s.customer_id "
+        "WHERE s.spent > 100 ORDER BY c.name"
+    ))
+
+    assert rows == [{"name": "Alice", "spent": 1270.0}, {"name": "Bob", "spent": 150.0}]
+    # The CTE (and the filter on its output) ran inside the sales database
+    sales_sql = federation.adapters["sales"].queries[-1]
+    assert "GROUP BY customer_id" in sales_sql and "spent > 100" in sales_sql
+
+    rows = list(federation.execute_query(
+        "SELECT name FROM customers WHERE country = 'UK' "
+        "UNION ALL SELECT CAST(id AS TEXT) FROM orders WHERE total_amount < 100 ORDER BY 1"
+    ))
+    assert [r["name"] for r in rows] == ["1003", "1004", "Bob"]
+    assert "total_amount < 100" in federation.adapters["sales"].queries[-1]
+
+
+def test_big_joins_are_partitioned_over_worker_processes(federation, monkeypatch):
+    from nlp_sql_engine.infra.database.federation import partitioned
+
+    splits = []
+    split = partitioned.split_partial_aggregation
+    monkeypatch.setattr(
+        partitioned, "split_partial_aggregation", lambda *a: splits.append(split(*a)) or splits[-1]
+    )
+    federation.attach_sqlite = False
+    federation.join_processes = 2
+    federation.join_parallel_min_rows = 0
+    try:
+        rows = list(federation.execute_query(
+            "SELECT c.name, o.total_amount FROM orders o JOIN customers c ON o.customer_id = c.id"
+        ))
+        assert sorted(rows, key=lambda r: r["total_amount"]) == [
+            {"name": "Alice", "total_amount": 20.0},
+            {"name": "Diana", "total_amount": 50.0},
+            {"name": "Bob", "total_amount": 150.0},
+            {"name": "Alice", "total_amount": 1250.0},
+        ]
+
+        # Aggregates are computed per partition and combined afterwards
+        rows = list(federation.execute_query(
+            "SELECT c.country, COUNT(*) AS n, AVG(o.total_amount) AS avg_amount "
+            "FROM orders o JOIN customers c ON o.customer_id = c.id "
+            "GROUP BY c.country ORDER BY c.country"
+        ))
+        assert rows == [
+            {"country": "UK", "n": 1, "avg_amount": 150.0},
+            {"country": "USA", "n": 3, "avg_amount": 440.0},
+        ]
+        partial_sql, final_sql, _ = splits[-1]
+        assert "GROUP BY" in partial_sql and "__partials" in final_sql
+        assert len(federation._join_pools) == 2
+
+        # One probe row per task: build partitions are still sent only once
+        submitted = []
+
+        class RecordingPool:
+            def __init__(self, pool):
+                self.pool = pool
+
+            def submit(self, fn, *args):
+                submitted.append((fn.__name__, args[1:2]))
+                return self.pool.submit(fn, *args)
+
+        pools = [RecordingPool(pool) for pool in federation._join_pools]
+        monkeypatch.setattr(federation, "_get_join_pools", lambda: pools)
+        init = partitioned.PartitionedHashJoinExecutor.__init__
+        monkeypatch.setattr(
+            partitioned.PartitionedHashJoinExecutor, "__init__",
+            lambda self, plan, pools, **kw: init(self, plan, pools, partition_rows=1, **kw),
+        )
+        rows = list(federation.execute_query(
+            "SELECT o.id FROM orders o JOIN customers c ON o.customer_id = c.id"
+        ))
+        assert sorted(r["id"] for r in rows) == [1001, 1002, 1003, 1004]
+        loads = [args for name, args in submitted if name == "_load_partition"]
+        assert len(loads) == len(set(loads))
+        assert sum(name == "_join_partition" for name, _ in submitted) >= 3
+    finally:
+        federation.close()
+
+
+def test_failed_build_partition_loads_are_reported(federation, monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    class FailingLoadPool(ThreadPoolExecutor):
+        def submit(self, fn, *args):
+            if fn.__name__ == "_load_partition":
+                def fn(*args):
+                    raise MemoryError("build partition too big for the worker")
+            return super().submit(fn, *args)
+
+    pools = [FailingLoadPool(max_workers=1) for _ in range(2)]
+    monkeypatch.setattr(federation, "_get_join_pools", lambda: pools)
+    federation.attach_sqlite = False
+    federation.join_processes = 2
+    federation.join_parallel_min_rows = 0
+    try:
+        with pytest.raises(MemoryError, match="build partition"):
+            list(federation.execute_query(
+                "SELECT o.id FROM orders o JOIN customers c ON o.customer_id = c.id"
+            ))
+    finally:
+        for pool in pools:
+            pool.shutdown()
+
+
+def test_children_use_pool_settings_and_share_engines_per_uri(tmp_path):
+    from nlp_sql_engine.config.settings import Settings
+
+    _seed(tmp_path / "shop.db", [
+        "CREATE TABLE customers (id INTEGER PRIMARY KEY, name TEXT)",
+        "CREATE TABLE orders (id INTEGER PRIMARY KEY, customer_id INTEGER)",
+        "INSERT INTO customers VALUES (1, 'Alice')",
+        "INSERT INTO orders VALUES (10, 1)",
+    ])
+    uri = f"sqlite:///{tmp_path / 'shop.db'}"
+    settings = Settings(
+        FEDERATED_ATTACHMENTS={"crm": uri, "sales": uri, "archive": {"uri": uri, "pool_size": 2}},
+        VIRTUAL_SCHEMA={"customers": "crm.customers", "orders": "sales.orders"},
+        DB_POOL_PRE_PING=True,
+        DB_POOL_RECYCLE_SECONDS=300,
+        DB_CONNECTION_INIT_STATEMENTS=["PRAGMA cache_size = -1234"],
+    )
+
+    federation = FederatedAdapter.create(settings)
+
+    crm, sales, archive = (federation.adapters[a] for a in ("crm", "sales", "archive"))
+    assert crm is sales and archive is not crm
+    # Only real in-memory databases are kept private, not names containing "memory"
+    memory_store = f"sqlite:///{tmp_path / 'memory_store.db'}"
+    shared = {}
+    first, _ = FederatedAdapter._create_child("a", memory_store, shared=shared)
+    second, _ = FederatedAdapter._create_child("b", memory_store, shared=shared)
+    assert first is second
+    private, _ = FederatedAdapter._create_child("c", "sqlite://", shared=shared)
+    assert private is not FederatedAdapter._create_child("d", "sqlite://", shared=shared)[0]
+    assert crm.engine.pool._pre_ping and crm.engine.pool._recycle == 300
+    assert [tuple(r) for r in crm.execute_query("PRAGMA cache_size")] == [(-1234,)]
+    rows = list(federation.execute_query(
+        "SELECT c.name, o.id FROM orders o JOIN customers c ON o.customer_id = c.id"
+    ))
+    assert rows == [{"name": "Alice", "id": 10}]
+
+
+def test_async_federation_bridges_joins_and_routes_single_queries_to_async_children(federation):
+    import asyncio
+    from nlp_sql_engine.infra.database.federated_adapter import AsyncFederatedAdapter
+    from nlp_sql_engine.infra.database.sqlite_adapter import AsyncSQLiteAdapter
+
+    sales_path = federation.adapters["sales"].inner.engine.url.database
+    async_sales = AsyncSQLiteAdapter(sales_path)
+    adapter = AsyncFederatedAdapter(federation, children={"sales": async_sales}, max_workers=2)
+
+    async def collect(query):
+        return [row async for row in adapter.execute_query(query)]
+
+    async def scenario():
+        join = (
+            "SELECT c.name, SUM(o.total_amount) AS spent FROM orders o "
+            "JOIN customers c ON o.customer_id = c.id GROUP BY c.name ORDER BY c.name"
+        )
+        single = "SELECT id FROM orders WHERE total_amount > 100 ORDER BY id"
+        return await asyncio.gather(collect(join), collect(single))
+
+    queries_before = len(federation.adapters["sales"].queries)
+    joined, sales = asyncio.run(scenario())
+    asyncio.run(adapter.close())
+
+    assert joined == [
+        {"name": "Alice", "spent": 1270.0},
+        {"name": "Bob", "spent": 150.0},
+        {"name": "Diana", "spent": 50.0},
+    ]
+    # Single-database query: sent to the async child, not through the sync one
+    assert sales == [(1001,), (1002,)]
+    sent = federation.adapters["sales"].queries[queries_before:]
+    assert all("total_amount > 100" not in q for q in sent)
+
+
+def test_cross_db_queries_stop_at_their_deadline(tmp_path):
+    import time
+    from nlp_sql_engine.core.domain.cancellation import CancellationToken, QueryTimeout
+    from nlp_sql_engine.infra.database.sqlite_adapter import SQLiteAdapter
+
+    for name in ("a", "b"):
+        _seed(tmp_path / f"{name}.db", [
+            f"CREATE TABLE {name} (x INTEGER)",
+            f"INSERT INTO {name} WITH RECURSIVE c(x) AS "
+            "(SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 8000) SELECT x FROM c",
+        ])
+    # Cartesian product: seconds of SQLite work once both sides are local
+    query = "SELECT COUNT(*) AS n FROM ta, tb WHERE ta.x * tb.x % 7 <> 8"
+
+    for attach_sqlite in (False, True):
+        # Staging area, then ATTACH DATABASE
+        federation = FederatedAdapter(
+            adapters={n: SQLiteAdapter(str(tmp_path / f"{n}.db")) for n in ("a", "b")},
+            table_mapping={"ta": "a.a", "tb": "b.b"},
+            attach_sqlite=attach_sqlite,
+        )
+        started = time.monotonic()
+        with pytest.raises(QueryTimeout):
+            list(federation.execute_cancellable(query, CancellationToken(0.3)))
+        assert time.monotonic() - started < 3
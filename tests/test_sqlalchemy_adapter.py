@@ -0,0 +1,168 @@
+import threading
+
+import pytest
+
+from nlp_sql_engine.core.domain.cancellation import CancellationToken, QueryCancelled, QueryTimeout
+from nlp_sql_engine.infra.database.sqlalchemy_adapter import SQLAlchemyAdapter
+
+RUNAWAY = "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) SELECT COUNT(*) FROM c"
+
+
+def test_statements_are_cancelled_through_the_driver(tmp_path):
+    adapter = SQLAlchemyAdapter(f"sqlite:///{tmp_path / 'app.db'}", statement_timeout=0.2)
+    with pytest.raises(QueryTimeout):
+        list(adapter.execute_query(RUNAWAY))
+
+    adapter.query_timeout = None
+    token = CancellationToken()
+    threading.Timer(0.2, token.cancel).start()
+    with pytest.raises(QueryCancelled):
+        list(adapter.execute_cancellable(RUNAWAY, token))
+    assert [tuple(r) for r in adapter.execute_query("SELECT 1")] == [(1,)]
+
+
+def test_batch_reads_are_cancelled_too(tmp_path):
+    import time
+
+    adapter = SQLAlchemyAdapter(f"sqlite:///{tmp_path / 'app.db'}", statement_timeout=0.2)
+    for streaming in (False, True):
+        # DBAPI fetchmany path, then the server-side cursor path
+        adapter.streaming = streaming
+        started = time.monotonic()
+        with pytest.raises(QueryTimeout):
+            list(adapter.execute_query_batches(RUNAWAY))
+        assert time.monotonic() - started < 5
+
+    adapter.query_timeout = None
+    token = CancellationToken()
+    threading.Timer(0.2, token.cancel).start()
+    with pytest.raises(QueryCancelled):
+        list(adapter.execute_query_batches(RUNAWAY, cancel=token))
+    assert [b.rows for b in adapter.execute_query_batches("SELECT 1")] == [[(1,)]]
+
+
+def test_results_are_streamed_in_configured_batches(tmp_path):
+    from sqlalchemy import event
+
+    adapter = SQLAlchemyAdapter(f"sqlite:///{tmp_path / 'app.db'}", fetch_batch_size=2)
+    adapter.execute_ddl("CREATE TABLE t (id INT)")
+    adapter.execute_ddl("INSERT INTO t VALUES (1), (2), (3)")
+
+    options = []
+    event.listen(
+        adapter.engine, "before_cursor_execute",
+        lambda conn, cursor, statement, params, context, many: options.append(
+            context.execution_options
+        ),
+    )
+    assert [tuple(r) for r in adapter.execute_query("SELECT id FROM t ORDER BY id")] == [
+        (1,), (2,), (3,)
+    ]
+    assert options[-1]["stream_results"] and options[-1]["yield_per"] == 2
+
+    # Server-side cursor path (PostgreSQL, MySQL), exercised on SQLite
+    adapter.streaming = True
+    batches = list(adapter.execute_query_batches("SELECT id FROM t ORDER BY id"))
+    assert [b.rows for b in batches] == [[(1,), (2,)], [(3,)]]
+    assert batches[0].columns == ["id"]
+
+
+def test_schema_is_reflected_in_bulk_and_cached_until_ddl(tmp_path, monkeypatch):
+    from sqlalchemy.engine.reflection import Inspector
+
+    adapter = SQLAlchemyAdapter(f"sqlite:///{tmp_path / 'app.db'}")
+    adapter.execute_ddl("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT)")
+    adapter.execute_ddl(
+        "CREATE TABLE orders (id INTEGER PRIMARY KEY, user_id INTEGER REFERENCES users(id))"
+    )
+
+    reflections = []
+    get_multi_columns = Inspector.get_multi_columns
+    monkeypatch.setattr(
+        Inspector, "get_multi_columns",
+        lambda self, **kw: reflections.append(1) or get_multi_columns(self, **kw),
+    )
+
+    assert sorted(adapter.get_all_table_names()) == ["orders", "users"]
+    assert "FOREIGN KEY (user_id) REFERENCES users(id)" in adapter.get_table_schema("orders")
+    assert "name TEXT" in adapter.get_schema()
+    assert len(reflections) == 1
+
+    # Data changes keep the cache, DDL drops it
+    adapter.execute_ddl("INSERT INTO users VALUES (1, 'Ann')")
+    adapter.get_table_schema("users")
+    assert len(reflections) == 1
+    adapter.execute_ddl("ALTER TABLE users ADD COLUMN email TEXT")
+    assert "email TEXT" in adapter.get_table_schema("users")
+    assert len(reflections) == 2
+
+    # A view is described on demand but not listed as a table
+    adapter.execute_ddl("CREATE VIEW user_names AS SELECT name FROM users")
+    assert "name" in adapter.get_table_schema("user_names")
+    assert sorted(adapter.get_all_table_names()) == ["orders", "users"]
+    assert "user_names" not in adapter.get_schema()
+    reflections.clear()
+
+    # Expired entries are reflected again
+    adapter.schema_cache_ttl = 0
+    adapter.get_table_schema("users")
+    assert len(reflections) == 1
+
+
+def test_zero_pool_settings_are_passed_to_the_engine(tmp_path):
+    from nlp_sql_engine.config.settings import Settings
+
+    settings = Settings(DB_MAX_OVERFLOW=0, DB_POOL_RECYCLE_SECONDS=0)
+    adapter = SQLAlchemyAdapter(
+        f"sqlite:///{tmp_path / 'app.db'}", **SQLAlchemyAdapter.pool_options(settings)
+    )
+    assert adapter.engine.pool._max_overflow == 0
+    assert adapter.engine.pool._recycle == 0
+
+
+def test_async_adapter_streams_commits_reflects_and_times_out(tmp_path):
+    import asyncio
+    import time
+    from types import SimpleNamespace
+
+    pytest.importorskip("aiosqlite")
+    pytest.importorskip("greenlet")
+    from nlp_sql_engine.app.factories.infrastructure import InfrastructureFactory
+
+    settings = SimpleNamespace(
+        DB_CONNECTION_STRING=f"sqlite:///{tmp_path / 'app.db'}", DB_FETCH_BATCH_SIZE=2
+    )
+    # Plain URIs get the backend's async driver (aiosqlite)
+    adapter = InfrastructureFactory.create_async_db("sqlalchemy", settings)
+
+    async def rows(query):
+        return [tuple(row) async for row in adapter.execute_query(query)]
+
+    async def checks():
+        await adapter.execute_ddl("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)")
+        await adapter.execute_ddl("INSERT INTO t VALUES (1, 'a'), (2, 'b'), (3, 'c')")
+        assert await rows("SELECT id FROM t ORDER BY id") == [(1,), (2,), (3,)]
+        assert await adapter.get_all_table_names() == ["t"]
+        assert "name TEXT" in await adapter.get_table_schema("t")
+
+        # Statements without rows are committed; DDL drops the schema cache
+        assert await rows("INSERT INTO t VALUES (4, 'd')") == []
+        assert await rows("SELECT COUNT(*) FROM t") == [(4,)]
+        await adapter.execute_ddl("CREATE TABLE u (id INTEGER)")
+        assert sorted(await adapter.get_all_table_names()) == ["t", "u"]
+
+        # The deadline interrupts the statement running in the driver's thread
+        adapter.query_timeout = 0.2
+        started = time.monotonic()
+        with pytest.raises(QueryTimeout):
+            await rows(RUNAWAY)
+        assert time.monotonic() - started < 5
+        assert await rows("SELECT 1") == [(1,)]
+
+    async def scenario():
+        try:
+            await checks()
+        finally:
+            await adapter.close()
+
+    asyncio.run(scenario())
@@ -35,4 +35,141 @@ def test_memory_efficient_generator(db_adapter):
     
     # 3. Ensure it stops
     with pytest.raises(StopIteration):
-        next(result)
\ No newline at end of file
+        next(result)
+
+def test_results_are_fetched_in_batches(db_adapter):
+    db_adapter.execute_ddl("INSERT INTO test_users VALUES (2, 'a'), (3, 'b'), (4, 'c'), (5, 'd')")
+    db_adapter.fetch_batch_size = 2
+
+    rows = list(db_adapter.execute_query("SELECT id FROM test_users ORDER BY id"))
+    assert rows == [(1,), (2,), (3,), (4,), (5,)]
+
+    batches = list(db_adapter.execute_query_batches("SELECT id, name FROM test_users ORDER BY id"))
+    assert [len(b) for b in batches] == [2, 2, 1]
+    assert batches[0].columns == ["id", "name"]
+    assert batches[2].rows == [(5, "d")]
+    assert [len(b) for b in db_adapter.execute_query_batches("SELECT id FROM test_users", 4)] == [4, 1]
+
+
+def test_file_database_serves_concurrent_readers_and_a_writer(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    adapter = SQLiteAdapter(str(tmp_path / "app.db"), fetch_batch_size=1)
+    adapter.execute_ddl("CREATE TABLE t (id INT)")
+    adapter.execute_ddl("INSERT INTO t VALUES (1), (2), (3)")
+
+    first = adapter.execute_query("SELECT id FROM t ORDER BY id")
+    assert next(first) == (1,)
+
+    # Other threads query while the first cursor is still open
+    with ThreadPoolExecutor(4) as pool:
+        counts = list(pool.map(
+            lambda _: list(adapter.execute_query("SELECT COUNT(*) FROM t")), range(8)
+        ))
+    assert counts == [[(3,)]] * 8
+
+    # WAL: the writer does not wait for the open reader, which keeps its snapshot
+    adapter.execute_ddl("INSERT INTO t VALUES (4)")
+    assert list(first) == [(2,), (3,)]
+    assert list(adapter.execute_query("SELECT COUNT(*) FROM t")) == [(4,)]
+    assert list(adapter.execute_query("PRAGMA journal_mode")) == [("wal",)]
+    adapter.close()
+
+
+def test_read_mostly_files_are_opened_with_the_tuned_profile(tmp_path):
+    path = tmp_path / "analytics.db"
+    SQLiteAdapter(str(path), wal=False).execute_ddl("CREATE TABLE facts AS SELECT 1 AS id")
+
+    adapter = SQLiteAdapter(
+        f"sqlite:///{path}", mmap_size=1 << 20, cache_size=-4096, temp_store="MEMORY", immutable=True
+    )
+
+    assert list(adapter.execute_query("SELECT id FROM facts")) == [(1,)]
+    assert list(adapter.execute_query("PRAGMA mmap_size")) == [(1 << 20,)]
+    assert list(adapter.execute_query("PRAGMA cache_size")) == [(-4096,)]
+    assert list(adapter.execute_query("PRAGMA temp_store")) == [(2,)]
+    assert list(adapter.execute_query("PRAGMA query_only")) == [(1,)]
+    # Not switched to WAL: an immutable file is never written
+    assert list(adapter.execute_query("PRAGMA journal_mode")) == [("delete",)]
+    with pytest.raises(ValueError, match="read-only"):
+        adapter.execute_ddl("DROP TABLE facts")
+    adapter.close()
+
+
+RUNAWAY = "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) SELECT COUNT(*) FROM c"
+
+
+def test_runaway_queries_are_interrupted(tmp_path):
+    import threading
+    import time
+    from nlp_sql_engine.core.domain.cancellation import (
+        CancellationToken, QueryCancelled, QueryTimeout,
+    )
+
+    adapter = SQLiteAdapter(str(tmp_path / "app.db"), query_timeout=0.2)
+    started = time.monotonic()
+    with pytest.raises(QueryTimeout):
+        list(adapter.execute_query(RUNAWAY))
+    assert time.monotonic() - started < 5
+
+    # Cancelled from another thread; the pooled connection stays usable
+    adapter.query_timeout = None
+    token = CancellationToken()
+    threading.Timer(0.2, token.cancel).start()
+    with pytest.raises(QueryCancelled):
+        list(adapter.execute_cancellable(RUNAWAY, token))
+    assert list(adapter.execute_cancellable("SELECT 1", CancellationToken())) == [(1,)]
+    adapter.close()
+
+
+def test_per_query_tokens_do_not_pile_up_on_the_callers_token(tmp_path):
+    from nlp_sql_engine.core.domain.cancellation import CancellationToken
+
+    adapter = SQLiteAdapter(str(tmp_path / "app.db"), query_timeout=5)
+    session = CancellationToken()
+    for _ in range(3):
+        assert list(adapter.execute_cancellable("SELECT 1", session)) == [(1,)]
+    rows = adapter.execute_cancellable("SELECT 1 UNION ALL SELECT 2", session)
+    next(rows)
+    assert len(session._callbacks) == 1
+    # Abandoned half-way: the child token is released with the generator
+    rows.close()
+    assert session._callbacks == []
+    adapter.close()
+
+
+def test_async_adapter_shares_worker_threads_and_stops_abandoned_queries(tmp_path):
+    import asyncio
+    import time
+    from contextlib import aclosing
+    from nlp_sql_engine.infra.database.sqlite_adapter import AsyncSQLiteAdapter
+
+    adapter = AsyncSQLiteAdapter(str(tmp_path / "app.db"), max_workers=2, fetch_batch_size=3)
+
+    async def scenario():
+        await adapter.execute_ddl("CREATE TABLE t (id INT)")
+        await adapter.execute_ddl("INSERT INTO t VALUES (1), (2), (3), (4), (5)")
+        assert await adapter.get_all_table_names() == ["t"]
+
+        async def ids():
+            return [row[0] async for row in adapter.execute_query("SELECT id FROM t ORDER BY id")]
+
+        # More concurrent queries than worker threads
+        results = await asyncio.gather(*[ids() for _ in range(10)])
+        assert results == [[1, 2, 3, 4, 5]] * 10
+
+        # Leaving a runaway query after its first row interrupts it in its thread
+        started = time.monotonic()
+        rows = adapter.execute_query(
+            "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) "
+            "SELECT x FROM c WHERE x % 1000000 = 0"
+        )
+        async with aclosing(rows):
+            async for row in rows:
+                assert row == (1000000,)
+                break
+        assert time.monotonic() - started < 5
+        assert [row async for row in adapter.execute_query("SELECT COUNT(*) FROM t")] == [(5,)]
+
+    asyncio.run(scenario())
+    asyncio.run(adapter.close())